@@ -1,6 +1,9 @@
 import pygame
 import os
+import time
 from DTW import Warrior, Mage, Archer, Paladin, EvilWizard, FireDragon, IceTitan, ShadowAssassin
+from image_loader import ImageLoader
+from text_cache import TextCache
 
 class VisualBattleGame:
     def __init__(self):
@@ -48,6 +51,7 @@ class VisualBattleGame:
         self.small_font = pygame.font.Font(None, 24)
         self.message_font = pygame.font.Font(None, 28)
         self.title_font = pygame.font.Font(None, 72)
+        self.text_cache = TextCache()
 
         # Pokemon-style positions
         # Hero: Front-left (lower left corner) - moved down and right to be clearly visible
@@ -102,6 +106,7 @@ class VisualBattleGame:
         # Try to load sprites from assets folder
         asset_dir = 'assets'
         if os.path.exists(asset_dir):
+            start = time.perf_counter()
             sprite_files = {
                 'warrior': 'warrior.png',
                 'mage': 'mage.png',
@@ -110,12 +115,30 @@ class VisualBattleGame:
                 'wizard': 'wizard.png',
                 'background': 'battle_bg.png'
             }
+            decoration_files = {
+                'tree1': 'tree1.png',
+                'tree2': 'tree2.png',
+                'rock1': 'rock1.png',
+                'rock2': 'rock2.png',
+                'bush1': 'bush1.png',
+                'bush2': 'bush2.png',
+                'tower': 'tower.png',
+                'house1': 'house1.png',
+                'house2': 'house2.png',
+                'house3': 'house3.png'
+            }
+
+            # Every file is decoded on a thread pool up front; each is
+            # converted here, on the main thread, as it's picked up
+            images = ImageLoader()
+            images.request(os.path.join(asset_dir, filename)
+                           for filename in list(sprite_files.values()) + list(decoration_files.values()))
 
             for key, filename in sprite_files.items():
                 filepath = os.path.join(asset_dir, filename)
                 if os.path.exists(filepath):
                     try:
-                        img = pygame.image.load(filepath).convert_alpha()
+                        img = images.load(filepath).convert_alpha()
 
                         # Check if it's a sprite sheet (for characters)
                         if key != 'background':
@@ -136,29 +159,19 @@ class VisualBattleGame:
                         self.sprites[key] = None
 
             # Load decorations
-            decoration_files = {
-                'tree1': 'tree1.png',
-                'tree2': 'tree2.png',
-                'rock1': 'rock1.png',
-                'rock2': 'rock2.png',
-                'bush1': 'bush1.png',
-                'bush2': 'bush2.png',
-                'tower': 'tower.png',
-                'house1': 'house1.png',
-                'house2': 'house2.png',
-                'house3': 'house3.png'
-            }
-
             for key, filename in decoration_files.items():
                 filepath = os.path.join(asset_dir, filename)
                 if os.path.exists(filepath):
                     try:
-                        img = pygame.image.load(filepath).convert_alpha()
+                        img = images.load(filepath).convert_alpha()
                         self.decorations[key] = img
                         print(f"✓ Loaded decoration {filename}")
                     except Exception as e:
                         print(f"✗ Failed to load decoration {filename}: {e}")
 
+            images.close()
+            print(f"{images.report()} ({(time.perf_counter() - start) * 1000:.0f} ms loading assets)")
+
         # Print instructions if no assets found
         if all(sprite is None for sprite in self.sprites.values()):
             print("\n" + "="*60)
@@ -498,7 +511,7 @@ class VisualBattleGame:
     def draw_health_bar(self, character, x, y, show_label=True):
         """Draw health bar with label"""
         if show_label:
-            label = self.small_font.render("HP", True, (255, 255, 255))
+            label = self.text_cache.render(self.small_font, "HP", (255, 255, 255))
             self.screen.blit(label, (x, y - 2))  # Label now inside box
 
         # Background bar - made smaller, positioned after HP label
@@ -518,13 +531,13 @@ class VisualBattleGame:
 
         # Health text - smaller
         health_text = f"{int(character.health)}/{character.max_health}"
-        text_surf = self.small_font.render(health_text, True, (255, 255, 255))
+        text_surf = self.text_cache.render(self.small_font, health_text, (255, 255, 255))
         text_rect = text_surf.get_rect(center=(x + 104, y + 9))
         self.screen.blit(text_surf, text_rect)
 
     def draw_rage_bar(self, warrior, x, y):
         """Draw rage bar for warrior"""
-        label = self.small_font.render("RAGE", True, (255, 165, 0))
+        label = self.text_cache.render(self.small_font, "RAGE", (255, 165, 0))
         self.screen.blit(label, (x, y - 2))  # Label now inside box
 
         # Background - made smaller, positioned after RAGE label
@@ -536,12 +549,12 @@ class VisualBattleGame:
 
         # Rage stacks text - smaller
         rage_text = f"{warrior.rage_stacks}/{warrior.max_rage}"
-        text_surf = self.small_font.render(rage_text, True, (255, 255, 255))
+        text_surf = self.text_cache.render(self.small_font, rage_text, (255, 255, 255))
         self.screen.blit(text_surf, (x + 185, y - 2))
 
     def draw_mana_bar(self, mage, x, y):
         """Draw mana bar for mage"""
-        label = self.small_font.render("MANA", True, (100, 149, 237))
+        label = self.text_cache.render(self.small_font, "MANA", (100, 149, 237))
         self.screen.blit(label, (x, y - 2))
 
         # Background
@@ -553,12 +566,12 @@ class VisualBattleGame:
 
         # Mana text
         mana_text = f"{mage.mana}/{mage.max_mana}"
-        text_surf = self.small_font.render(mana_text, True, (255, 255, 255))
+        text_surf = self.text_cache.render(self.small_font, mana_text, (255, 255, 255))
         self.screen.blit(text_surf, (x + 185, y - 2))
 
     def draw_focus_bar(self, archer, x, y):
         """Draw focus bar for archer"""
-        label = self.small_font.render("FOCUS", True, (50, 205, 50))
+        label = self.text_cache.render(self.small_font, "FOCUS", (50, 205, 50))
         self.screen.blit(label, (x, y - 2))
 
         # Background
@@ -570,12 +583,12 @@ class VisualBattleGame:
 
         # Focus text
         focus_text = f"{archer.focus}/{archer.max_focus}"
-        text_surf = self.small_font.render(focus_text, True, (255, 255, 255))
+        text_surf = self.text_cache.render(self.small_font, focus_text, (255, 255, 255))
         self.screen.blit(text_surf, (x + 185, y - 2))
 
     def draw_holy_power_bar(self, paladin, x, y):
         """Draw holy power bar for paladin"""
-        label = self.small_font.render("HOLY", True, (255, 215, 0))
+        label = self.text_cache.render(self.small_font, "HOLY", (255, 215, 0))
         self.screen.blit(label, (x, y - 2))
 
         # Background
@@ -587,7 +600,7 @@ class VisualBattleGame:
 
         # Holy power text
         holy_text = f"{paladin.holy_power}/{paladin.max_holy_power}"
-        text_surf = self.small_font.render(holy_text, True, (255, 255, 255))
+        text_surf = self.text_cache.render(self.small_font, holy_text, (255, 255, 255))
         self.screen.blit(text_surf, (x + 185, y - 2))
 
     def draw_info_box(self, character, x, y, is_player=True):
@@ -620,7 +633,7 @@ class VisualBattleGame:
         # Add stun indicator for wizard
         if isinstance(character, EvilWizard) and hasattr(character, 'is_stunned') and character.is_stunned:
             name_text += " 💫"
-        name_surf = self.small_font.render(name_text, True, (255, 255, 255))
+        name_surf = self.text_cache.render(self.small_font, name_text, (255, 255, 255))
         self.screen.blit(name_surf, (x + 10, y + 5))
 
         # Health bar - smaller
@@ -666,11 +679,11 @@ class VisualBattleGame:
             pygame.draw.rect(self.screen, (255, 255, 255, 50), highlight_rect, width=1, border_radius=3)
 
         # Text with shadow
-        text_surf = self.font.render(text, True, (0, 0, 0))
+        text_surf = self.text_cache.render(self.font, text, (0, 0, 0))
         text_rect = text_surf.get_rect(center=(rect.centerx + 2, rect.centery + 2))
         self.screen.blit(text_surf, text_rect)
 
-        text_surf = self.font.render(text, True, (255, 255, 255))
+        text_surf = self.text_cache.render(self.font, text, (255, 255, 255))
         text_rect = text_surf.get_rect(center=rect.center)
         self.screen.blit(text_surf, text_rect)
 
@@ -717,10 +730,10 @@ class VisualBattleGame:
 
             for line in lines:
                 # Text shadow for better readability
-                shadow_surf = self.small_font.render(line, True, (100, 100, 100))
+                shadow_surf = self.text_cache.render(self.small_font, line, (100, 100, 100))
                 self.screen.blit(shadow_surf, (571, y_offset + 1))
 
-                text_surf = self.small_font.render(line, True, (0, 0, 0))
+                text_surf = self.text_cache.render(self.small_font, line, (0, 0, 0))
                 self.screen.blit(text_surf, (570, y_offset))
                 y_offset += 25
 
@@ -738,14 +751,9 @@ class VisualBattleGame:
                 # Draw damage number with outline for better visibility
                 alpha = min(255, timer * 4)
 
-                # Outline/shadow
-                for dx, dy in [(-2, 0), (2, 0), (0, -2), (0, 2)]:
-                    surf = self.font.render(text, True, (0, 0, 0))
-                    self.screen.blit(surf, (x + dx, y + dy))
-
-                # Main text
-                surf = self.font.render(text, True, color)
-                self.screen.blit(surf, (x, y))
+                # Text with a 2px outline, offset so the text itself stays at (x, y)
+                surf = self.text_cache.render(self.font, text, color, ((0, 0, 0), 2))
+                self.screen.blit(surf, (x - 2, y - 2))
 
                 # Update position and timer
                 dmg[1] -= 1  # Move up
@@ -828,7 +836,7 @@ class VisualBattleGame:
         pygame.draw.rect(self.screen, (100, 100, 150), menu_rect, width=4, border_radius=15)
 
         # Title
-        title = self.font.render("Special Abilities", True, (255, 255, 255))
+        title = self.text_cache.render(self.font, "Special Abilities", (255, 255, 255))
         title_rect = title.get_rect(center=(400, 160))
         self.screen.blit(title, title_rect)
 
@@ -836,7 +844,7 @@ class VisualBattleGame:
         if isinstance(self.player, Warrior):
             # Rage info
             rage_text = f"Rage: {self.player.rage_stacks}/{self.player.max_rage}"
-            rage_surf = self.small_font.render(rage_text, True, (255, 165, 0))
+            rage_surf = self.text_cache.render(self.small_font, rage_text, (255, 165, 0))
             self.screen.blit(rage_surf, (220, 200))
 
             # Ability buttons
@@ -860,7 +868,7 @@ class VisualBattleGame:
         elif isinstance(self.player, Mage):
             # Mana info
             mana_text = f"Mana: {self.player.mana}/{self.player.max_mana}"
-            mana_surf = self.small_font.render(mana_text, True, (100, 149, 237))
+            mana_surf = self.text_cache.render(self.small_font, mana_text, (100, 149, 237))
             self.screen.blit(mana_surf, (220, 200))
 
             # Ability buttons
@@ -885,7 +893,7 @@ class VisualBattleGame:
         elif isinstance(self.player, Archer):
             # Focus info
             focus_text = f"Focus: {self.player.focus}/{self.player.max_focus}"
-            focus_surf = self.small_font.render(focus_text, True, (50, 205, 50))
+            focus_surf = self.text_cache.render(self.small_font, focus_text, (50, 205, 50))
             self.screen.blit(focus_surf, (220, 200))
 
             # Ability buttons
@@ -910,7 +918,7 @@ class VisualBattleGame:
         elif isinstance(self.player, Paladin):
             # Holy power info
             holy_text = f"Holy Power: {self.player.holy_power}/{self.player.max_holy_power}"
-            holy_surf = self.small_font.render(holy_text, True, (255, 215, 0))
+            holy_surf = self.text_cache.render(self.small_font, holy_text, (255, 215, 0))
             self.screen.blit(holy_surf, (220, 200))
 
             # Ability buttons
@@ -952,11 +960,11 @@ class VisualBattleGame:
         pygame.draw.rect(self.screen, (255, 255, 255), button_rect, width=2, border_radius=5)
 
         # Button text - two lines inside button
-        title_text = self.font.render(title, True, (255, 255, 255))
+        title_text = self.text_cache.render(self.font, title, (255, 255, 255))
         title_rect = title_text.get_rect(center=(button_rect.centerx, button_rect.centery - 12))
         self.screen.blit(title_text, title_rect)
 
-        desc_text = self.small_font.render(description, True, (200, 200, 200))
+        desc_text = self.text_cache.render(self.small_font, description, (200, 200, 200))
         desc_rect = desc_text.get_rect(center=(button_rect.centerx, button_rect.centery + 15))
         self.screen.blit(desc_text, desc_rect)
 
@@ -974,7 +982,7 @@ class VisualBattleGame:
         pygame.draw.rect(self.screen, (100, 100, 150), menu_rect, width=4, border_radius=15)
 
         # Title
-        title = self.font.render("Menu", True, (255, 255, 255))
+        title = self.text_cache.render(self.font, "Menu", (255, 255, 255))
         title_rect = title.get_rect(center=(400, 240))
         self.screen.blit(title, title_rect)
 
@@ -1000,15 +1008,15 @@ class VisualBattleGame:
         self.screen.blit(overlay, (0, 0))
 
         # Game Over text
-        game_over_text = self.font.render("GAME OVER", True, (255, 0, 0))
+        game_over_text = self.text_cache.render(self.font, "GAME OVER", (255, 0, 0))
         game_over_rect = game_over_text.get_rect(center=(400, 250))
         self.screen.blit(game_over_text, game_over_rect)
 
-        defeat_text = self.small_font.render("You were defeated by the Evil Wizard!", True, (255, 255, 255))
+        defeat_text = self.text_cache.render(self.small_font, "You were defeated by the Evil Wizard!", (255, 255, 255))
         defeat_rect = defeat_text.get_rect(center=(400, 300))
         self.screen.blit(defeat_text, defeat_rect)
 
-        restart_text = self.small_font.render("Close window to exit", True, (150, 150, 150))
+        restart_text = self.text_cache.render(self.small_font, "Close window to exit", (150, 150, 150))
         restart_rect = restart_text.get_rect(center=(400, 350))
         self.screen.blit(restart_text, restart_rect)
 
@@ -1020,19 +1028,19 @@ class VisualBattleGame:
         self.screen.blit(overlay, (0, 0))
 
         # Victory text with glow effect
-        victory_text = self.title_font.render("VICTORY!", True, (255, 215, 0))
+        victory_text = self.text_cache.render(self.title_font, "VICTORY!", (255, 215, 0))
         victory_rect = victory_text.get_rect(center=(400, 100))
         self.screen.blit(victory_text, victory_rect)
 
         # Boss defeated
-        boss_text = self.font.render(f"You defeated {self.wizard.name}!", True, (255, 255, 255))
+        boss_text = self.text_cache.render(self.font, f"You defeated {self.wizard.name}!", (255, 255, 255))
         boss_rect = boss_text.get_rect(center=(400, 170))
         self.screen.blit(boss_text, boss_rect)
 
         # XP gained
         if hasattr(self.wizard, 'get_exp_reward'):
             exp_gained = self.wizard.get_exp_reward()
-            exp_text = self.font.render(f"✨ Experience Gained: {exp_gained} XP", True, (100, 255, 100))
+            exp_text = self.text_cache.render(self.font, f"✨ Experience Gained: {exp_gained} XP", (100, 255, 100))
             exp_rect = exp_text.get_rect(center=(400, 230))
             self.screen.blit(exp_text, exp_rect)
 
@@ -1046,17 +1054,17 @@ class VisualBattleGame:
         ]
 
         for stat in stats:
-            stat_surf = self.small_font.render(stat, True, (200, 200, 255))
+            stat_surf = self.text_cache.render(self.small_font, stat, (200, 200, 255))
             stat_rect = stat_surf.get_rect(center=(400, y_offset))
             self.screen.blit(stat_surf, stat_rect)
             y_offset += 30
 
         # Continue option
-        continue_text = self.font.render("Press SPACE to continue", True, (255, 215, 0))
+        continue_text = self.text_cache.render(self.font, "Press SPACE to continue", (255, 215, 0))
         continue_rect = continue_text.get_rect(center=(400, 500))
         self.screen.blit(continue_text, continue_rect)
 
-        close_text = self.small_font.render("or close window to exit", True, (150, 150, 150))
+        close_text = self.text_cache.render(self.small_font, "or close window to exit", (150, 150, 150))
         close_rect = close_text.get_rect(center=(400, 540))
         self.screen.blit(close_text, close_rect)
 
@@ -1596,12 +1604,12 @@ class VisualBattleGame:
         self.screen.fill((20, 20, 40))
 
         # Title
-        title = self.title_font.render("Create Your Hero", True, (255, 215, 0))
+        title = self.text_cache.render(self.title_font, "Create Your Hero", (255, 215, 0))
         title_rect = title.get_rect(center=(400, 60))
         self.screen.blit(title, title_rect)
 
         # Instructions
-        instruction = self.small_font.render("Choose your class:", True, (255, 255, 255))
+        instruction = self.text_cache.render(self.small_font, "Choose your class:", (255, 255, 255))
         self.screen.blit(instruction, (50, 130))
 
         # Class selection cards - arranged in a single row
@@ -1638,7 +1646,7 @@ class VisualBattleGame:
             self.draw_character_sprite(temp_char, button_rect.centerx, sprite_y, 45)
 
             # Class name
-            name_surf = self.small_font.render(class_name, True, (255, 255, 255))
+            name_surf = self.text_cache.render(self.small_font, class_name, (255, 255, 255))
             name_rect = name_surf.get_rect(center=(button_rect.centerx, button_rect.bottom - 50))
             self.screen.blit(name_surf, name_rect)
 
@@ -1649,13 +1657,13 @@ class VisualBattleGame:
             ]
             y_offset = button_rect.bottom - 32
             for stat in stats:
-                stat_surf = self.small_font.render(stat, True, (200, 200, 200))
+                stat_surf = self.text_cache.render(self.small_font, stat, (200, 200, 200))
                 stat_rect = stat_surf.get_rect(center=(button_rect.centerx, y_offset))
                 self.screen.blit(stat_surf, stat_rect)
                 y_offset += 16
 
         # Name input section
-        name_label = self.font.render("Enter your name:", True, (255, 255, 255))
+        name_label = self.text_cache.render(self.font, "Enter your name:", (255, 255, 255))
         self.screen.blit(name_label, (50, 400))
 
         # Name input box
@@ -1666,7 +1674,7 @@ class VisualBattleGame:
 
         # Display current name
         name_display = self.player_name if self.player_name else "Hero"
-        name_surf = self.font.render(name_display, True, (255, 255, 255))
+        name_surf = self.text_cache.render(self.font, name_display, (255, 255, 255))
         self.screen.blit(name_surf, (60, 448))
 
         # Cursor blink when active
@@ -1686,12 +1694,12 @@ class VisualBattleGame:
         pygame.draw.rect(self.screen, button_color, self.start_button, border_radius=10)
         pygame.draw.rect(self.screen, (255, 255, 255), self.start_button, 2, border_radius=10)
 
-        start_text = self.font.render("START BATTLE!", True, (255, 255, 255))
+        start_text = self.text_cache.render(self.font, "START BATTLE!", (255, 255, 255))
         start_rect = start_text.get_rect(center=self.start_button.center)
         self.screen.blit(start_text, start_rect)
 
         if not can_start:
-            hint = self.small_font.render("Select a class to continue", True, (200, 100, 100))
+            hint = self.text_cache.render(self.small_font, "Select a class to continue", (200, 100, 100))
             hint_rect = hint.get_rect(center=(400, 575))
             self.screen.blit(hint, hint_rect)
 
@@ -1716,7 +1724,7 @@ class VisualBattleGame:
         self.screen.fill((20, 20, 40))
 
         # Title
-        title = self.title_font.render("Choose Your Opponent", True, (255, 69, 0))
+        title = self.text_cache.render(self.title_font, "Choose Your Opponent", (255, 69, 0))
         title_rect = title.get_rect(center=(400, 40))
         self.screen.blit(title, title_rect)
 
@@ -1742,13 +1750,13 @@ class VisualBattleGame:
             lines = boss_name.split('\n')
             y_offset = y + 20
             for line in lines:
-                name_surf = self.small_font.render(line, True, (255, 255, 255))
+                name_surf = self.text_cache.render(self.small_font, line, (255, 255, 255))
                 name_rect = name_surf.get_rect(center=(x + 100, y_offset))
                 self.screen.blit(name_surf, name_rect)
                 y_offset += 25
 
             # Description
-            desc_surf = self.small_font.render(desc, True, (200, 200, 200))
+            desc_surf = self.text_cache.render(self.small_font, desc, (200, 200, 200))
             desc_rect = desc_surf.get_rect(center=(x + 100, y + 110))
             self.screen.blit(desc_surf, desc_rect)
 
@@ -1758,7 +1766,7 @@ class VisualBattleGame:
             self.boss_buttons[boss_id] = rect
 
         # Instructions
-        inst = self.font.render("Click to select your opponent", True, (255, 255, 255))
+        inst = self.text_cache.render(self.font, "Click to select your opponent", (255, 255, 255))
         self.screen.blit(inst, (180, 560))
 
     def draw_difficulty_selection(self, mouse_pos):
@@ -1766,7 +1774,7 @@ class VisualBattleGame:
         self.screen.fill((20, 20, 40))
 
         # Title
-        title = self.title_font.render("Choose Difficulty", True, (255, 215, 0))
+        title = self.text_cache.render(self.title_font, "Choose Difficulty", (255, 215, 0))
         title_rect = title.get_rect(center=(400, 60))
         self.screen.blit(title, title_rect)
 
@@ -1789,18 +1797,18 @@ class VisualBattleGame:
             pygame.draw.rect(self.screen, border_color, rect, 3, border_radius=10)
 
             # Difficulty name
-            name_surf = self.font.render(diff_name, True, (255, 255, 255))
+            name_surf = self.text_cache.render(self.font, diff_name, (255, 255, 255))
             name_rect = name_surf.get_rect(center=(x + 70, y + 240))
             self.screen.blit(name_surf, name_rect)
 
             # Stats
-            stat_surf = self.small_font.render(desc, True, (200, 200, 200))
+            stat_surf = self.text_cache.render(self.small_font, desc, (200, 200, 200))
             stat_rect = stat_surf.get_rect(center=(x + 70, y + 270))
             self.screen.blit(stat_surf, stat_rect)
 
             # Reward multiplier
             reward = f"XP x{multiplier}"
-            reward_surf = self.small_font.render(reward, True, (255, 215, 0))
+            reward_surf = self.text_cache.render(self.small_font, reward, (255, 215, 0))
             reward_rect = reward_surf.get_rect(center=(x + 70, y + 300))
             self.screen.blit(reward_surf, reward_rect)
 
@@ -1810,7 +1818,7 @@ class VisualBattleGame:
             self.difficulty_buttons[diff_id] = (rect, multiplier)
 
         # Instructions
-        inst = self.font.render("Click to select difficulty", True, (255, 255, 255))
+        inst = self.text_cache.render(self.font, "Click to select difficulty", (255, 255, 255))
         self.screen.blit(inst, (220, 480))
 
     def run(self):
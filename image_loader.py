@@ -0,0 +1,64 @@
+import os
+import time
+import pygame
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class ImageLoader:
+    """Image files decoded on a thread pool, converted on the caller's thread
+
+    request() hands a batch of paths to the pool, which reads and decodes
+    them in parallel (pygame.image.load lets go of the GIL while SDL_image
+    decodes). load() then waits for one path and returns the raw surface;
+    converting it to the display format is left to the caller, on the main
+    thread, once the display exists. Paths that weren't requested first are
+    decoded right there. Raises like pygame.image.load. close() stops the
+    threads once a batch is done; the next request() starts them again.
+    """
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pool: Optional[ThreadPoolExecutor] = None
+        self.pending: Dict[str, Future] = {}
+        self.decoded = 0
+        self.decode_time = 0.0  # Summed over every decode, on whichever thread ran it
+        self.wait_time = 0.0  # Spent in load(), by the caller
+
+    def request(self, paths: Iterable[str]):
+        """Start decoding files that exist and aren't already queued"""
+        for path in paths:
+            if path not in self.pending and os.path.exists(path):
+                if self.pool is None:
+                    self.pool = ThreadPoolExecutor(self.workers, thread_name_prefix="image-decode")
+                self.pending[path] = self.pool.submit(self.decode, path)
+
+    @staticmethod
+    def decode(path: str) -> Tuple[pygame.Surface, float]:
+        """Read and decode one file, and how long that took"""
+        start = time.perf_counter()
+        surface = pygame.image.load(path)
+        return surface, time.perf_counter() - start
+
+    def load(self, path: str) -> pygame.Surface:
+        """Decoded but unconverted surface for path"""
+        start = time.perf_counter()
+        future = self.pending.pop(path, None)
+        surface, seconds = future.result() if future else self.decode(path)
+        self.wait_time += time.perf_counter() - start
+        self.decode_time += seconds
+        self.decoded += 1
+        return surface
+
+    def report(self) -> str:
+        """One line of decode timings"""
+        return (f"Decoded {self.decoded} images on {self.workers} threads: "
+                f"{self.decode_time * 1000:.1f} ms of decoding, {self.wait_time * 1000:.1f} ms waited for")
+
+    def close(self):
+        """Drop anything requested but never loaded and stop the threads"""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        if self.pool:
+            self.pool.shutdown(wait=False)
+            self.pool = None
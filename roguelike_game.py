@@ -4,13 +4,29 @@ Tiny Swords Roguelike - A survival roguelike game inspired by Don't Starve Toget
 Using assets from the Tiny Swords pack
 """
 
+import argparse
+import copy
+import csv
+import heapq
+import json
+import numpy as np
 import pygame
+import queue
 import random
 import math
 import os
+import re
+import struct
+import threading
+import time as systime
+import zlib
+from collections import OrderedDict, deque
 from enum import Enum
-from dataclasses import dataclass
-from typing import List, Tuple, Optional, Dict
+from dataclasses import dataclass, field
+from typing import List, Tuple, Optional, Dict, NamedTuple
+
+from image_loader import ImageLoader
+from text_cache import TextCache
 
 # Initialize Pygame
 pygame.init()
@@ -36,8 +52,165 @@ NIGHT_LENGTH = 360  # 6 seconds per night
 HUNGER_DECAY_RATE = 0.02  # Per second
 SANITY_DECAY_NIGHT = 0.05  # Per second at night
 WORLD_SIZE = 120  # Larger world for more exploration
+SPATIAL_CELL = 8  # Tiles per side of a SpatialGrid cell
+WEATHER_CHANGE_INTERVAL = 300  # Seconds between weather changes
+SEASON_LENGTH = 2400  # Seconds per season
+CAMPFIRE_BURN_RATE = 2  # Fuel per second
 TEMPERATURE_COLOR = (100, 200, 255)  # Light blue for temperature
 
+# Presentation of gameplay events
+DAMAGE_STYLES = {  # source: (number color, particle count, particle color)
+    "melee": ((255, 100, 100), 8, (255, 50, 50)),
+    "enemy": ((255, 255, 100), 6, (255, 200, 0)),
+    "whirlwind": ((255, 150, 0), 10, (255, 100, 0)),
+    "arcane_blast": ((150, 100, 255), 0, None),
+    "volley": ((100, 255, 100), 5, (150, 255, 150)),
+}
+HARVEST_PARTICLES = {  # obj_type: (particle count, color)
+    "tree": (5, (139, 69, 19)),  # Wood particles
+    "rock": (5, (150, 150, 150)),  # Stone particles
+    "bush": (4, (50, 200, 50)),  # Plant particles
+    "mushroom_patch": (4, (50, 200, 50)),
+    "cactus": (4, (50, 200, 50)),
+}
+
+# Particles
+PARTICLE_FADE_TIME = 0.8  # Seconds from full opacity to invisible
+PARTICLE_ALPHA_BUCKETS = 16  # Distinct alpha levels with a pre-rendered sprite
+PARTICLE_GRAVITY = 100
+
+# Weather
+WEATHER_CAPACITY = 600  # Drops or flakes in the fixed screen-space buffers
+WEATHER_FADE_TIME = 3.0  # Seconds for weather to fade fully in or out
+LIGHTNING_INTERVAL = (4.0, 12.0)  # Seconds between storm flashes
+LIGHTNING_FLASH_TIME = 0.35
+
+# Night lighting
+LIGHT_MAP_SCALE = 4  # Light map is rendered at 1/LIGHT_MAP_SCALE screen resolution
+LIGHT_BUDGET = 128  # Most light stamps drawn per frame, nearest to the camera first
+CAMPFIRE_LIGHT = (255, 180, 110)
+TORCH_LIGHT = (255, 215, 160)
+TORCH_LIGHT_RADIUS = 3  # Tiles
+
+# Quality governor
+GOVERNOR_WINDOW = 60  # Frames averaged per quality decision
+GOVERNOR_OVER_BUDGET = 1.1  # Average above budget * this steps quality down
+GOVERNOR_HEADROOM = 0.6  # Average below budget * this counts towards stepping up
+GOVERNOR_RAISE_WINDOWS = 3  # Consecutive windows with headroom before stepping up
+
+# Render profiler
+PROFILER_WINDOW = 240  # Frames behind each pass's rolling average and p99
+PROFILER_PASSES = ("terrain", "objects", "particles", "damage", "harvest", "fog", "weather", "night", "hud",
+                   "minimap")  # draw_game's passes, in drawing order
+ENEMY_LOD_STEP = 0.25  # Seconds between updates for enemies outside the LOD radius
+
+# World object rendering, resolved into GameState.zoom_registries as each type is first drawn
+RENDER_TYPES = {  # render id: (asset key, fallback shape, fallback color, fallback size)
+    "tree1": ("tree1", "circle", (34, 100, 34), 12),
+    "tree2": ("tree2", "circle", (34, 100, 34), 12),
+    "tree3": ("tree3", "circle", (34, 100, 34), 12),
+    "tree4": ("tree4", "circle", (34, 100, 34), 12),
+    "rock1": ("rock1", "circle", (128, 128, 128), 10),
+    "rock2": ("rock2", "circle", (128, 128, 128), 10),
+    "rock3": ("rock3", "circle", (128, 128, 128), 10),
+    "rock4": ("rock4", "circle", (128, 128, 128), 10),
+    "bush1": ("bush1", "circle", (50, 150, 50), 8),
+    "bush2": ("bush2", "circle", (50, 150, 50), 8),
+    "bush3": ("bush3", "circle", (50, 150, 50), 8),
+    "bush4": ("bush4", "circle", (50, 150, 50), 8),
+    "mushroom_patch": ("mushroom", "circle", (138, 43, 226), 8),
+    "cactus": ("cactus", "circle", (0, 100, 0), 10),
+    "ice_deposit": ("ice", "circle", (173, 216, 230), 10),
+    "iron_deposit": ("iron_ore", "circle", (169, 169, 169), 10),
+    "gold_deposit": ("gold_ore", "circle", (255, 215, 0), 10),
+    "gem_deposit": ("gems", "circle", (255, 20, 147), 8),
+    "ancient_ruin": ("ruin", "rect", (139, 69, 19), 8),
+    "cave_entrance": ("cave", "circle", (0, 0, 0), 12),
+    "campfire": ("campfire", "circle", (255, 100, 0), 10),
+    "campfire_out": ("campfire_out", "circle", (90, 60, 40), 10),
+    "wooden_wall": (None, "rect", (139, 69, 19), 12),
+    "goblin": ("goblin", "circle", (0, 150, 0), 10),
+    "wolf": ("wolf", "circle", (100, 100, 100), 12),
+    "wizard_boss": ("wizard", "circle", (128, 0, 128), 16),
+    "warrior": ("warrior", "circle", (255, 255, 0), 16),
+    "mage": ("mage", "circle", (255, 255, 0), 16),
+    "archer": ("archer", "circle", (255, 255, 0), 16),
+    "paladin": ("paladin", "circle", (255, 255, 0), 16),
+}
+
+WALL_RENDER_IDS = tuple(f"wooden_wall_{mask}" for mask in range(16))  # wooden_wall joined to the walls in mask's N/E/S/W bits
+
+# Sprite sources, loaded by AssetManager on first use. Kinds: "sheet" is the
+# first square frame of a character sheet, "image" a whole file, "atlas" a
+# 32rogues sprite by name and "strip" a 32rogues animation strip
+DECORATIONS = "Tiny Swords (Free Pack)/Decorations"
+ASSET_MANIFEST = {  # asset key: sources tried in order, each (kind, file under ./assets or sprite name, size or None)
+    "warrior": (("sheet", "warrior.png", 48),),
+    "mage": (("sheet", "mage.png", 48),),
+    "archer": (("sheet", "archer.png", 48),),
+    "paladin": (("sheet", "paladin.png", 48),),
+    "wizard": (("sheet", "wizard.png", 48),),
+    "tree1": (("image", f"{DECORATIONS}/Trees/Tree1.png", 48), ("image", "tree1.png", 32)),
+    "tree2": (("image", f"{DECORATIONS}/Trees/Tree2.png", 48), ("image", "tree2.png", 32)),
+    "tree3": (("image", f"{DECORATIONS}/Trees/Tree3.png", 48),),
+    "tree4": (("image", f"{DECORATIONS}/Trees/Tree4.png", 48),),
+    "rock1": (("image", f"{DECORATIONS}/Rocks/Rock1.png", 32), ("image", "rock1.png", 32)),
+    "rock2": (("image", f"{DECORATIONS}/Rocks/Rock2.png", 32), ("image", "rock2.png", 32)),
+    "rock3": (("image", f"{DECORATIONS}/Rocks/Rock3.png", 32),),
+    "rock4": (("image", f"{DECORATIONS}/Rocks/Rock4.png", 32),),
+    "bush1": (("image", f"{DECORATIONS}/Bushes/Bushe1.png", 32), ("image", "bush1.png", 32)),  # Sic
+    "bush2": (("image", f"{DECORATIONS}/Bushes/Bushe2.png", 32), ("image", "bush2.png", 32)),
+    "bush3": (("image", f"{DECORATIONS}/Bushes/Bushe3.png", 32),),
+    "bush4": (("image", f"{DECORATIONS}/Bushes/Bushe4.png", 32),),
+    "mushroom": (("atlas", "large mushroom", 32),),
+    "ice": (("atlas", "blue stone floor 1 (blue bg)", 32),),
+    "iron_ore": (("atlas", "ore sack", 32),),
+    "gold_ore": (("atlas", "large stacks of coins", 32),),
+    "gems": (("atlas", "crystal pendant", 32),),
+    "ruin": (("atlas", "sarcophagus (closed)", 32),),
+    "cave": (("atlas", "staircase down", 32),),
+    "goblin": (("atlas", "goblin", 32),),
+    "wolf": (("atlas", "warg/dire wolf", 32),),
+    "campfire": (("strip", "animated-tiles:fire pit (lit)", None),),
+    "campfire_out": (("strip", "animated-tiles:fire pit (unlit)", None),),
+}
+ASSET_WARMUP = ("goblin", "wolf", "campfire")  # Loaded at game start as well as what's in view: drawn soon after
+ASSET_CACHE_PATH = "./assets/.asset_cache"  # Decoded, scaled pixels of everything above and the terrain
+ASSET_CACHE_MAGIC = b"TSAC"
+ASSET_CACHE_VERSION = 1  # Bump when the way any cached surface is built changes
+
+# Terrain rendering
+CHUNK_TILES = 16  # Terrain is pre-rendered in CHUNK_TILES x CHUNK_TILES blocks
+TERRAIN_CHUNK_CACHE_SIZE = 24  # 1:1 chunks kept before evicting the oldest; budgeted in pixels across zoom levels
+ZOOM_TILE_SIZES = (16, 24, 32, 48, 64)  # On-screen tile size at each zoom level, zoomed out first
+MINIMAP_SIZE = 160  # Pixels per side
+
+# Autotiling
+AUTOTILE_NEIGHBORS = ((0, -1), (1, 0), (0, 1), (-1, 0), (1, -1), (1, 1), (-1, 1), (-1, -1))  # Mask bits N, E, S, W, NE, SE, SW, NW
+AUTOTILE_CORNERS = ((0, 1), (1, 2), (2, 3), (3, 0))  # Edge bits that must both be set for each corner bit to count
+AUTOTILE_FULL = 255  # Connected all round: no border
+AUTOTILE_OUTSIDE = 255  # Tile id beyond the world's edge, connected to everything
+
+# Animation
+ANIMATION_FPS = 8  # Frame rate of every animated tile and sprite, all driven by one clock
+
+# Fog of war
+FOG_REVEAL_RADIUS = 7  # Tiles around the player marked explored
+FOG_CLEAR = (255, 0, 255)  # Colorkey marking explored tiles in fog masks and overlays
+FOG_MAGIC = b"TSFW"
+FOG_VERSION = 1
+
+# Input recording / replay
+REPLAY_MAGIC = b"TSRP"
+REPLAY_VERSION = 1
+HELD_UP = 1
+HELD_DOWN = 2
+HELD_LEFT = 4
+HELD_RIGHT = 8
+HELD_SPRINT = 16
+ACTION_KEY = 0
+ACTION_CLICK = 1
+
 
 class BiomeType(Enum):
     """Different biome types"""
@@ -60,6 +233,41 @@ class TileType(Enum):
     LAVA = 6
 
 
+TILE_COLORS = {
+    TileType.GRASS: (34, 139, 34),
+    TileType.WATER: (30, 144, 255),
+    TileType.SAND: (194, 178, 128),
+    TileType.STONE: (128, 128, 128),
+    TileType.SWAMP: (74, 93, 35),
+    TileType.SNOW: (235, 240, 245),
+    TileType.LAVA: (207, 66, 22),
+}
+TILE_DETAILS = {  # Floor detail from the 32rogues tiles sheet drawn over the tile colour
+    TileType.SAND: "dirt 1 (no bg)",
+    TileType.STONE: "stone floor 1 (no bg)",
+    TileType.SWAMP: "grass 1 (no bg)",
+    TileType.SNOW: "floor stone 1 (no bg)",
+    TileType.LAVA: "red stone floor 1 (no bg)",
+}
+ANIMATED_TILES = {  # tile: (animated-tiles strip laid over its texture, recolor or None)
+    TileType.WATER: ("water waves", None),
+    TileType.SWAMP: ("poison bubbles", None),
+    TileType.LAVA: ("poison bubbles", (255, 170, 60)),
+}
+AUTOTILES = {  # tile: first row of its 12x4 block of borders in 32rogues/autotiles.png
+    TileType.WATER: 0,
+    TileType.SWAMP: 4,
+}
+MINIMAP_BIOME_SHADE = {  # Brightness of each biome's tiles on the minimap
+    BiomeType.GRASSLAND: 1.0,
+    BiomeType.FOREST: 0.75,
+    BiomeType.DESERT: 1.0,
+    BiomeType.SWAMP: 0.85,
+    BiomeType.TUNDRA: 0.95,
+    BiomeType.VOLCANIC: 0.8,
+}
+
+
 class Season(Enum):
     """Game seasons"""
     SPRING = "spring"
@@ -76,6 +284,13 @@ class Weather(Enum):
     STORM = "storm"
 
 
+WEATHER_STYLES = {  # weather: (share of WEATHER_CAPACITY shown, fall speed range and wind in px/s, snowflakes)
+    Weather.RAIN: (0.6, (520, 700), 60, False),
+    Weather.SNOW: (0.5, (40, 90), 20, True),
+    Weather.STORM: (1.0, (760, 940), 280, False),
+}
+
+
 class ResourceType(Enum):
     """Types of resources"""
     # Raw materials
@@ -160,12 +375,114 @@ class Recipe:
     tool_required: Optional[ItemType] = None
 
 
+class DamageEvent(NamedTuple):
+    """Something took damage; source picks the presentation style"""
+    x: float
+    y: float
+    amount: int
+    source: str  # "melee", "enemy", "whirlwind", "arcane_blast", "volley"
+
+
+class AbilityEvent(NamedTuple):
+    """A class ability went off (effects that aren't tied to a single hit)"""
+    ability: str  # "whirlwind", "arcane_blast", "divine_shield"
+    x: float
+    y: float
+    target_x: float = 0.0
+    target_y: float = 0.0
+    amount: int = 0
+
+
+class HarvestEvent(NamedTuple):
+    """A resource node was hit"""
+    x: float
+    y: float
+    obj_type: str
+
+
+class DeathEvent(NamedTuple):
+    """An enemy died"""
+    x: float
+    y: float
+    enemy_type: str
+
+
+class LootEvent(NamedTuple):
+    """The player received resources"""
+    x: float
+    y: float
+    resource: ResourceType
+    amount: int
+
+
+class CraftEvent(NamedTuple):
+    """The player crafted an item"""
+    item_type: ItemType
+
+
+class BuildingPlacedEvent(NamedTuple):
+    """A building was placed on a tile"""
+    x: int
+    y: int
+    building_type: str
+
+
+class TileChangedEvent(NamedTuple):
+    """A world tile was replaced after generation"""
+    x: int
+    y: int
+    tile: TileType
+
+
+class EventBus:
+    """Per-tick buffer of gameplay events
+
+    Simulation code emits events as they happen; flush() hands each
+    listener the whole batch of its event type once per tick. Events
+    nobody listens to are dropped at emit time, so a headless run without
+    presentation listeners pays nothing for visual effects.
+    """
+    def __init__(self):
+        self.listeners: Dict[type, list] = {}
+        self.pending: list = []
+
+    def subscribe(self, event_type: type, listener):
+        """Call listener(events) with each tick's batch of event_type"""
+        self.listeners.setdefault(event_type, []).append(listener)
+
+    def emit(self, event):
+        """Queue an event for the end of the tick"""
+        if type(event) in self.listeners:
+            self.pending.append(event)
+
+    def take(self) -> list:
+        """Remove and return the events buffered so far"""
+        events, self.pending = self.pending, []
+        return events
+
+    def dispatch(self, events: list):
+        """Deliver a batch of events to listeners, grouped by type"""
+        batches: Dict[type, list] = {}
+        for event in events:
+            batches.setdefault(type(event), []).append(event)
+
+        for event_type, batch in batches.items():
+            for listener in self.listeners.get(event_type, ()):
+                listener(batch)
+
+    def flush(self):
+        """Deliver this tick's events to listeners in batches"""
+        if self.pending:
+            self.dispatch(self.take())
+
+
 class WorldObject:
     """Base class for objects in the world"""
     def __init__(self, x: int, y: int, obj_type: str):
         self.x = x
         self.y = y
         self.obj_type = obj_type
+        self.render_id = obj_type  # Key into RENDER_TYPES
         self.health = 100
         self.max_health = 100
         self.harvestable = True
@@ -187,6 +504,7 @@ class Tree(WorldObject):
     def __init__(self, x: int, y: int, variant: int = 1):
         super().__init__(x, y, "tree")
         self.variant = variant
+        self.render_id = f"tree{variant}"
         self.resource_type = ResourceType.WOOD
         self.resource_amount = random.randint(3, 6)
         self.health = 50
@@ -198,6 +516,7 @@ class Rock(WorldObject):
     def __init__(self, x: int, y: int, variant: int = 1):
         super().__init__(x, y, "rock")
         self.variant = variant
+        self.render_id = f"rock{variant}"
         self.resource_type = ResourceType.STONE
         self.resource_amount = random.randint(2, 4)
         self.health = 60
@@ -209,13 +528,17 @@ class Bush(WorldObject):
     def __init__(self, x: int, y: int, variant: int = 1):
         super().__init__(x, y, "bush")
         self.variant = variant
+        self.render_id = f"bush{variant}"
         self.resource_type = ResourceType.BERRIES
         self.resource_amount = random.randint(1, 3)
         self.health = 20
         self.max_health = 20
-        self.regrow_timer = 0
         self.regrow_time = 300  # 5 seconds
 
+    def regrow(self):
+        """Refill berries after being picked clean"""
+        self.resource_amount = random.randint(1, 3)
+
 
 class MushroomPatch(WorldObject):
     """Mushroom patch in swamps"""
@@ -225,9 +548,12 @@ class MushroomPatch(WorldObject):
         self.resource_amount = random.randint(2, 5)
         self.health = 15
         self.max_health = 15
-        self.regrow_timer = 0
         self.regrow_time = 600  # 10 seconds to regrow
 
+    def regrow(self):
+        """Grow a fresh batch of mushrooms"""
+        self.resource_amount = random.randint(2, 5)
+
 
 class CactusPlant(WorldObject):
     """Cactus plant in deserts"""
@@ -314,12 +640,14 @@ class Building(WorldObject):
             self.health = 100
             self.max_health = 100
 
-    def update(self, dt: float):
-        """Update building (e.g., campfire fuel)"""
-        if self.building_type == "campfire" and self.fuel > 0:
-            self.fuel -= dt * 2  # Burns fuel over time
-            if self.fuel <= 0:
-                self.fuel = 0
+    def ignite(self, scheduler: "Scheduler"):
+        """Light a campfire; its fuel is settled when the burn-out event fires"""
+        scheduler.schedule(self.fuel / CAMPFIRE_BURN_RATE, self.burn_out)
+
+    def burn_out(self):
+        """Campfire ran out of fuel"""
+        self.fuel = 0
+        self.render_id = "campfire_out"
 
 
 class Enemy(WorldObject):
@@ -329,6 +657,7 @@ class Enemy(WorldObject):
         self.x = float(x)  # Enemies use float positions
         self.y = float(y)
         self.enemy_type = enemy_type
+        self.render_id = enemy_type
         self.harvestable = False
 
         # Stats based on type
@@ -357,8 +686,9 @@ class Enemy(WorldObject):
         self.target = None
         self.attack_cooldown = 0
         self.attack_speed = 1.0  # Attacks per second
+        self.lod_time = 0.0  # Time banked while skipped by enemy LOD
 
-    def update(self, dt: float, player, game_state=None):
+    def update(self, dt: float, player, events: Optional[EventBus] = None):
         """Update enemy AI"""
         # Calculate distance to player
         dist = math.sqrt((self.x - player.x)**2 + (self.y - player.y)**2)
@@ -381,20 +711,18 @@ class Enemy(WorldObject):
 
             # Attack if in range
             elif self.attack_cooldown <= 0:
-                self.attack(player, game_state)
+                self.attack(player, events)
                 self.attack_cooldown = 1.0 / self.attack_speed
 
         # Update cooldown
         if self.attack_cooldown > 0:
             self.attack_cooldown -= dt
 
-    def attack(self, player, game_state=None):
+    def attack(self, player, events: Optional[EventBus] = None):
         """Attack player"""
         player.take_damage(self.damage)
-        # Add visual feedback if game state available
-        if game_state:
-            game_state.add_damage_number(player.x, player.y, self.damage, (255, 255, 100))
-            game_state.add_particles(player.x, player.y, 6, (255, 200, 0))
+        if events:
+            events.emit(DamageEvent(player.x, player.y, self.damage, "enemy"))
 
     def drop_loot(self) -> Dict[ResourceType, int]:
         """Return loot when enemy dies"""
@@ -417,6 +745,7 @@ class Player:
         self.x = x
         self.y = y
         self.char_class = char_class
+        self.render_id = char_class
 
         # Survival stats
         self.max_health = 100
@@ -669,7 +998,7 @@ class Player:
     def has_resources(self, requirements: Dict[ResourceType, int]) -> bool:
         """Check if player has required resources"""
         for resource, amount in requirements.items():
-            if self.resources[resource] < amount:
+            if self.resources.get(resource, 0) < amount:
                 return False
         return True
 
@@ -701,7 +1030,7 @@ class Player:
         self.health = max(0, self.health - damage)
         self.sanity = max(0, self.sanity - 5)  # Losing health also affects sanity
 
-    def use_ability(self, world, game_state) -> bool:
+    def use_ability(self, world) -> bool:
         """Use class-specific ability. Returns True if used successfully."""
         if self.ability_cooldown > 0:
             return False  # Still on cooldown
@@ -715,13 +1044,12 @@ class Player:
                 if dist <= 3.0:  # 3 tile radius
                     damage = 30
                     enemy.health -= damage
-                    game_state.add_damage_number(enemy.x, enemy.y, damage, (255, 150, 0))
-                    game_state.add_particles(enemy.x, enemy.y, 10, (255, 100, 0))
+                    world.events.emit(DamageEvent(enemy.x, enemy.y, damage, "whirlwind"))
                     enemies_hit += 1
 
             if enemies_hit > 0:
                 self.ability_cooldown = self.ability_cooldown_time
-                game_state.add_particles(self.x, self.y, 20, (255, 200, 0))
+                world.events.emit(AbilityEvent("whirlwind", self.x, self.y))
                 return True
 
         elif self.char_class == "mage":
@@ -738,13 +1066,9 @@ class Player:
             if nearest_enemy:
                 damage = 50
                 nearest_enemy.health -= damage
-                game_state.add_damage_number(nearest_enemy.x, nearest_enemy.y, damage, (150, 100, 255))
-                # Create projectile particles
-                for i in range(10):
-                    t = i / 10.0
-                    px = self.x + (nearest_enemy.x - self.x) * t
-                    py = self.y + (nearest_enemy.y - self.y) * t
-                    game_state.add_particles(px, py, 3, (200, 150, 255))
+                world.events.emit(DamageEvent(nearest_enemy.x, nearest_enemy.y, damage, "arcane_blast"))
+                world.events.emit(AbilityEvent("arcane_blast", self.x, self.y,
+                                               nearest_enemy.x, nearest_enemy.y))
 
                 self.ability_cooldown = self.ability_cooldown_time
                 return True
@@ -764,8 +1088,7 @@ class Player:
                 enemy = enemies_in_range[i][1]
                 damage = 25
                 enemy.health -= damage
-                game_state.add_damage_number(enemy.x, enemy.y, damage, (100, 255, 100))
-                game_state.add_particles(enemy.x, enemy.y, 5, (150, 255, 150))
+                world.events.emit(DamageEvent(enemy.x, enemy.y, damage, "volley"))
 
             if hit_count > 0:
                 self.ability_cooldown = self.ability_cooldown_time
@@ -778,8 +1101,7 @@ class Player:
             self.ability_duration = 3.0  # 3 seconds of protection
             self.ability_active = True
 
-            game_state.add_damage_number(self.x, self.y, heal_amount, (255, 255, 150))
-            game_state.add_particles(self.x, self.y, 15, (255, 255, 200))
+            world.events.emit(AbilityEvent("divine_shield", self.x, self.y, amount=heal_amount))
 
             self.ability_cooldown = self.ability_cooldown_time
             return True
@@ -797,6 +1119,80 @@ class Player:
                 self.ability_active = False
 
 
+class Scheduler:
+    """Heap of timed world events
+
+    Systems register a deadline once (a bush regrowing, a campfire burning
+    out, the next weather change) instead of being polled every frame, so
+    advancing time only costs as much as the events that are actually due.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self._queue: List[tuple] = []  # (deadline, sequence, callback, args)
+        self._sequence = 0  # Keeps same-deadline events in registration order
+
+    def schedule(self, delay: float, callback, *args):
+        """Call callback(*args) once delay seconds have passed"""
+        heapq.heappush(self._queue, (self.now + delay, self._sequence, callback, args))
+        self._sequence += 1
+
+    def advance(self, dt: float):
+        """Move time forward and fire every event that is due"""
+        self.now += dt
+        while self._queue and self._queue[0][0] <= self.now:
+            _, _, callback, args = heapq.heappop(self._queue)
+            callback(*args)
+
+
+class SpatialGrid:
+    """Buckets world objects into SPATIAL_CELL x SPATIAL_CELL tile cells
+
+    Lets the renderer ask for what is around the camera without walking
+    every object in the world. Items that move must report it via move().
+    """
+    def __init__(self, cell_size: int = SPATIAL_CELL):
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], list] = {}
+
+    def cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        """Cell coordinates containing a tile position"""
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def insert(self, item):
+        """Index an item at its current position"""
+        self.cells.setdefault(self.cell_of(item.x, item.y), []).append(item)
+
+    def remove(self, item):
+        """Drop an item indexed at its current position"""
+        key = self.cell_of(item.x, item.y)
+        cell = self.cells[key]
+        cell.remove(item)
+        if not cell:
+            del self.cells[key]
+
+    def move(self, item, old_x: float, old_y: float):
+        """Re-bucket an item that moved from (old_x, old_y)"""
+        old_key = self.cell_of(old_x, old_y)
+        if old_key != self.cell_of(item.x, item.y):
+            cell = self.cells[old_key]
+            cell.remove(item)
+            if not cell:
+                del self.cells[old_key]
+            self.insert(item)
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list:
+        """Items in every cell overlapping the tile rectangle"""
+        start_cx, start_cy = self.cell_of(min_x, min_y)
+        end_cx, end_cy = self.cell_of(max_x, max_y)
+        found = []
+        for cy in range(start_cy, end_cy + 1):
+            for cx in range(start_cx, end_cx + 1):
+                cell = self.cells.get((cx, cy))
+                if cell:
+                    found.extend(cell)
+        return found
+
+
 class World:
     """Advanced game world with biomes, seasons, and weather"""
     def __init__(self, seed: Optional[int] = None):
@@ -815,8 +1211,10 @@ class World:
         # Dynamic systems
         self.current_season = Season.SPRING
         self.current_weather = Weather.CLEAR
-        self.weather_timer = 0
-        self.season_timer = 0
+        self.events = EventBus()
+        self.scheduler = Scheduler()
+        self.scheduler.schedule(WEATHER_CHANGE_INTERVAL, self.on_weather_timer)
+        self.scheduler.schedule(SEASON_LENGTH, self.on_season_timer)
 
         # Special locations
         self.ruins_locations = []
@@ -825,6 +1223,11 @@ class World:
 
         self.generate_world()
 
+        # Spatial index over objects, buildings and enemies for rendering
+        self.grid = SpatialGrid()
+        for obj in self.objects:
+            self.grid.insert(obj)
+
     def generate_world(self):
         """Generate diverse biomes and interesting locations"""
         # Generate biome regions
@@ -1027,6 +1430,12 @@ class World:
             return self.tiles[y][x]
         return TileType.WATER
 
+    def set_tile(self, x: int, y: int, tile: TileType):
+        """Replace a tile, letting the renderer know its chunk is stale"""
+        if 0 <= x < WORLD_SIZE and 0 <= y < WORLD_SIZE and self.tiles[y][x] != tile:
+            self.tiles[y][x] = tile
+            self.events.emit(TileChangedEvent(x, y, tile))
+
     def get_objects_in_range(self, x: float, y: float, radius: float) -> List[WorldObject]:
         """Get objects within range of position"""
         nearby = []
@@ -1036,10 +1445,21 @@ class World:
                 nearby.append(obj)
         return nearby
 
+    def add_object(self, obj: WorldObject):
+        """Add a resource node or landmark after generation"""
+        self.objects.append(obj)
+        self.grid.insert(obj)
+
+    def remove_object(self, obj: WorldObject):
+        """Remove a used-up resource node"""
+        self.objects.remove(obj)
+        self.grid.remove(obj)
+
     def spawn_enemy(self, x: float, y: float, enemy_type: str):
         """Spawn an enemy at position"""
         enemy = Enemy(x, y, enemy_type)
         self.enemies.append(enemy)
+        self.grid.insert(enemy)
 
     def place_building(self, x: int, y: int, building_type: str) -> bool:
         """Place a building at tile position"""
@@ -1053,48 +1473,63 @@ class World:
 
         building = Building(x, y, building_type)
         self.buildings.append(building)
+        self.grid.insert(building)
+        self.events.emit(BuildingPlacedEvent(x, y, building_type))
+        if building_type == "campfire":
+            building.ignite(self.scheduler)
         return True
 
-    def update_enemies(self, dt: float, player, game_state=None):
-        """Update all enemies"""
+    def deplete_resource(self, obj: WorldObject):
+        """Leave a picked-clean plant in place and schedule its regrowth"""
+        obj.resource_amount = 0
+        obj.harvestable = False
+        self.scheduler.schedule(obj.regrow_time, self.regrow_resource, obj)
+
+    def regrow_resource(self, obj: WorldObject):
+        """Scheduled callback: a depleted plant is ready to harvest again"""
+        obj.regrow()
+        obj.health = obj.max_health
+        obj.harvestable = True
+
+    def update_enemies(self, dt: float, player, lod_radius: Optional[float] = None):
+        """Update all enemies
+
+        With lod_radius set, enemies further than that many tiles from the
+        player bank their time and only update every ENEMY_LOD_STEP seconds.
+        """
         for enemy in self.enemies[:]:
-            enemy.update(dt, player, game_state)
+            if (lod_radius is not None and enemy.lod_time + dt < ENEMY_LOD_STEP and
+                    (enemy.x - player.x) ** 2 + (enemy.y - player.y) ** 2 > lod_radius ** 2):
+                enemy.lod_time += dt
+                continue
+            enemy_dt = enemy.lod_time + dt
+            enemy.lod_time = 0.0
+
+            old_x, old_y = enemy.x, enemy.y
+            enemy.update(enemy_dt, player, self.events)
+            self.grid.move(enemy, old_x, old_y)
             if enemy.health <= 0:
                 self.enemies.remove(enemy)
+                self.grid.remove(enemy)
+                self.events.emit(DeathEvent(enemy.x, enemy.y, enemy.enemy_type))
                 # Drop loot
                 for resource, amount in enemy.drop_loot().items():
                     player.add_resource(resource, amount)
-
-    def update_buildings(self, dt: float):
-        """Update all buildings"""
-        for building in self.buildings:
-            building.update(dt)
+                    self.events.emit(LootEvent(enemy.x, enemy.y, resource, amount))
 
     def update_world_systems(self, dt: float):
-        """Update weather, seasons, and world events"""
-        # Update weather
-        self.weather_timer += dt
-        if self.weather_timer >= 300:  # Change weather every 5 minutes
-            self.weather_timer = 0
-            self.change_weather()
-
-        # Update seasons
-        self.season_timer += dt
-        if self.season_timer >= 2400:  # Season change every 40 minutes
-            self.season_timer = 0
-            self.change_season()
-
-        # Update resource regrowth
-        for obj in self.objects:
-            if hasattr(obj, 'regrow_timer') and obj.resource_amount <= 0:
-                obj.regrow_timer += dt
-                if obj.regrow_timer >= obj.regrow_time:
-                    obj.regrow_timer = 0
-                    if isinstance(obj, Bush):
-                        obj.resource_amount = random.randint(1, 3)
-                    elif isinstance(obj, MushroomPatch):
-                        obj.resource_amount = random.randint(2, 5)
-                    obj.health = obj.max_health
+        """Advance world time: weather, seasons, regrowth and campfire fuel"""
+        self.scheduler.advance(dt)
+
+    def on_weather_timer(self):
+        """Scheduled weather change"""
+        self.change_weather()
+        self.scheduler.schedule(WEATHER_CHANGE_INTERVAL, self.on_weather_timer)
+
+    def on_season_timer(self):
+        """Scheduled season change"""
+        self.change_season()
+        self.scheduler.schedule(SEASON_LENGTH, self.on_season_timer)
 
     def change_weather(self):
         """Randomly change weather with seasonal influences"""
@@ -1163,12 +1598,14 @@ class CraftingSystem:
         """Check if player can craft item"""
         return player.has_resources(recipe.requirements)
 
-    def craft_item(self, player: Player, recipe: Recipe) -> Optional[Item]:
+    def craft_item(self, player: Player, recipe: Recipe, events: Optional[EventBus] = None) -> Optional[Item]:
         """Craft an item"""
         if not self.can_craft(player, recipe):
             return None
 
         player.consume_resources(recipe.requirements)
+        if events:
+            events.emit(CraftEvent(recipe.result))
 
         # Create item
         if recipe.result == ItemType.AXE:
@@ -1184,18 +1621,1533 @@ class CraftingSystem:
         elif recipe.result == ItemType.WOODEN_WALL:
             return Item(ItemType.WOODEN_WALL, "Wooden Wall", "Basic defense", False, 1)
 
-        return None
+        return Item(recipe.result, recipe.result.value.replace("_", " ").title(), "", False, 1)
+
+
+@dataclass
+class InputFrame:
+    """Everything the simulation reads from the player during one tick"""
+    dt_ms: int
+    held: int = 0  # HELD_* bits for movement/sprint keys
+    # Ordered (ACTION_KEY, key) and (ACTION_CLICK, button, world_x, world_y) tuples
+    actions: List[tuple] = field(default_factory=list)
+
+
+class InputRecording:
+    """Seed plus per-tick input stream, stored as a compact binary file
+
+    Layout: header (magic, version, seed, tick count, final state digest)
+    followed by a zlib-compressed body of ticks. Each tick is
+    dt_ms/held/action count, then the actions themselves.
+    """
+    HEADER = struct.Struct("<4sHIII")
+    TICK = struct.Struct("<HBB")
+    KEY = struct.Struct("<BI")
+    CLICK = struct.Struct("<BBdd")
+
+    def __init__(self, seed: int):
+        self.seed = seed
+        self.frames: List[InputFrame] = []
+        self.digest = 0
+
+    def record(self, frame: InputFrame):
+        """Append one tick of input"""
+        self.frames.append(frame)
+
+    def save(self, path: str):
+        """Write recording to disk"""
+        body = bytearray()
+        for frame in self.frames:
+            body += self.TICK.pack(min(frame.dt_ms, 0xFFFF), frame.held, len(frame.actions))
+            for action in frame.actions:
+                if action[0] == ACTION_KEY:
+                    body += self.KEY.pack(ACTION_KEY, action[1])
+                else:
+                    body += self.CLICK.pack(ACTION_CLICK, action[1], action[2], action[3])
+
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed,
+                                     len(self.frames), self.digest))
+            f.write(zlib.compress(bytes(body), 9))
+
+    @classmethod
+    def load(cls, path: str) -> "InputRecording":
+        """Read a recording written by save()"""
+        with open(path, "rb") as f:
+            magic, version, seed, tick_count, digest = cls.HEADER.unpack(f.read(cls.HEADER.size))
+            if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+                raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay file")
+            body = zlib.decompress(f.read())
+
+        recording = cls(seed)
+        recording.digest = digest
+        offset = 0
+        for _ in range(tick_count):
+            dt_ms, held, action_count = cls.TICK.unpack_from(body, offset)
+            offset += cls.TICK.size
+            frame = InputFrame(dt_ms, held)
+            for _ in range(action_count):
+                if body[offset] == ACTION_KEY:
+                    frame.actions.append(cls.KEY.unpack_from(body, offset))
+                    offset += cls.KEY.size
+                else:
+                    frame.actions.append(cls.CLICK.unpack_from(body, offset))
+                    offset += cls.CLICK.size
+            recording.frames.append(frame)
+        return recording
+
+
+@dataclass(frozen=True)
+class WorldSnapshot:
+    """Read-only view of one simulation tick, everything the renderer draws
+
+    Only on-screen objects, buildings and enemies are included; drawables
+    holds them and the player sorted by y for painter's-order drawing.
+    Snapshots published by the simulation thread hold detached copies of
+    the player and enemies; tiles are shared since only the simulation
+    writes them.
+    """
+    tick: int
+    state: str
+    time: int
+    day_count: int
+    camera_x: int
+    camera_y: int
+    building_to_place: Optional[ItemType] = None
+    player: Optional[Player] = None
+    tiles: Optional[list] = None
+    drawables: tuple = ()
+    buildings: Tuple[Building, ...] = ()
+    enemies: Tuple[Enemy, ...] = ()
+    enemy_count: int = 0
+    harvest_target: Optional[Tuple[float, float, float]] = None  # x, y, progress
+    lights: tuple = ()  # (x, y, radius in tiles, color) near the screen
+    enemy_positions: tuple = ()  # (x, y) of every enemy in the world, for the minimap
+    tile_size: int = TILE_SIZE  # On-screen tile size for the current zoom level
+    weather: Weather = Weather.CLEAR
+
+
+class SimulationThread(threading.Thread):
+    """Runs the simulation beside the render loop
+
+    The render loop forwards one InputFrame per frame through the inputs
+    queue. Each processed tick is published as a WorldSnapshot into a
+    double buffer, and its gameplay events are queued for the renderer's
+    presentation listeners, so drawing frame N overlaps simulating N+1.
+
+    Ticks that can start a game (everything on the menu, and anything
+    pressing Escape, which goes back to it) are handed back to the render
+    thread, since start_game converts surfaces and rebuilds renderer state;
+    this thread waits until it has run them. An exception that stops the
+    thread is kept in error and re-raised on the render thread by check().
+    """
+    def __init__(self, game: "GameState"):
+        super().__init__(name="simulation", daemon=True)
+        self.game = game
+        self.inputs: "queue.Queue[Optional[InputFrame]]" = queue.Queue()
+        self.events = deque()  # Gameplay events waiting for the renderer
+        self.handed_back: "queue.Queue[InputFrame]" = queue.Queue(maxsize=1)
+        self.resumed = threading.Event()
+        self.error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        initial = game.make_snapshot()
+        self._buffers = [initial, initial]
+        self._front = 0
+
+    def run(self):
+        try:
+            while True:
+                frame = self.inputs.get()
+                if frame is None:
+                    break
+                if self.game.state == "menu" or (ACTION_KEY, pygame.K_ESCAPE) in frame.actions:
+                    self.handed_back.put(frame)
+                    self.resumed.wait()
+                    self.resumed.clear()
+                else:
+                    self.tick(frame)
+        except Exception as e:
+            self.error = e
+
+    def tick(self, frame: InputFrame):
+        """Step the game and publish the result"""
+        self.game.step(frame)
+        if self.game.world:
+            self.events.extend(self.game.world.events.take())
+        self.publish(self.game.make_snapshot(detached=True))
+
+    def run_handed_back(self):
+        """On the render thread: run the tick handed back, if there is one"""
+        try:
+            frame = self.handed_back.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            self.tick(frame)
+        finally:
+            self.resumed.set()
+
+    def check(self):
+        """Re-raise whatever stopped the thread"""
+        if self.error:
+            raise self.error
+
+    def publish(self, snapshot: WorldSnapshot):
+        """Fill the back buffer, then swap it to the front"""
+        back = 1 - self._front
+        self._buffers[back] = snapshot
+        with self._lock:
+            self._front = back
+
+    def latest(self) -> WorldSnapshot:
+        """Most recently published snapshot"""
+        with self._lock:
+            return self._buffers[self._front]
+
+    def stop(self):
+        """Finish queued ticks and end the thread"""
+        self.inputs.put(None)
+        while self.is_alive():
+            self.run_handed_back()
+            self.join(0.005)
+        self.check()
+
+
+class RenderEntry(NamedTuple):
+    """How to draw one render id"""
+    sprite: pygame.Surface
+    anchor: Tuple[int, int]  # Offset from the object's screen position to the blit position
+    frames: Tuple[pygame.Surface, ...] = ()  # Animation frames, shown in turn on the shared clock
+
+
+surface_allocations = 0  # Surfaces created so far, see new_surface()
+draw_calls = 0  # Draw calls made so far by the game view, see count_draws()
+blits_drawn = 0  # Surfaces blitted and shapes drawn by those calls
+
+
+def new_surface(size, flags: int = 0) -> pygame.Surface:
+    """Create a Surface, counting it for the per-frame allocation report"""
+    global surface_allocations
+    surface_allocations += 1
+    return pygame.Surface(size, flags)
+
+
+def count_draws(blits: int = 1, calls: int = 1):
+    """Count draw calls for the render profiler; one blits() batch is a single call"""
+    global draw_calls, blits_drawn
+    draw_calls += calls
+    blits_drawn += blits
+
+
+def scale_surface(surface: pygame.Surface, factor: float) -> pygame.Surface:
+    """Pre-scale a sprite for a zoom level: filtered when shrinking, crisp pixels when growing"""
+    if factor == 1:
+        return surface
+    size = (max(1, round(surface.get_width() * factor)), max(1, round(surface.get_height() * factor)))
+    if factor < 1:
+        return pygame.transform.smoothscale(surface, size)
+    return pygame.transform.scale(surface, size)
+
+
+def view_origin(camera_x: int, camera_y: int, tile_size: int = TILE_SIZE) -> Tuple[int, int]:
+    """World pixel at the screen's top-left corner when tiles are drawn tile_size wide
+
+    The camera itself always tracks the player in 1:1 (TILE_SIZE) pixels.
+    """
+    return (camera_x * tile_size // TILE_SIZE - SCREEN_WIDTH // 2,
+            camera_y * tile_size // TILE_SIZE - SCREEN_HEIGHT // 2)
+
+
+def autotile_masks(ids: np.ndarray) -> np.ndarray:
+    """Neighbour masks of every cell inside a grid of tile ids padded by one cell all round
+
+    Bit i is set when the neighbour at AUTOTILE_NEIGHBORS[i] has the same
+    id (or AUTOTILE_OUTSIDE). A corner only counts when both edges next to
+    it do, which leaves 47 distinct masks.
+    """
+    center = ids[1:-1, 1:-1]
+    height, width = center.shape
+    same = []
+    for dx, dy in AUTOTILE_NEIGHBORS:
+        neighbor = ids[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+        same.append((neighbor == center) | (neighbor == AUTOTILE_OUTSIDE))
+    masks = np.zeros((height, width), np.uint8)
+    for bit in range(4):
+        masks |= same[bit].astype(np.uint8) << bit
+    for bit, (a, b) in enumerate(AUTOTILE_CORNERS, 4):
+        masks |= (same[bit] & same[a] & same[b]).astype(np.uint8) << bit
+    return masks
+
+
+class HudLayer:
+    """One retained piece of the HUD
+
+    draw(surface, snap) paints the layer in its own coordinates. It only
+    runs when the layer is marked dirty or its state key changes.
+    """
+    def __init__(self, rect, draw):
+        self.rect = pygame.Rect(rect)
+        self.surface = new_surface(self.rect.size, pygame.SRCALPHA).convert_alpha()
+        self.draw = draw
+        self.key = None
+        self.dirty = True
+
+    def update(self, key, snap: "WorldSnapshot"):
+        """Re-render if anything the layer shows has changed"""
+        if self.dirty or key != self.key:
+            self.key = key
+            self.dirty = False
+            self.surface.fill((0, 0, 0, 0))
+            self.draw(self.surface, snap)
+
+
+class ParticleSystem:
+    """Particles kept in NumPy arrays and drawn from pre-rendered sprites
+
+    Live particles always fill the first `count` slots; dead ones are
+    swap-removed by moving live particles from the tail into their slots.
+    Sprites are circles cached per (color, size, alpha bucket).
+    """
+    def __init__(self, seed: Optional[int] = None, capacity: int = 256):
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.life = np.zeros(capacity)
+        self.color = np.zeros(capacity, dtype=np.int32)  # Index into palette
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.palette: List[Tuple[int, int, int]] = []
+        self.palette_index: Dict[Tuple[int, int, int], int] = {}
+        self.sprites: Dict[Tuple[int, int, int], pygame.Surface] = {}
+
+    def __len__(self):
+        return self.count
+
+    def grow(self, needed: int):
+        """Double capacity until `needed` particles fit"""
+        capacity = len(self.life)
+        while capacity < needed:
+            capacity *= 2
+        for name in ("pos", "vel", "life", "color", "size"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def emit(self, x: float, y: float, count: int, color: Tuple[int, int, int]):
+        """Burst of particles flying out from a world position"""
+        if self.count + count > len(self.life):
+            self.grow(self.count + count)
+
+        if color not in self.palette_index:
+            self.palette_index[color] = len(self.palette)
+            self.palette.append(color)
+
+        start, end = self.count, self.count + count
+        angle = self.rng.random(count) * 2 * math.pi
+        speed = self.rng.uniform(20, 60, count)
+        self.pos[start:end] = (x, y)
+        self.vel[start:end, 0] = np.cos(angle) * speed
+        self.vel[start:end, 1] = np.sin(angle) * speed
+        self.life[start:end] = self.rng.uniform(0.3, PARTICLE_FADE_TIME, count)
+        self.color[start:end] = self.palette_index[color]
+        self.size[start:end] = self.rng.integers(2, 6, count)
+        self.count = end
+
+    def update(self, dt: float):
+        """Move every particle, then compact out the dead ones"""
+        n = self.count
+        if not n:
+            return
+        self.pos[:n] += self.vel[:n] * dt
+        self.vel[:n, 1] += PARTICLE_GRAVITY * dt
+        self.life[:n] -= dt
+
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if len(dead):
+            live = n - len(dead)
+            holes = dead[dead < live]
+            movers = np.flatnonzero(self.life[live:n] > 0) + live
+            for array in (self.pos, self.vel, self.life, self.color, self.size):
+                array[holes] = array[movers]
+            self.count = live
+
+    def sprite(self, color: int, size: int, bucket: int) -> pygame.Surface:
+        """Cached circle sprite for a palette color, radius and alpha bucket"""
+        key = (color, size, bucket)
+        surface = self.sprites.get(key)
+        if surface is None:
+            alpha = 255 * bucket // (PARTICLE_ALPHA_BUCKETS - 1)
+            surface = new_surface((size * 2, size * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (*self.palette[color], alpha), (size, size), size)
+            self.sprites[key] = surface
+        return surface
+
+    def draw(self, screen: pygame.Surface, camera_x: float, camera_y: float, tile_size: int = TILE_SIZE):
+        """Blit on-screen particles in one batch"""
+        n = self.count
+        if not n:
+            return
+        left, top = view_origin(camera_x, camera_y, tile_size)
+        screen_pos = (self.pos[:n] * tile_size - (left, top)).astype(np.int32)
+        on_screen = np.flatnonzero((screen_pos[:, 0] > -50) & (screen_pos[:, 0] < SCREEN_WIDTH + 50) &
+                                   (screen_pos[:, 1] > -50) & (screen_pos[:, 1] < SCREEN_HEIGHT + 50))
+        if not len(on_screen):
+            return
+
+        buckets = np.clip(self.life[on_screen] / PARTICLE_FADE_TIME * (PARTICLE_ALPHA_BUCKETS - 1),
+                          0, PARTICLE_ALPHA_BUCKETS - 1).astype(np.int32)
+        sizes = self.size[on_screen]
+        corners = screen_pos[on_screen] - sizes[:, None]
+        screen.blits([(self.sprite(color, size, bucket), (x, y))
+                      for color, size, bucket, (x, y) in zip(self.color[on_screen].tolist(), sizes.tolist(),
+                                                             buckets.tolist(), corners.tolist())],
+                     doreturn=False)
+        count_draws(len(on_screen))
+
+
+class WeatherSystem:
+    """Rain, snow and storms drawn in screen space from fixed NumPy buffers
+
+    Drops and flakes live in WEATHER_CAPACITY slots allocated once; anything
+    leaving the screen wraps round to the opposite edge instead of being
+    respawned, so a spell of weather costs the same however long it lasts.
+    The number drawn is the weather's share of the buffer times the quality
+    density, faded in and out as the weather changes. Camera movement
+    shifts everything the other way so the weather stays put in the world.
+    Storms add lightning flashes on their own timer.
+    """
+    def __init__(self, seed: Optional[int] = None, capacity: int = WEATHER_CAPACITY):
+        self.rng = np.random.default_rng(seed)
+        self.bounds = np.array((SCREEN_WIDTH, SCREEN_HEIGHT), dtype=float)
+        self.pos = self.rng.random((capacity, 2)) * self.bounds
+        self.speed = self.rng.random(capacity)  # Where each drop falls within its style's speed range
+        self.phase = self.rng.random(capacity) * 2 * math.pi  # Snowflake sway
+        self.variant = self.rng.integers(0, 3, capacity)  # Sprite size
+        self.step = np.zeros((capacity, 2))  # One update's movement
+        self.weather = Weather.CLEAR
+        self.style = Weather.RAIN  # Last weather with drops, kept while they fade out
+        self.density = 1.0  # Set from the quality level
+        self.amount = 0.0  # Fraction of the buffer drawn right now
+        self.time = 0.0
+        self.camera: Optional[Tuple[int, int]] = None  # View origin at the last draw
+        self.flash = 0.0  # Seconds of lightning flash left
+        self.next_flash = self.rng.uniform(*LIGHTNING_INTERVAL)
+        self.sprites: Dict[Weather, Tuple[pygame.Surface, ...]] = {}
+        self.flash_surface: Optional[pygame.Surface] = None
+
+    @property
+    def count(self) -> int:
+        """Drops or flakes currently drawn"""
+        return int(len(self.speed) * self.amount)
+
+    def update(self, dt: float):
+        """Fade towards the current weather, move the drawn drops and run the lightning timer"""
+        share = WEATHER_STYLES[self.weather][0] * self.density if self.weather in WEATHER_STYLES else 0.0
+        fade = dt / WEATHER_FADE_TIME
+        if self.amount < share:
+            self.amount = min(share, self.amount + fade)
+        else:
+            self.amount = max(share, self.amount - fade)
+        self.time += dt
+
+        self.flash = max(0.0, self.flash - dt)
+        if self.weather == Weather.STORM:
+            self.next_flash -= dt
+            if self.next_flash <= 0:
+                self.flash = LIGHTNING_FLASH_TIME
+                self.next_flash = self.rng.uniform(*LIGHTNING_INTERVAL)
+
+        n = self.count
+        if not n:
+            return
+        _, (slow, fast), wind, snow = WEATHER_STYLES[self.style]
+        step = self.step[:n]
+        step[:, 0] = wind
+        step[:, 1] = slow + self.speed[:n] * (fast - slow)
+        if snow:
+            step[:, 0] += np.sin(self.phase[:n] + self.time * 2) * 30
+        step *= dt
+        self.pos[:n] += step
+        np.mod(self.pos[:n], self.bounds, out=self.pos[:n])
+
+    def make_sprites(self, weather: Weather) -> Tuple[pygame.Surface, ...]:
+        """Three sizes of raindrop streak (slanted by the wind) or snowflake"""
+        _, (slow, _), wind, snow = WEATHER_STYLES[weather]
+        sprites = []
+        for size in (1, 2, 3):
+            if snow:
+                sprite = new_surface((size * 2, size * 2), pygame.SRCALPHA)
+                pygame.draw.circle(sprite, (240, 245, 255, 150 + 30 * size), (size, size), size)
+            else:
+                length = 6 + 4 * size
+                slant = round(length * wind / slow)
+                sprite = new_surface((slant + 1, length), pygame.SRCALPHA)
+                pygame.draw.line(sprite, (170, 190, 230, 90 + 40 * size), (0, 0), (slant, length - 1))
+            sprites.append(sprite)
+        self.sprites[weather] = tuple(sprites)
+        return self.sprites[weather]
+
+    def draw(self, screen: pygame.Surface, weather: Weather, camera_x: float, camera_y: float,
+             tile_size: int = TILE_SIZE):
+        """Follow the snapshot's weather and camera, then blit the drawn drops in one batch"""
+        self.weather = weather
+        if weather in WEATHER_STYLES:
+            self.style = weather
+
+        n = self.count
+        camera = view_origin(camera_x, camera_y, tile_size)
+        if n and self.camera is not None:
+            self.pos[:n] -= (camera[0] - self.camera[0], camera[1] - self.camera[1])
+            np.mod(self.pos[:n], self.bounds, out=self.pos[:n])
+        self.camera = camera
+        if not n:
+            return
+
+        sprites = self.sprites.get(self.style) or self.make_sprites(self.style)
+        screen.blits([(sprites[variant], (x, y))
+                      for variant, (x, y) in zip(self.variant[:n].tolist(), self.pos[:n].astype(np.int32).tolist())],
+                     doreturn=False)
+        count_draws(n)
+
+    def draw_lightning(self, screen: pygame.Surface):
+        """Storm flash that fades out with a flicker"""
+        if not self.flash:
+            return
+        if self.flash_surface is None:
+            self.flash_surface = new_surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+            self.flash_surface.fill((225, 230, 255))
+        progress = self.flash / LIGHTNING_FLASH_TIME  # 1 at the strike, 0 once it's over
+        flicker = 0.4 if 0.55 < progress < 0.75 else 1.0
+        self.flash_surface.set_alpha(int(170 * progress * flicker))
+        screen.blit(self.flash_surface, (0, 0))
+        count_draws()
+
+
+class LightMap:
+    """Night lighting rendered at reduced resolution
+
+    Each frame the small map is filled with the ambient darkness, a cached
+    radial-gradient stamp is added for every light, and the result is
+    scaled up once and multiplied over the scene. Only the LIGHT_BUDGET
+    lights nearest the camera are stamped.
+    """
+    def __init__(self, scale: int = LIGHT_MAP_SCALE, budget: int = LIGHT_BUDGET):
+        self.budget = budget
+        self.screen_map = new_surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.set_scale(scale)
+
+    def set_scale(self, scale: int):
+        """Change the light map resolution, dropping stamps made for the old one"""
+        self.scale = scale
+        self.map = new_surface((SCREEN_WIDTH // scale, SCREEN_HEIGHT // scale)).convert()
+        self.stamps: Dict[Tuple[int, Tuple[int, int, int]], pygame.Surface] = {}
+
+    def stamp(self, radius: int, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Cached radial gradient, full color at the centre fading to black at radius"""
+        key = (radius, color)
+        surface = self.stamps.get(key)
+        if surface is None:
+            offsets = np.arange(radius * 2) - radius + 0.5
+            distance = np.hypot(offsets[:, None], offsets[None, :])
+            falloff = np.clip(1 - distance / radius, 0, 1) ** 1.5
+            pixels = (falloff[:, :, None] * np.array(color)).astype(np.uint8)
+            surface = new_surface((radius * 2, radius * 2)).convert()
+            pygame.surfarray.blit_array(surface, pixels)
+            self.stamps[key] = surface
+        return surface
+
+    def draw(self, screen: pygame.Surface, lights: tuple, camera_x: float, camera_y: float, darkness: float,
+             tile_size: int = TILE_SIZE):
+        """Multiply the light map over the screen; darkness 0 is day, 1 is full night"""
+        level = int(255 * (1 - darkness))
+        self.map.fill((level, level, min(255, level + int(20 * darkness))))
+
+        if len(lights) > self.budget:
+            lights = heapq.nsmallest(self.budget, lights,
+                                     key=lambda light: (light[0] * TILE_SIZE - camera_x) ** 2 +
+                                                       (light[1] * TILE_SIZE - camera_y) ** 2)
+
+        left, top = view_origin(camera_x, camera_y, tile_size)
+        stamps = []
+        for x, y, radius, color in lights:
+            map_radius = max(1, int(radius * tile_size / self.scale))
+            map_x = (x * tile_size - left) / self.scale - map_radius
+            map_y = (y * tile_size - top) / self.scale - map_radius
+            stamps.append((self.stamp(map_radius, color), (map_x, map_y), None, pygame.BLEND_RGB_ADD))
+        self.map.blits(stamps, doreturn=False)
+
+        pygame.transform.smoothscale(self.map, (SCREEN_WIDTH, SCREEN_HEIGHT), self.screen_map)
+        screen.blit(self.screen_map, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+        count_draws(len(stamps) + 3, 4)  # Fill, stamps, scale, multiply
+
+
+class TerrainChunkCache:
+    """LRU cache of pre-rendered terrain chunks
+
+    Each chunk is CHUNK_TILES x CHUNK_TILES tiles drawn once into an opaque
+    surface, so a frame costs a handful of chunk blits instead of a rect
+    per tile. Tiles with a texture are blitted from it, the rest fall back
+    to TILE_COLORS.
+
+    Every zoom level has its own chunks and its own copies of the
+    textures, scaled the first time a chunk is drawn at it. Chunks of
+    all levels share one LRU whose budget is max_chunks 1:1 chunks' worth
+    of pixels, so zoomed-out views can keep the many small chunks they need.
+
+    Animated tiles are baked in at their first frame, and each chunk keeps
+    a patch list of its animated cells, with horizontal runs of the same
+    tile merged into one entry. When the shared animation frame changes, a
+    visible chunk blits the new frame of each run over just those cells.
+
+    Tiles with autotile borders get the border matching their neighbour
+    mask baked in with them. Masks are computed for the whole world by
+    set_tiles and for just a changed tile's neighbourhood afterwards, so
+    borders cost nothing per frame; bordered cells stay on their first
+    animation frame.
+    """
+    def __init__(self, textures: Optional[Dict[TileType, pygame.Surface]] = None,
+                 max_chunks: int = TERRAIN_CHUNK_CACHE_SIZE,
+                 animations: Optional[Dict[TileType, List[pygame.Surface]]] = None,
+                 borders: Optional[Dict[TileType, Dict[int, pygame.Surface]]] = None):
+        self.textures = textures or {}
+        self.animations = animations or {}
+        self.borders = borders or {}
+        self.scaled_sets: Dict[int, tuple] = {}  # tile_size: (textures, animations, borders) at that size
+        self.ids: Optional[np.ndarray] = None  # Tile ids padded with AUTOTILE_OUTSIDE
+        self.masks: Optional[np.ndarray] = None  # Autotile neighbour mask of every tile
+        self.max_pixels = max_chunks * (CHUNK_TILES * TILE_SIZE) ** 2
+        self.pixels = 0
+        self.chunks: "OrderedDict[Tuple[int, int, int], pygame.Surface]" = OrderedDict()
+        self.patches: Dict[Tuple[int, int, int], List[Tuple[TileType, int, Tuple[int, int]]]] = {}
+        self.shown_frames: Dict[Tuple[int, int, int], int] = {}  # Animation frame each chunk shows
+        self.runs: Dict[Tuple[int, TileType, int], List[pygame.Surface]] = {}  # Frames of n tiles side by side
+
+    def chunk(self, tiles: list, cx: int, cy: int, tile_size: int = TILE_SIZE) -> pygame.Surface:
+        """Chunk surface at chunk coordinates, rendering it on a miss"""
+        key = (tile_size, cx, cy)
+        surface = self.chunks.get(key)
+        if surface is not None:
+            self.chunks.move_to_end(key)
+            return surface
+
+        surface = self.render_chunk(tiles, cx, cy, tile_size)
+        self.chunks[key] = surface
+        self.pixels += surface.get_width() * surface.get_height()
+        self.patches[key] = self.animated_cells(tiles, cx, cy, tile_size)
+        self.shown_frames[key] = 0
+        while self.pixels > self.max_pixels and len(self.chunks) > 1:
+            self.drop(next(iter(self.chunks)))
+        return surface
+
+    def drop(self, key: Tuple[int, int, int]):
+        """Forget one cached chunk"""
+        surface = self.chunks.pop(key, None)
+        if surface:
+            self.pixels -= surface.get_width() * surface.get_height()
+            del self.patches[key], self.shown_frames[key]
+
+    def scaled(self, tile_size: int) -> tuple:
+        """Textures, animation frames and borders for a zoom level, scaled on first use"""
+        scaled = self.scaled_sets.get(tile_size)
+        if scaled is None:
+            factor = tile_size / TILE_SIZE
+            scaled = ({tile: scale_surface(texture, factor) for tile, texture in self.textures.items()},
+                      {tile: [scale_surface(frame, factor) for frame in frames]
+                       for tile, frames in self.animations.items()},
+                      {tile: {mask: scale_surface(border, factor) for mask, border in masks.items()}
+                       for tile, masks in self.borders.items()})
+            self.scaled_sets[tile_size] = scaled
+        return scaled
+
+    def set_tiles(self, tiles: list):
+        """Start on a new world: compute every tile's autotile mask and drop all chunks"""
+        self.clear()
+        if not self.borders:
+            return
+        ids = np.array([[tile.value for tile in row] for row in tiles], np.uint8)
+        self.ids = np.pad(ids, 1, constant_values=AUTOTILE_OUTSIDE)
+        self.masks = autotile_masks(self.ids)
+
+    def border_mask(self, x: int, y: int, tile: TileType) -> Optional[int]:
+        """Autotile mask of a tile that has a border to draw, or None"""
+        if self.masks is None or tile not in self.borders:
+            return None
+        mask = int(self.masks[y, x])
+        return None if mask == AUTOTILE_FULL else mask
+
+    def animated_cells(self, tiles: list, cx: int, cy: int, tile_size: int) -> list:
+        """Patch list for a chunk: (tile, run length, position in the chunk) of each run of animated tiles"""
+        if not self.animations:
+            return []
+        x0, y0 = cx * CHUNK_TILES, cy * CHUNK_TILES
+        patches = []
+        for y, row in enumerate(tiles[y0:y0 + CHUNK_TILES], y0):
+            row = [tile if tile in self.animations and self.border_mask(x, y, tile) is None else None
+                   for x, tile in enumerate(row[x0:x0 + CHUNK_TILES], x0)]
+            x = 0
+            while x < len(row):
+                tile = row[x]
+                run = 1
+                while x + run < len(row) and row[x + run] == tile:
+                    run += 1
+                if tile is not None:
+                    patches.append((tile, run, (x * tile_size, (y - y0) * tile_size)))
+                x += run
+        return patches
+
+    def run_frames(self, tile_size: int, tile: TileType, run: int) -> List[pygame.Surface]:
+        """Animation frames for run tiles side by side, composed on first use"""
+        key = (tile_size, tile, run)
+        frames = self.runs.get(key)
+        if frames is None:
+            frames = self.scaled(tile_size)[1][tile]
+            if run > 1:
+                strips = []
+                for frame in frames:
+                    strip = new_surface((run * tile_size, tile_size)).convert()
+                    strip.blits([(frame, (i * tile_size, 0)) for i in range(run)], doreturn=False)
+                    strips.append(strip)
+                frames = strips
+            self.runs[key] = frames
+        return frames
+
+    def animate(self, key: Tuple[int, int, int], surface: pygame.Surface, frame: int):
+        """Bring a chunk's animated cells to the given frame"""
+        batch = []
+        for tile, run, position in self.patches[key]:
+            frames = self.run_frames(key[0], tile, run)
+            batch.append((frames[frame % len(frames)], position))
+        surface.blits(batch, doreturn=False)
+        count_draws(len(batch))
+        self.shown_frames[key] = frame
+
+    def render_chunk(self, tiles: list, cx: int, cy: int, tile_size: int = TILE_SIZE) -> pygame.Surface:
+        """Draw one chunk's tiles into a new surface"""
+        x0, y0 = cx * CHUNK_TILES, cy * CHUNK_TILES
+        width = min(CHUNK_TILES, WORLD_SIZE - x0)
+        height = min(CHUNK_TILES, WORLD_SIZE - y0)
+        surface = new_surface((width * tile_size, height * tile_size)).convert()
+        textures, _, borders = self.scaled(tile_size)
+
+        for y in range(height):
+            row = tiles[y0 + y]
+            for x in range(width):
+                tile = row[x0 + x]
+                texture = textures.get(tile)
+                if texture:
+                    surface.blit(texture, (x * tile_size, y * tile_size))
+                else:
+                    surface.fill(TILE_COLORS[tile], (x * tile_size, y * tile_size, tile_size, tile_size))
+                mask = self.border_mask(x0 + x, y0 + y, tile)
+                if mask is not None:
+                    surface.blit(borders[tile][mask], (x * tile_size, y * tile_size))
+        return surface
+
+    def invalidate_tile(self, x: int, y: int, tile: TileType):
+        """Drop the chunks whose look a changed tile affects, at every zoom level
+
+        That is the tile's own chunk plus those of any neighbour whose
+        autotile mask changed with it; only the 3x3 block around the tile
+        is recomputed.
+        """
+        changed = [(x, y)]
+        if self.ids is not None:
+            self.ids[y + 1, x + 1] = tile.value
+            left, top = max(0, x - 1), max(0, y - 1)
+            right, bottom = min(WORLD_SIZE, x + 2), min(WORLD_SIZE, y + 2)
+            masks = autotile_masks(self.ids[top:bottom + 2, left:right + 2])
+            for dy, dx in zip(*np.nonzero(masks != self.masks[top:bottom, left:right])):
+                changed.append((left + dx, top + dy))
+            self.masks[top:bottom, left:right] = masks
+        for cx, cy in {(cell_x // CHUNK_TILES, cell_y // CHUNK_TILES) for cell_x, cell_y in changed}:
+            for tile_size in ZOOM_TILE_SIZES:
+                self.drop((tile_size, cx, cy))
+
+    def clear(self):
+        """Drop every cached chunk"""
+        self.chunks.clear()
+        self.patches.clear()
+        self.shown_frames.clear()
+        self.pixels = 0
+
+    def draw(self, screen: pygame.Surface, tiles: list, camera_x: float, camera_y: float,
+             tile_size: int = TILE_SIZE, frame: int = 0):
+        """Blit the chunks overlapping the screen, animated tiles at the given frame"""
+        chunk_px = CHUNK_TILES * tile_size
+        chunk_count = (WORLD_SIZE + CHUNK_TILES - 1) // CHUNK_TILES
+        left, top = view_origin(camera_x, camera_y, tile_size)
+
+        start_cx = max(0, int(left // chunk_px))
+        end_cx = min(chunk_count, int((left + SCREEN_WIDTH) // chunk_px) + 1)
+        start_cy = max(0, int(top // chunk_px))
+        end_cy = min(chunk_count, int((top + SCREEN_HEIGHT) // chunk_px) + 1)
+
+        batch = []
+        for cy in range(start_cy, end_cy):
+            for cx in range(start_cx, end_cx):
+                surface = self.chunk(tiles, cx, cy, tile_size)
+                key = (tile_size, cx, cy)
+                if self.patches[key] and self.shown_frames[key] != frame:
+                    self.animate(key, surface, frame)
+                batch.append((surface, (cx * chunk_px - left, cy * chunk_px - top)))
+        screen.blits(batch, doreturn=False)
+        count_draws(len(batch))
+
+
+class FogOfWar:
+    """Explored-tile bitmap with pre-rendered fog per terrain chunk
+
+    explored is a uint8 array and mask a surface with one pixel per tile,
+    black where unexplored and FOG_CLEAR where explored. Reveals write only
+    the tiles around the player into both and drop the cached overlays of
+    the chunks they touch. An overlay is its chunk of the mask scaled to
+    the zoom level with FOG_CLEAR as an RLE colorkey, so a frame costs one
+    cheap blit per partly explored chunk in view, a fill per unexplored
+    one and nothing for the rest.
+    """
+    HEADER = struct.Struct("<4sHIH")  # magic, version, world seed, world size
+
+    def __init__(self, max_chunks: int = TERRAIN_CHUNK_CACHE_SIZE):
+        self.explored = np.zeros((WORLD_SIZE, WORLD_SIZE), dtype=np.uint8)  # [y, x]
+        self.mask = new_surface((WORLD_SIZE, WORLD_SIZE))
+        self.mask.fill(BLACK)
+        self.mask_colors = np.array([self.mask.map_rgb(BLACK), self.mask.map_rgb(FOG_CLEAR)])
+        # Per (tile size, cx, cy): None when explored, BLACK to fill when unexplored, else an overlay
+        self.overlays: "OrderedDict[Tuple[int, int, int], object]" = OrderedDict()
+        self.max_pixels = max_chunks * (CHUNK_TILES * TILE_SIZE) ** 2
+        self.pixels = 0
+        self.revision = 0  # Bumped whenever tiles are revealed
+        self.last_tile = None
+        offsets = np.arange(-FOG_REVEAL_RADIUS, FOG_REVEAL_RADIUS + 1)
+        self.disc = (offsets[:, None] ** 2 + offsets[None, :] ** 2 <= FOG_REVEAL_RADIUS ** 2).astype(np.uint8)
+
+    def is_explored(self, x: float, y: float) -> bool:
+        """Whether a world position's tile is explored; False outside the world"""
+        if not (0 <= x < WORLD_SIZE and 0 <= y < WORLD_SIZE):
+            return False
+        return bool(self.explored[int(y), int(x)])
+
+    def reveal(self, x: float, y: float):
+        """Explore the disc around a world position, once per tile moved"""
+        tile_x, tile_y = int(x), int(y)
+        if (tile_x, tile_y) == self.last_tile:
+            return
+        self.last_tile = (tile_x, tile_y)
+
+        radius = FOG_REVEAL_RADIUS
+        x0, x1 = max(0, tile_x - radius), min(WORLD_SIZE, tile_x + radius + 1)
+        y0, y1 = max(0, tile_y - radius), min(WORLD_SIZE, tile_y + radius + 1)
+        if x0 >= x1 or y0 >= y1:
+            return
+        window = self.explored[y0:y1, x0:x1]
+        disc = self.disc[y0 - tile_y + radius:y1 - tile_y + radius, x0 - tile_x + radius:x1 - tile_x + radius]
+        fresh = disc & (window ^ 1)
+        if not fresh.any():
+            return
+
+        window |= fresh
+        self.write_mask(x0, y0, window)
+        for cy in range(y0 // CHUNK_TILES, (y1 - 1) // CHUNK_TILES + 1):
+            for cx in range(x0 // CHUNK_TILES, (x1 - 1) // CHUNK_TILES + 1):
+                self.invalidate_chunk(cx, cy)
+
+    def write_mask(self, left: int, top: int, explored: np.ndarray):
+        """Copy a block of the explored array into the mask"""
+        pixels = pygame.surfarray.pixels2d(self.mask)  # Locks the mask until released
+        pixels[left:left + explored.shape[1], top:top + explored.shape[0]] = self.mask_colors[explored.T]
+        del pixels
+        self.revision += 1
+
+    def invalidate_chunk(self, cx: int, cy: int):
+        """Drop a chunk's overlays at every zoom level"""
+        for tile_size in ZOOM_TILE_SIZES:
+            overlay = self.overlays.pop((tile_size, cx, cy), None)
+            if isinstance(overlay, pygame.Surface):
+                self.pixels -= overlay.get_width() * overlay.get_height()
+
+    def chunk_overlay(self, cx: int, cy: int, tile_size: int):
+        """What covers one chunk: None, BLACK or an overlay surface, built on a miss"""
+        key = (tile_size, cx, cy)
+        if key in self.overlays:
+            self.overlays.move_to_end(key)
+            return self.overlays[key]
+
+        x0, y0 = cx * CHUNK_TILES, cy * CHUNK_TILES
+        block = self.explored[y0:y0 + CHUNK_TILES, x0:x0 + CHUNK_TILES]
+        if block.all():
+            overlay = None
+        elif not block.any():
+            overlay = BLACK
+        else:
+            width, height = block.shape[1], block.shape[0]
+            overlay = pygame.transform.scale(self.mask.subsurface((x0, y0, width, height)),
+                                             (width * tile_size, height * tile_size))
+            overlay.set_colorkey(FOG_CLEAR, pygame.RLEACCEL)
+            self.pixels += overlay.get_width() * overlay.get_height()
+        self.overlays[key] = overlay
+
+        while self.pixels > self.max_pixels and len(self.overlays) > 1:
+            _, evicted = self.overlays.popitem(last=False)
+            if isinstance(evicted, pygame.Surface):
+                self.pixels -= evicted.get_width() * evicted.get_height()
+        return overlay
+
+    def draw(self, screen: pygame.Surface, camera_x: float, camera_y: float, tile_size: int = TILE_SIZE):
+        """Cover the unexplored tiles of the chunks in view"""
+        chunk_px = CHUNK_TILES * tile_size
+        chunk_count = (WORLD_SIZE + CHUNK_TILES - 1) // CHUNK_TILES
+        left, top = view_origin(camera_x, camera_y, tile_size)
+
+        start_cx = max(0, int(left // chunk_px))
+        end_cx = min(chunk_count, int((left + SCREEN_WIDTH) // chunk_px) + 1)
+        start_cy = max(0, int(top // chunk_px))
+        end_cy = min(chunk_count, int((top + SCREEN_HEIGHT) // chunk_px) + 1)
+
+        batch = []
+        for cy in range(start_cy, end_cy):
+            for cx in range(start_cx, end_cx):
+                overlay = self.chunk_overlay(cx, cy, tile_size)
+                position = (cx * chunk_px - left, cy * chunk_px - top)
+                if overlay is BLACK:
+                    screen.fill(BLACK, (position, (chunk_px, chunk_px)))
+                    count_draws()
+                elif overlay is not None:
+                    batch.append((overlay, position))
+        screen.blits(batch, doreturn=False)
+        count_draws(len(batch))
+
+    def save(self, path: str, seed: int):
+        """Write the explored tiles as a zlib-compressed bitset"""
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(FOG_MAGIC, FOG_VERSION, seed, WORLD_SIZE))
+            f.write(zlib.compress(np.packbits(self.explored).tobytes(), 9))
+
+    def load(self, path: str, seed: int) -> bool:
+        """Restore explored tiles saved for the same world; False if the file is for another
+
+        Raises ValueError, struct.error or zlib.error for a file that isn't
+        a readable exploration map, leaving the explored tiles untouched.
+        """
+        with open(path, "rb") as f:
+            magic, version, saved_seed, size = self.HEADER.unpack(f.read(self.HEADER.size))
+            if magic != FOG_MAGIC or version != FOG_VERSION:
+                raise ValueError(f"{path} is not a version {FOG_VERSION} exploration file")
+            if saved_seed != seed or size != WORLD_SIZE:
+                return False
+            bits = np.frombuffer(zlib.decompress(f.read()), dtype=np.uint8)
+        if len(bits) * 8 < size * size:
+            raise ValueError(f"{path} is truncated")
+        self.explored[:] = np.unpackbits(bits)[:size * size].reshape(size, size)
+        self.write_mask(0, 0, self.explored)
+        self.overlays.clear()
+        self.pixels = 0
+        return True
+
+
+class SpriteAtlas:
+    """Named sprites from the 32rogues sheets
+
+    Every sheet has a manifest of lines like "12.e. red stone floor 1
+    (no bg)": a 1-based row, a column letter and the cell's name (rows
+    with only a number are animation strips starting in column a). The
+    manifests are read up front; a sheet is decoded (by the image loader)
+    and converted the first time one of its sprites is asked for, and
+    sprites are cut out of it as subsurfaces. A bare name finds the first sheet (in
+    alphabetical order) that has it, "sheet:name" a specific sheet.
+    """
+    CELL = 32
+    MANIFEST_LINE = re.compile(r"(\d+)\.(?:([a-z])\.)?\s+(.+)")
+
+    def __init__(self, directory: str, images: Optional[ImageLoader] = None):
+        self.directory = directory
+        self.images = images or ImageLoader()
+        self.sheets: Dict[str, pygame.Surface] = {}
+        self.index: Dict[str, Tuple[str, pygame.Rect]] = {}
+        self.sprites: Dict[str, pygame.Surface] = {}
+        self.strips: Dict[str, Tuple[pygame.Surface, ...]] = {}
+        if not os.path.isdir(directory):
+            return
+        for filename in sorted(os.listdir(directory)):
+            sheet, ext = os.path.splitext(filename)
+            if ext == ".txt" and os.path.exists(self.path(sheet)):
+                self.parse_manifest(sheet, self.manifest_path(sheet))
+
+    def parse_manifest(self, sheet: str, path: str):
+        """Index every named cell of one sheet"""
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                match = self.MANIFEST_LINE.match(line.strip())
+                if not match:
+                    continue
+                row, column, name = match.groups()
+                col = ord(column) - ord("a") if column else 0
+                rect = pygame.Rect(col * self.CELL, (int(row) - 1) * self.CELL, self.CELL, self.CELL)
+                self.index.setdefault(f"{sheet}:{name}", (sheet, rect))
+                self.index.setdefault(name, (sheet, rect))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def path(self, sheet: str) -> str:
+        """Image file of a sheet"""
+        return os.path.join(self.directory, sheet + ".png")
+
+    def manifest_path(self, sheet: str) -> str:
+        """Manifest naming a sheet's cells"""
+        return os.path.join(self.directory, sheet + ".txt")
+
+    def sheet(self, sheet: str) -> pygame.Surface:
+        """A whole sheet, loaded on first use
+
+        The sheets are paletted PNGs with one transparent palette entry,
+        which SDL_image loads as a colorkey; convert_alpha() turns those
+        pixels into alpha 0.
+        """
+        surface = self.sheets.get(sheet)
+        if surface is None:
+            surface = self.images.load(self.path(sheet)).convert_alpha()
+            self.sheets[sheet] = surface
+        return surface
+
+    def rect(self, name: str) -> Optional[pygame.Rect]:
+        """Where a named sprite sits in its sheet"""
+        entry = self.index.get(name)
+        return entry[1] if entry else None
+
+    def get(self, name: str) -> Optional[pygame.Surface]:
+        """Sprite by name, or None if no manifest lists it"""
+        sprite = self.sprites.get(name)
+        if sprite is None:
+            entry = self.index.get(name)
+            if entry is None:
+                return None
+            sheet, rect = entry
+            sprite = self.sheet(sheet).subsurface(rect)
+            self.sprites[name] = sprite
+        return sprite
+
+    def frames(self, name: str) -> Tuple[pygame.Surface, ...]:
+        """Animation strip from a named cell rightwards up to the first empty cell"""
+        strip = self.strips.get(name)
+        if strip is None:
+            entry = self.index.get(name)
+            if entry is None:
+                return ()
+            sheet = self.sheet(entry[0])
+            rect = entry[1].copy()
+            cells = []
+            while rect.right <= sheet.get_width():
+                cell = sheet.subsurface(rect)
+                if not cell.get_bounding_rect().width:
+                    break
+                cells.append(cell)
+                rect.x += self.CELL
+            strip = tuple(cells)
+            self.strips[name] = strip
+        return strip
+
+    def autotiles(self, sheet: str, row: int) -> Dict[int, pygame.Surface]:
+        """Borders of the 12x4 autotile block starting at a 0-based row, by neighbour mask
+
+        Each cell's mask is read off its own pixels: an edge or corner is
+        connected when the pixel there isn't the block's background. The
+        fill colour (from the fully connected cell) is made transparent so
+        only the rim is left to draw over a tile. The sheet has no isolated
+        cell, so mask 0 is stitched from the caps of the vertical strip.
+        """
+        surface = self.sheet(sheet)
+        cell = self.CELL
+        top = row * cell
+        background = surface.get_at((0, top))
+        edge = cell - 1
+        samples = ((cell // 2, 0), (edge, cell // 2), (cell // 2, edge), (0, cell // 2),
+                   (edge, 0), (edge, edge), (0, edge), (0, 0))
+
+        rects = {}
+        for y in range(top, top + 4 * cell, cell):
+            for x in range(0, 12 * cell, cell):
+                if surface.get_at((x + cell // 2, y + cell // 2)) == background:
+                    continue  # Unused cell
+                connected = [surface.get_at((x + sx, y + sy)) != background for sx, sy in samples]
+                mask = sum(1 << bit for bit in range(4) if connected[bit])
+                for bit, (a, b) in enumerate(AUTOTILE_CORNERS, 4):
+                    if connected[bit] and connected[a] and connected[b]:
+                        mask |= 1 << bit
+                rects.setdefault(mask, pygame.Rect(x, y, cell, cell))
+
+        cells = {mask: surface.subsurface(rect).convert() for mask, rect in rects.items()}
+        if 0 not in cells and 4 in cells and 1 in cells:  # Top half of the top cap, bottom of the bottom cap
+            cells[0] = cells[4].copy()
+            cells[0].blit(cells[1], (0, cell // 2), (0, cell // 2, cell, cell - cell // 2))
+
+        fill = surface.get_at(rects[AUTOTILE_FULL].center)
+        borders = {}
+        for mask, border in cells.items():
+            border.set_colorkey(fill)
+            borders[mask] = border.convert_alpha()
+        return borders
+
+
+class AssetCache:
+    """Converted, scaled surfaces kept on disk between launches
+
+    One file holds everything: a header, a JSON index and the raw RGBA
+    pixels of every surface. Each entry is a named group of surfaces,
+    stamped with the mtime and size of the files it was built from and a
+    checksum of how it was built (target sizes included), so touching a
+    PNG or changing a size rebuilds just that entry. Hits come back through
+    pygame.image.frombuffer, with no PNG decoding, slicing or scaling.
+    A cache with no path builds everything and keeps nothing.
+    """
+    HEADER = struct.Struct("<4sHI")
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.index: Dict[str, dict] = {}
+        self.data = memoryview(b"")
+        self.built: Dict[str, Tuple[list, int, Dict[str, pygame.Surface]]] = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                self.load(path)
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Ignoring asset cache {path}: {e}")
+                self.index = {}
+
+    def load(self, path: str):
+        """Read the index and keep the pixels in memory for frombuffer"""
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, index_size = self.HEADER.unpack_from(data)
+        if magic != ASSET_CACHE_MAGIC or version != ASSET_CACHE_VERSION:
+            raise ValueError(f"not a version {ASSET_CACHE_VERSION} asset cache")
+        start = self.HEADER.size + index_size
+        self.index = json.loads(data[self.HEADER.size:start])
+        self.data = memoryview(data)[start:]
+
+    @staticmethod
+    def stamp(files) -> list:
+        """mtime and size of each source file, None for ones that don't exist"""
+        stamp = []
+        for path in files:
+            try:
+                info = os.stat(path)
+                stamp.append([path, info.st_mtime_ns, info.st_size])
+            except OSError:
+                stamp.append([path, None, None])
+        return stamp
+
+    def valid(self, key: str, files, spec) -> bool:
+        """Whether key's entry was built from these files and spec"""
+        entry = self.index.get(key)
+        return bool(entry) and entry["stamp"] == self.stamp(files) and entry["spec"] == zlib.crc32(repr(spec).encode())
+
+    def get(self, key: str, files, spec, build) -> Dict[str, pygame.Surface]:
+        """Surfaces for key, read back if files and spec are unchanged, else from build()"""
+        if not self.path:
+            return build()
+        stamp = self.stamp(files)
+        checksum = zlib.crc32(repr(spec).encode())
+        entry = self.index.get(key)
+        if entry and entry["stamp"] == stamp and entry["spec"] == checksum:
+            try:
+                surfaces = {name: self.restore(offset, width, height, alpha)
+                            for name, width, height, offset, alpha in entry["surfaces"]}
+                self.hits += 1
+                return surfaces
+            except ValueError:
+                pass  # Truncated file
+
+        self.misses += 1
+        surfaces = build()
+        self.built[key] = (stamp, checksum, surfaces)
+        return surfaces
+
+    def restore(self, offset: int, width: int, height: int, alpha: bool) -> pygame.Surface:
+        """One cached surface, converted to the display format"""
+        pixels = self.data[offset:offset + width * height * 4]
+        surface = pygame.image.frombuffer(pixels, (width, height), "RGBA")
+        return surface.convert_alpha() if alpha else surface.convert()
+
+    def save(self):
+        """Write the file again if anything was rebuilt since it was read"""
+        if not self.path or not self.built:
+            return
+        index = {}
+        blob = bytearray()
+        for key, entry in self.index.items():
+            if key in self.built:
+                continue
+            surfaces = []
+            for name, width, height, offset, alpha in entry["surfaces"]:
+                surfaces.append([name, width, height, len(blob), alpha])
+                blob += self.data[offset:offset + width * height * 4]
+            index[key] = dict(entry, surfaces=surfaces)
+        for key, (stamp, checksum, built) in self.built.items():
+            surfaces = []
+            for name, surface in built.items():
+                alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+                surfaces.append([name, surface.get_width(), surface.get_height(), len(blob), alpha])
+                blob += pygame.image.tobytes(surface, "RGBA")
+            index[key] = {"stamp": stamp, "spec": checksum, "surfaces": surfaces}
+
+        encoded = json.dumps(index, separators=(",", ":")).encode()
+        try:
+            with open(self.path + ".tmp", "wb") as f:
+                f.write(self.HEADER.pack(ASSET_CACHE_MAGIC, ASSET_CACHE_VERSION, len(encoded)))
+                f.write(encoded)
+                f.write(blob)
+            os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            print(f"Could not write asset cache {self.path}: {e}")
+            return
+        self.index = index
+        self.data = memoryview(bytes(blob))
+        self.built.clear()
+
+
+class AssetManager:
+    """Sprites decoded and scaled on first use, as described by ASSET_MANIFEST
+
+    Nothing is read from disk until a key is asked for; its sources are
+    then tried in order and the first that loads is cached. Keys with no
+    loadable source are cached as empty, so callers fall back to their
+    shapes without touching the disk again. warm_up() loads a list ahead
+    of the first frame, decoding their files in parallel. With a cache,
+    decoded frames are read back from it on later launches.
+    """
+    def __init__(self, directory: str, atlas: SpriteAtlas, manifest: Optional[dict] = None,
+                 cache: Optional[AssetCache] = None):
+        self.directory = directory
+        self.atlas = atlas
+        self.manifest = ASSET_MANIFEST if manifest is None else manifest
+        self.cache = cache or AssetCache(None)
+        self.loaded: Dict[str, Tuple[pygame.Surface, ...]] = {}
+
+    def __len__(self):
+        return sum(1 for frames in self.loaded.values() if frames)
+
+    def frames(self, key: str) -> Tuple[pygame.Surface, ...]:
+        """Every frame of an asset: one for still sprites, none if it couldn't be loaded"""
+        frames = self.loaded.get(key)
+        if frames is None:
+            sources = self.manifest.get(key, ())
+            frames = tuple(self.cache.get(f"asset:{key}", self.source_files(sources), sources,
+                                          lambda: self.load(sources)).values())
+            self.loaded[key] = frames
+        return frames
+
+    def load(self, sources) -> Dict[str, pygame.Surface]:
+        """Frames of the first source that loads, named by index"""
+        for kind, source, size in sources:
+            frames = self.decode(kind, source, size)
+            if frames:
+                return {str(i): frame for i, frame in enumerate(frames)}
+        return {}
+
+    def source_files(self, sources) -> List[str]:
+        """Files a key's sources are read from; atlas sprites come from their sheet and its manifest"""
+        files = []
+        for kind, source, _ in sources:
+            if kind in ("atlas", "strip"):
+                entry = self.atlas.index.get(source)
+                if entry:
+                    files += [self.atlas.path(entry[0]), self.atlas.manifest_path(entry[0])]
+            else:
+                files.append(os.path.join(self.directory, source))
+        return files
+
+    def get(self, key: str) -> Optional[pygame.Surface]:
+        """An asset's first frame, or None"""
+        frames = self.frames(key)
+        return frames[0] if frames else None
+
+    def warm_up(self, keys):
+        """Load assets now rather than when they're first drawn"""
+        keys = [key for key in keys if key not in self.loaded]
+        files = []
+        for key in keys:
+            sources = self.manifest.get(key, ())
+            if not self.cache.path or not self.cache.valid(f"asset:{key}", self.source_files(sources), sources):
+                files += self.source_files(sources[:1])
+        decoded = {self.atlas.path(sheet) for sheet in self.atlas.sheets}
+        self.atlas.images.request(path for path in files if path not in decoded and not path.endswith(".txt"))
+        for key in keys:
+            self.frames(key)
+
+    def decode(self, kind: str, source: str, size: Optional[int]) -> Tuple[pygame.Surface, ...]:
+        """Load one manifest source, scaled to size x size"""
+        try:
+            if kind == "atlas":
+                sprite = self.atlas.get(source)
+                frames = (sprite,) if sprite else ()
+            elif kind == "strip":
+                frames = self.atlas.frames(source)
+            else:
+                path = os.path.join(self.directory, source)
+                if not os.path.exists(path):
+                    return ()
+                image = self.atlas.images.load(path).convert_alpha()
+                if kind == "sheet":  # Frames are square, side by side
+                    image = image.subsurface((0, 0, image.get_height(), image.get_height()))
+                frames = (image,)
+        except (pygame.error, OSError) as e:
+            print(f"Error loading {source}: {e}")
+            return ()
+        if size:
+            frames = tuple(pygame.transform.scale(frame, (size, size)) for frame in frames)
+        return frames
+
+
+class Minimap:
+    """World overview written with surfarray and patched as the world changes
+
+    base holds one pixel per tile and is filled from the tile and biome
+    grids in a single array write. Changed tiles and new buildings patch
+    single pixels, and the scaled copy shown on screen is only rebuilt
+    after a patch. Enemy and player markers go on in one blits() call.
+    """
+    def __init__(self, size: int = MINIMAP_SIZE):
+        self.size = size
+        self.rect = pygame.Rect(SCREEN_WIDTH - size - 10, SCREEN_HEIGHT - size - 80, size, size)
+        self.base = new_surface((WORLD_SIZE, WORLD_SIZE)).convert()
+        self.view = new_surface((size, size)).convert()
+        self.fog_view = new_surface((size, size)).convert()
+        self.fog_view.set_colorkey(FOG_CLEAR)
+        self.fog_revision = None
+        self.stale = True
+        self.visible = True
+        self.tile_colors = np.array([TILE_COLORS[tile] for tile in TileType], dtype=np.float32)
+        self.biome_shades = np.array([MINIMAP_BIOME_SHADE[biome] for biome in BiomeType], dtype=np.float32)
+        self.biome_order = {biome: i for i, biome in enumerate(BiomeType)}
+        self.buildings = set()  # Tiles showing a building marker, which tile changes leave alone
+        self.enemy_marker = new_surface((3, 3)).convert()
+        self.enemy_marker.fill((255, 40, 40))
+        self.player_marker = new_surface((5, 5)).convert()
+        self.player_marker.fill(WHITE)
+
+    def build(self, world: "World"):
+        """Render the whole world from its tile and biome grids"""
+        tiles = np.array([[tile.value for tile in row] for row in world.tiles], dtype=np.intp)
+        biomes = np.array([[self.biome_order[biome] for biome in row] for row in world.biomes], dtype=np.intp)
+        pixels = self.tile_colors[tiles] * self.biome_shades[biomes][:, :, None]
+        pygame.surfarray.blit_array(self.base, pixels.astype(np.uint8).transpose(1, 0, 2))
+        self.buildings.clear()
+        for building in world.buildings:
+            self.mark_building(building.x, building.y, building.building_type)
+        self.stale = True
+
+    def patch_tile(self, x: int, y: int, tile: TileType, biome: BiomeType):
+        """Recolor one changed tile, the same colour build() would give it"""
+        if (x, y) in self.buildings:
+            return
+        color = self.tile_colors[tile.value] * self.biome_shades[self.biome_order[biome]]
+        self.base.set_at((x, y), color.astype(np.uint8).tolist())
+        self.stale = True
+
+    def mark_building(self, x: int, y: int, building_type: str):
+        """Draw a placed building in its render color"""
+        self.buildings.add((x, y))
+        self.base.set_at((x, y), RENDER_TYPES[building_type][2])
+        self.stale = True
+
+    def draw(self, screen: pygame.Surface, snap: "WorldSnapshot", fog: Optional[FogOfWar] = None):
+        """Blit the overview, the camera's view and every marker outside the fog"""
+        if self.stale or (fog and fog.revision != self.fog_revision):
+            pygame.transform.scale(self.base, (self.size, self.size), self.view)
+            if fog:
+                pygame.transform.scale(fog.mask, (self.size, self.size), self.fog_view)
+                self.view.blit(self.fog_view, (0, 0))
+                self.fog_revision = fog.revision
+            self.stale = False
+        screen.blit(self.view, self.rect)
+        count_draws()
+
+        scale = self.size / WORLD_SIZE
+        x0, y0 = self.rect.topleft
+        markers = [(self.enemy_marker, (x0 + x * scale - 1, y0 + y * scale - 1))
+                   for x, y in snap.enemy_positions if not fog or fog.is_explored(x, y)]
+        markers.append((self.player_marker, (x0 + snap.player.x * scale - 2, y0 + snap.player.y * scale - 2)))
+        screen.blits(markers, doreturn=False)
+        count_draws(len(markers))
+
+        left, top = view_origin(snap.camera_x, snap.camera_y, snap.tile_size)
+        view_scale = scale / snap.tile_size
+        view = pygame.Rect(x0 + left * view_scale, y0 + top * view_scale,
+                           SCREEN_WIDTH * view_scale, SCREEN_HEIGHT * view_scale).clip(self.rect)
+        pygame.draw.rect(screen, WHITE, view, 1)
+        pygame.draw.rect(screen, WHITE, self.rect.inflate(2, 2), 1)
+        count_draws(2, 2)
+
+
+class QualityLevel(NamedTuple):
+    """How much optional rendering work one quality step allows"""
+    name: str
+    particles: float  # Fraction of requested particles actually emitted
+    outlines: bool  # Outlined damage numbers
+    light_scale: int  # LightMap resolution divisor
+    enemy_lod: Optional[float]  # Tiles from the player before enemies update less often
+    hud_interval: int  # Frames between HUD layer refreshes
+    weather: float  # Fraction of each weather's drops or flakes drawn
+
+
+QUALITY_LEVELS = (  # Best first
+    QualityLevel("high", 1.0, True, 4, None, 1, 1.0),
+    QualityLevel("medium", 0.5, True, 6, 24, 2, 0.6),
+    QualityLevel("low", 0.25, False, 8, 18, 4, 0.35),
+    QualityLevel("minimal", 0.0, False, 8, 16, 8, 0.15),
+)
+
+
+class QualityGovernor:
+    """Steps optional work down when frames run over budget, and back up
+
+    Work time per frame (everything but the frame limiter's sleep) is
+    averaged over GOVERNOR_WINDOW frames. One window over budget drops a
+    level; GOVERNOR_RAISE_WINDOWS windows in a row with headroom raise one,
+    so the level doesn't flap around the threshold. toggle() (F5) switches
+    it off, pinning the current level, and back on.
+    """
+    def __init__(self, budget_ms: float = 1000 / FPS, window: int = GOVERNOR_WINDOW):
+        self.budget_ms = budget_ms
+        self.frame_times = deque(maxlen=window)
+        self.level = 0
+        self.frames = 0
+        self.calm_windows = 0
+        self.enabled = True
+
+    @property
+    def quality(self) -> QualityLevel:
+        return QUALITY_LEVELS[self.level]
+
+    def average_ms(self) -> float:
+        return sum(self.frame_times) / max(1, len(self.frame_times))
+
+    def record(self, frame_ms: float) -> bool:
+        """Add one frame's work time; True if the quality level changed"""
+        self.frames += 1
+        self.frame_times.append(frame_ms)
+        if not self.enabled or self.frames % self.frame_times.maxlen:
+            return False
+
+        average = self.average_ms()
+        if average > self.budget_ms * GOVERNOR_OVER_BUDGET:
+            self.calm_windows = 0
+            if self.level < len(QUALITY_LEVELS) - 1:
+                return self.set_level(self.level + 1, average)
+        elif average < self.budget_ms * GOVERNOR_HEADROOM and self.level > 0:
+            self.calm_windows += 1
+            if self.calm_windows >= GOVERNOR_RAISE_WINDOWS:
+                self.calm_windows = 0
+                return self.set_level(self.level - 1, average)
+        else:
+            self.calm_windows = 0
+        return False
+
+    def toggle(self):
+        """Switch adapting on or off, logging it"""
+        self.enabled = not self.enabled
+        self.calm_windows = 0
+        print(f"Quality governor {'on' if self.enabled else 'off'}, at {self.quality.name}")
+
+    def set_level(self, level: int, average: float) -> bool:
+        """Switch quality level, logging why"""
+        print(f"Quality {self.quality.name} -> {QUALITY_LEVELS[level].name} "
+              f"(average frame {average:.1f} ms, budget {self.budget_ms:.1f} ms)")
+        self.level = level
+        return True
+
+
+class RenderProfiler:
+    """Per-pass timings and draw counts for the game view
+
+    draw_game calls begin(), then mark(name) as each of PROFILER_PASSES
+    finishes: the pass is timed from the previous mark with
+    perf_counter_ns() and charged the count_draws() calls made since. The
+    last PROFILER_WINDOW frames are kept in fixed NumPy rings that stats()
+    turns into rolling averages and p99s. Given a CSV path, the stats of
+    every full window are appended to it, one row per pass.
+    """
+    CSV_HEADER = ("frame", "pass", "avg_ms", "p99_ms", "calls", "blits")
+
+    def __init__(self, window: int = PROFILER_WINDOW, csv_path: Optional[str] = None):
+        self.window = window
+        self.rows = {name: row for row, name in enumerate(PROFILER_PASSES)}
+        self.times = np.zeros((len(PROFILER_PASSES), window), np.int64)  # Nanoseconds
+        self.calls = np.zeros((len(PROFILER_PASSES), window), np.int32)
+        self.blits = np.zeros((len(PROFILER_PASSES), window), np.int32)
+        self.frames = 0  # Since the last reset
+        self.total_frames = 0  # Since startup, for the CSV
+        self.last = (0, 0, 0)  # Clock and counters at the previous mark
+        self.csv_path = csv_path
+        if csv_path:
+            with open(csv_path, "w", newline="") as f:
+                csv.writer(f).writerow(self.CSV_HEADER)
+
+    def reset(self):
+        """Start the rolling window afresh"""
+        self.frames = 0
+
+    def begin(self):
+        """Start timing a frame's first pass"""
+        self.last = (systime.perf_counter_ns(), draw_calls, blits_drawn)
+
+    def mark(self, name: str):
+        """End a pass, charging it the time and draws since the previous mark"""
+        now = (systime.perf_counter_ns(), draw_calls, blits_drawn)
+        row, slot = self.rows[name], self.frames % self.window
+        self.times[row, slot] = now[0] - self.last[0]
+        self.calls[row, slot] = now[1] - self.last[1]
+        self.blits[row, slot] = now[2] - self.last[2]
+        self.last = now
+
+    def end_frame(self):
+        """Close the frame, exporting the window's stats each time it fills"""
+        self.frames += 1
+        self.total_frames += 1
+        if self.csv_path and not self.frames % self.window:
+            with open(self.csv_path, "a", newline="") as f:
+                writer = csv.writer(f)
+                for name, average, p99, calls, blits in self.stats():
+                    writer.writerow((self.total_frames, name, f"{average:.4f}", f"{p99:.4f}", f"{calls:.1f}", f"{blits:.1f}"))
+
+    def stats(self) -> List[Tuple[str, float, float, float, float]]:
+        """(pass, average ms, p99 ms, calls, blits) over the window, each pass then the whole frame"""
+        filled = min(self.frames, self.window)
+        if not filled:
+            return []
+        times = self.times[:, :filled] / 1e6
+        calls = self.calls[:, :filled]
+        blits = self.blits[:, :filled]
+        times = np.vstack((times, times.sum(axis=0)))
+        calls = np.vstack((calls, calls.sum(axis=0)))
+        blits = np.vstack((blits, blits.sum(axis=0)))
+        return list(zip(PROFILER_PASSES + ("frame",), times.mean(axis=1).tolist(),
+                        np.percentile(times, 99, axis=1).tolist(),
+                        calls.mean(axis=1).tolist(), blits.mean(axis=1).tolist()))
 
 
 class GameState:
     """Main game state"""
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, headless: bool = False,
+                 asset_cache: Optional[str] = ASSET_CACHE_PATH):
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Tiny Swords Roguelike")
 
         self.clock = pygame.time.Clock()
         self.running = True
 
+        # Seeding the global RNG up front makes every world of the session
+        # (and everything simulated in it) reproducible from this one number
+        self.seed = seed
+        if seed is not None:
+            random.seed(seed)
+        self.recording: Optional[InputRecording] = None
+        self.tick = 0
+        self.headless = headless  # No rendering and no presentation listeners
+
         # Game state
         self.state = "menu"  # menu, playing, inventory, crafting, building_placement
         self.world = None
@@ -1214,109 +3166,230 @@ class GameState:
 
         # Visual effects
         self.damage_numbers = []  # List of {x, y, damage, lifetime, color}
-        self.particles = []  # List of {x, y, vx, vy, lifetime, color, size}
+        # Effects draw from their own RNG so the simulation's random stream
+        # is identical whether or not anything is being presented
+        self.particles = ParticleSystem()
+        self.weather = WeatherSystem()
+        self.animation_time = 0.0  # Shared clock for every animated tile and sprite
         self.harvesting_target = None  # Track current harvesting target for progress bar
 
         # UI
         self.font = pygame.font.Font(None, 24)
         self.title_font = pygame.font.Font(None, 48)
         self.small_font = pygame.font.Font(None, 18)
+        self.text_cache = TextCache()
 
         # Crafting
         self.crafting_system = CraftingSystem()
 
         # Load assets
+        self.asset_cache_path = asset_cache  # None decodes everything every launch
+        self.images: Optional[ImageLoader] = None
         self.load_assets()
+        self.terrain = TerrainChunkCache(self.tile_textures, animations=self.tile_animations,
+                                         borders=self.tile_borders)
+        # Render entries per zoom level, each scaled once when first drawn at that level
+        self.zoom_registries: Dict[int, Dict[str, RenderEntry]] = {tile_size: {} for tile_size in ZOOM_TILE_SIZES}
+        self.tile_size = TILE_SIZE  # On-screen tile size, changed by zooming
+        self.minimap = Minimap()
+        self.fog = FogOfWar()
+        self.wall_masks: Dict[Tuple[int, int], int] = {}  # Neighbour mask of each wooden wall, by tile
+        self.explored_path: Optional[str] = None  # Keeps the explored map between sessions
+        self.hud_layers = self.build_hud_layers()
+
+        # Overlays are built once; only their alpha changes per frame
+        self.cooldown_shade = new_surface((60, 60)).convert()
+        self.cooldown_shade.set_alpha(180)
+        self.light_map = LightMap()
+        self.dim_overlay = new_surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+
+        # Modal screens: saved full frame, and what was last drawn over it
+        self.modal_background = new_surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.modal_key = None
+        self.modal_mouse = None
+        self.tooltip_rect = None
+
+        # Optional work scales with measured frame time
+        self.governor = QualityGovernor()
+        self.show_debug = False  # F3 overlay
+        self.show_profiler = False  # F4 overlay
+        self.profiler = RenderProfiler()  # Times draw_game's passes
 
     def load_assets(self):
-        """Load game assets"""
-        self.assets = {}
+        """Set up the sprite manifest and build the terrain textures
+
+        Object and character sprites load lazily through self.assets;
+        terrain is drawn from the first frame, so its textures are made here.
+        Both go through the asset cache when the session has one.
+        """
+        self.tile_textures = {}
+        self.tile_animations: Dict[TileType, List[pygame.Surface]] = {}
+        self.tile_borders: Dict[TileType, Dict[int, pygame.Surface]] = {}
         asset_path = "./assets"
-
+        if self.images:
+            self.images.close()
+        self.images = ImageLoader()
+        self.atlas = SpriteAtlas(os.path.join(asset_path, "32rogues-0.5.0", "32rogues"), self.images)
+        self.asset_cache = AssetCache(self.asset_cache_path)
+        self.assets = AssetManager(asset_path, self.atlas, cache=self.asset_cache)
+
+        terrain_path = os.path.join(asset_path, "Tiny Swords (Free Pack)", "Terrain")
+        files = [os.path.join(terrain_path, "Tilemap_color1.png"),
+                 os.path.join(terrain_path, "Water Background color.png")]
+        for sheet in ("tiles", "animated-tiles", "autotiles"):
+            files += [self.atlas.path(sheet), self.atlas.manifest_path(sheet)]
+        spec = (TILE_SIZE, TILE_COLORS, TILE_DETAILS, ANIMATED_TILES, AUTOTILES)
+        surfaces = self.asset_cache.get("terrain", files, spec, lambda: self.build_terrain(terrain_path, files))
+
+        for name, surface in surfaces.items():
+            kind, tile, *mask = name.split()
+            tile = TileType[tile]
+            if kind == "texture":
+                self.tile_textures[tile] = surface
+            elif kind == "frame":
+                self.tile_animations.setdefault(tile, []).append(surface)
+            else:
+                self.tile_borders.setdefault(tile, {})[int(mask[0])] = surface
+
+    def build_terrain(self, terrain_path: str, files: List[str]) -> Dict[str, pygame.Surface]:
+        """Terrain textures, animation frames and borders, named like "frame WATER 2" for the cache"""
+        self.images.request(path for path in files if not path.endswith(".txt"))
+        textures = {}
+        animations = {}
+        borders = {}
         try:
-            # Load character sprites - extract single frame from spritesheet
-            for char in ["warrior", "mage", "archer", "paladin"]:
-                path = os.path.join(asset_path, f"{char}.png")
-                if os.path.exists(path):
-                    spritesheet = pygame.image.load(path).convert_alpha()
-                    # Extract first frame (assuming 192x192 frames in a row)
-                    frame_width = spritesheet.get_height()  # Usually square frames
-                    frame = pygame.Surface((frame_width, frame_width), pygame.SRCALPHA)
-                    frame.blit(spritesheet, (0, 0), (0, 0, frame_width, frame_width))
-                    # Scale down to reasonable size
-                    self.assets[char] = pygame.transform.scale(frame, (48, 48))
-
-            # Load environment objects from assets folder root
-            for obj in ["tree1", "tree2", "rock1", "rock2", "bush1", "bush2"]:
-                path = os.path.join(asset_path, f"{obj}.png")
-                if os.path.exists(path):
-                    sprite = pygame.image.load(path).convert_alpha()
-                    # Scale to reasonable size
-                    self.assets[obj] = pygame.transform.scale(sprite, (32, 32))
-
-            # Load Tiny Swords assets
-            tiny_swords_path = os.path.join(asset_path, "Tiny Swords (Free Pack)", "Decorations")
-
-            # Load trees from Tiny Swords
-            tree_path = os.path.join(tiny_swords_path, "Trees")
-            for i in range(1, 5):  # Tree1.png to Tree4.png
-                path = os.path.join(tree_path, f"Tree{i}.png")
-                if os.path.exists(path):
-                    sprite = pygame.image.load(path).convert_alpha()
-                    self.assets[f"tree{i}"] = pygame.transform.scale(sprite, (48, 48))
-
-            # Load rocks from Tiny Swords
-            rock_path = os.path.join(tiny_swords_path, "Rocks")
-            for i in range(1, 5):  # Rock1.png to Rock4.png
-                path = os.path.join(rock_path, f"Rock{i}.png")
-                if os.path.exists(path):
-                    sprite = pygame.image.load(path).convert_alpha()
-                    self.assets[f"rock{i}"] = pygame.transform.scale(sprite, (32, 32))
-
-            # Load bushes from Tiny Swords (note the typo in filenames)
-            bush_path = os.path.join(tiny_swords_path, "Bushes")
-            for i in range(1, 5):  # Bushe1.png to Bushe4.png
-                path = os.path.join(bush_path, f"Bushe{i}.png")
-                if os.path.exists(path):
-                    sprite = pygame.image.load(path).convert_alpha()
-                    self.assets[f"bush{i}"] = pygame.transform.scale(sprite, (32, 32))
-
-            # Load fantasy icons for minerals and special items
-            fantasy_icon_path = os.path.join(asset_path, "Free - Raven Fantasy Icons",
-                                           "Free - Raven Fantasy Icons", "Separated Files", "32x32")
-
-            # Map specific fantasy icons to game resources (educated guesses for resource icons)
-            icon_mappings = {
-                "mushroom": "fb150.png",   # Try different ranges for resources
-                "cactus": "fb200.png",     # Plants/nature
-                "ice": "fb300.png",        # Ice/crystals
-                "iron_ore": "fb400.png",   # Metals/ores
-                "gold_ore": "fb450.png",   # Gold/precious metals
-                "gems": "fb500.png",       # Gems/crystals
-                "ruin": "fb600.png",       # Buildings/structures
-                "cave": "fb700.png"        # Dark/cave entries
-            }
-
-            for asset_name, filename in icon_mappings.items():
-                path = os.path.join(fantasy_icon_path, filename)
-                if os.path.exists(path):
-                    sprite = pygame.image.load(path).convert_alpha()
-                    self.assets[asset_name] = pygame.transform.scale(sprite, (32, 32))
-
-
+            # Load terrain textures (only used when pre-rendering chunks)
+            path = os.path.join(terrain_path, "Tilemap_color1.png")
+            if os.path.exists(path):
+                tilemap = self.images.load(path).convert()
+                # Middle of the flat grass block, 64x64 tiles
+                grass = tilemap.subsurface((128, 128, 64, 64))
+                textures[TileType.GRASS] = pygame.transform.scale(grass, (TILE_SIZE, TILE_SIZE))
 
-            # Load wizard sprite
-            path = os.path.join(asset_path, "wizard.png")
+            path = os.path.join(terrain_path, "Water Background color.png")
             if os.path.exists(path):
-                spritesheet = pygame.image.load(path).convert_alpha()
-                frame_width = spritesheet.get_height()
-                frame = pygame.Surface((frame_width, frame_width), pygame.SRCALPHA)
-                frame.blit(spritesheet, (0, 0), (0, 0, frame_width, frame_width))
-                self.assets["wizard"] = pygame.transform.scale(frame, (48, 48))
+                water = self.images.load(path).convert()
+                textures[TileType.WATER] = pygame.transform.scale(water, (TILE_SIZE, TILE_SIZE))
+
+            # 32rogues floor details drawn over the tile colour
+            for tile, sprite_name in TILE_DETAILS.items():
+                detail = self.atlas.get(f"tiles:{sprite_name}")
+                if detail:
+                    texture = new_surface((TILE_SIZE, TILE_SIZE)).convert()
+                    texture.fill(TILE_COLORS[tile])
+                    texture.blit(pygame.transform.scale(detail, (TILE_SIZE, TILE_SIZE)), (0, 0))
+                    textures[tile] = texture
+
+            # Animated tiles, sliced once from 32rogues' animated-tiles strips
+            for tile, (strip_name, recolor) in ANIMATED_TILES.items():
+                strip = self.atlas.frames(f"animated-tiles:{strip_name}")
+                base = textures.get(tile)
+                if not strip or base is None:
+                    continue
+                frames = []
+                for cell in strip:
+                    overlay = cell.convert()
+                    overlay.set_colorkey(overlay.get_at((0, 0)))  # The strip's flat background
+                    if recolor:
+                        overlay = pygame.mask.from_surface(overlay).to_surface(setcolor=recolor,
+                                                                               unsetcolor=(0, 0, 0, 0))
+                    frame = base.copy()
+                    frame.blit(pygame.transform.scale(overlay, (TILE_SIZE, TILE_SIZE)), (0, 0))
+                    frames.append(frame)
+                animations[tile] = frames
+                textures[tile] = frames[0]
+
+            # Shoreline borders for the autotiled terrain
+            if os.path.exists(os.path.join(self.atlas.directory, "autotiles.png")):
+                for tile, row in AUTOTILES.items():
+                    borders[tile] = self.atlas.autotiles("autotiles", row)
 
         except Exception as e:
             print(f"Error loading assets: {e}")
 
+        surfaces = {f"texture {tile.name}": texture for tile, texture in textures.items()}
+        for tile, frames in animations.items():
+            surfaces.update((f"frame {tile.name} {i}", frame) for i, frame in enumerate(frames))
+        for tile, masks in borders.items():
+            surfaces.update((f"border {tile.name} {mask}", border) for mask, border in masks.items())
+        return surfaces
+
+    def render_entry(self, render_id: str, tile_size: int = TILE_SIZE) -> Optional[RenderEntry]:
+        """Registry entry for a render type at a zoom level, built on first use
+
+        The 1:1 entry resolves RENDER_TYPES against the asset manager, and
+        every other zoom level pre-scales that once. None for unknown ids.
+        """
+        registry = self.zoom_registries[tile_size]
+        entry = registry.get(render_id)
+        if entry is None:
+            if tile_size != TILE_SIZE:
+                entry = self.render_entry(render_id)
+                entry = entry and self.scale_render_entry(entry, tile_size / TILE_SIZE)
+            else:
+                entry = self.build_render_entry(render_id)
+            if entry:
+                registry[render_id] = entry
+        return entry
+
+    def build_render_entry(self, render_id: str) -> Optional[RenderEntry]:
+        """Resolve one render type against the loaded assets
+
+        Types without a loadable sprite get their fallback shape drawn into
+        a small surface, so every world object can go through one blits() call.
+        """
+        if render_id in WALL_RENDER_IDS:
+            return RenderEntry(self.wall_sprite(WALL_RENDER_IDS.index(render_id)), (-(TILE_SIZE // 2), -(TILE_SIZE // 2)))
+        if render_id not in RENDER_TYPES:
+            return None
+
+        asset_key, shape, color, size = RENDER_TYPES[render_id]
+        frames = self.assets.frames(asset_key)
+        sprite = frames[0] if frames else None
+        if sprite is None:
+            sprite = new_surface((size * 2, size * 2), pygame.SRCALPHA)
+            if shape == "circle":
+                pygame.draw.circle(sprite, color, (size, size), size)
+            else:
+                sprite.fill(color)
+            sprite = sprite.convert_alpha()
+        return RenderEntry(sprite, (-(sprite.get_width() // 2), -(sprite.get_height() // 2)),
+                           frames if len(frames) > 1 else ())
+
+    @staticmethod
+    def wall_sprite(mask: int) -> pygame.Surface:
+        """Wooden wall reaching out to the tile edges on the sides set in a 4-bit neighbour mask"""
+        _, _, color, size = RENDER_TYPES["wooden_wall"]
+        edge_color = tuple(c * 3 // 5 for c in color)
+        inset = TILE_SIZE // 2 - size
+        body = pygame.Rect(inset, inset, size * 2, size * 2)
+        for bit, (dx, dy) in enumerate(AUTOTILE_NEIGHBORS[:4]):
+            if mask & (1 << bit):
+                body.union_ip(body.move(dx * inset, dy * inset))
+
+        sprite = new_surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
+        sprite.fill(color, body)
+        for plank_y in range(body.top + 6, body.bottom, 6):
+            sprite.fill(edge_color, (body.left, plank_y, body.width, 1))
+        sides = ((body.left, body.top, body.width, 2), (body.right - 2, body.top, 2, body.height),
+                 (body.left, body.bottom - 2, body.width, 2), (body.left, body.top, 2, body.height))
+        for bit, side in enumerate(sides):
+            if not mask & (1 << bit):
+                sprite.fill(edge_color, side)
+        return sprite.convert_alpha()
+
+    @staticmethod
+    def scale_render_entry(entry: RenderEntry, factor: float) -> RenderEntry:
+        """A registry entry with its sprite and anchor scaled for a zoom level"""
+        return RenderEntry(scale_surface(entry.sprite, factor),
+                           (round(entry.anchor[0] * factor), round(entry.anchor[1] * factor)),
+                           tuple(scale_surface(frame, factor) for frame in entry.frames))
+
+    def zoom(self, steps: int):
+        """Move steps zoom levels in (positive) or out (negative)"""
+        level = ZOOM_TILE_SIZES.index(self.tile_size) + steps
+        self.tile_size = ZOOM_TILE_SIZES[max(0, min(len(ZOOM_TILE_SIZES) - 1, level))]
+
     def start_game(self, char_class: str):
         """Start a new game"""
         self.world = World()
@@ -1328,99 +3401,174 @@ class GameState:
             spawn_y = random.randint(10, WORLD_SIZE - 10)
 
         self.player = Player(spawn_x, spawn_y, char_class)
+        if not self.headless:
+            self.subscribe_presentation(self.world.events)
+            self.minimap.build(self.world)
+        self.terrain.set_tiles(self.world.tiles)
+        self.wall_masks = {}
+        self.fog = FogOfWar()
+        if self.explored_path and os.path.exists(self.explored_path):
+            try:
+                if not self.fog.load(self.explored_path, self.world.seed):
+                    print(f"{self.explored_path} was saved for a different world, starting unexplored")
+            except (OSError, ValueError, struct.error, zlib.error) as e:
+                print(f"Ignoring {self.explored_path} ({e}), starting unexplored")
         self.camera_x = int(spawn_x * TILE_SIZE)
         self.camera_y = int(spawn_y * TILE_SIZE)
 
         self.state = "playing"
         self.time = 0
         self.day_count = 1
+        if not self.headless:
+            self.warm_up()
+
+    def warm_up(self):
+        """Load what the first frame draws, and ASSET_WARMUP, before it's drawn"""
+        self.assets.warm_up(ASSET_WARMUP)
+        for item in self.make_snapshot().drawables:
+            self.render_entry(item.render_id, self.tile_size)
+        self.asset_cache.save()
+        self.images.close()  # Later sprites decode on first draw, without the pool
+        if self.images.decoded:
+            print(self.images.report())
+
+    def poll_input(self, dt_ms: int) -> InputFrame:
+        """Translate this tick's pygame input into an InputFrame"""
+        frame = InputFrame(dt_ms)
 
-    def handle_events(self):
-        """Handle input events"""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
-
+            elif event.type == pygame.WINDOWEXPOSED:
+                self.modal_key = None  # Window contents were lost, redraw modal screens in full
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_debug = not self.show_debug  # Presentation only, kept out of recordings
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                self.show_profiler = not self.show_profiler
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                self.governor.toggle()
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_EQUALS, pygame.K_KP_PLUS):
+                self.zoom(1)  # Zoom is presentation only too
+            elif event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                self.zoom(-1)
+            elif event.type == pygame.MOUSEWHEEL:
+                self.zoom(1 if event.y > 0 else -1)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_m:
+                self.minimap.visible = not self.minimap.visible
             elif event.type == pygame.KEYDOWN:
-                if self.state == "menu":
-                    if event.key == pygame.K_1:
-                        self.start_game("warrior")
-                    elif event.key == pygame.K_2:
-                        self.start_game("mage")
-                    elif event.key == pygame.K_3:
-                        self.start_game("archer")
-                    elif event.key == pygame.K_4:
-                        self.start_game("paladin")
-
-                elif self.state == "playing":
-                    if event.key == pygame.K_i:
-                        self.state = "inventory"
-                    elif event.key == pygame.K_c:
-                        self.state = "crafting"
-                    elif event.key == pygame.K_b:
-                        self.state = "building_placement"
-                        self.building_to_place = ItemType.CAMPFIRE  # Default
-                    elif event.key == pygame.K_ESCAPE:
-                        self.state = "menu"
-                    elif event.key == pygame.K_SPACE:  # Attack nearby enemies
-                        self.handle_attack()
-                    elif event.key == pygame.K_e:  # Interact/cook at campfire
-                        self.handle_interact()
-                    elif event.key == pygame.K_f:  # Use class ability
-                        if self.player and self.world:
-                            if self.player.use_ability(self.world, self):
-                                print(f"{self.player.char_class.title()} ability activated!")
-                            else:
-                                print(f"Ability on cooldown: {self.player.ability_cooldown:.1f}s")
-                    elif event.key == pygame.K_q:  # Drop item
-                        self.handle_drop_item()
-                    # Hotbar keys
-                    elif event.key == pygame.K_1:
-                        self.player.selected_hotbar_slot = 0
-                        self.player.use_hotbar_item(0)
-                    elif event.key == pygame.K_2:
-                        self.player.selected_hotbar_slot = 1
-                        self.player.use_hotbar_item(1)
-                    elif event.key == pygame.K_3:
-                        self.player.selected_hotbar_slot = 2
-                        self.player.use_hotbar_item(2)
-                    elif event.key == pygame.K_4:
-                        self.player.selected_hotbar_slot = 3
-                        self.player.use_hotbar_item(3)
-                    elif event.key == pygame.K_5:
-                        self.player.selected_hotbar_slot = 4
-                        self.player.use_hotbar_item(4)
-
-                elif self.state == "building_placement":
-                    if event.key == pygame.K_ESCAPE:
-                        self.state = "playing"
-                        self.building_to_place = None
-                    elif event.key == pygame.K_1:
-                        self.building_to_place = ItemType.CAMPFIRE
-                    elif event.key == pygame.K_2:
-                        self.building_to_place = ItemType.WOODEN_WALL
-
-                elif self.state in ["inventory", "crafting"]:
-                    if event.key == pygame.K_ESCAPE or event.key == pygame.K_i or event.key == pygame.K_c:
-                        self.state = "playing"
-
+                frame.actions.append((ACTION_KEY, event.key))
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                if self.state == "playing" and event.button == 1:  # Left click
-                    self.handle_gather_action()
-                elif self.state == "building_placement" and event.button == 1:  # Place building
-                    self.handle_place_building()
+                # Store world coordinates so replays don't depend on the camera
+                world_x = self.camera_x / TILE_SIZE + (event.pos[0] - SCREEN_WIDTH // 2) / self.tile_size
+                world_y = self.camera_y / TILE_SIZE + (event.pos[1] - SCREEN_HEIGHT // 2) / self.tile_size
+                frame.actions.append((ACTION_CLICK, event.button, world_x, world_y))
 
-    def handle_gather_action(self):
-        """Handle gathering resources"""
-        if not self.player:
-            return
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_w] or keys[pygame.K_UP]:
+            frame.held |= HELD_UP
+        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+            frame.held |= HELD_DOWN
+        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+            frame.held |= HELD_LEFT
+        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+            frame.held |= HELD_RIGHT
+        if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]:
+            frame.held |= HELD_SPRINT
+
+        return frame
+
+    def handle_events(self, frame: InputFrame):
+        """Handle one tick of input actions"""
+        for action in frame.actions:
+            if action[0] == ACTION_KEY:
+                self.handle_key(action[1])
+            elif action[0] == ACTION_CLICK:
+                _, button, world_x, world_y = action
+                if self.state == "playing" and button == 1:  # Left click
+                    self.handle_gather_action(world_x, world_y)
+                elif self.state == "building_placement" and button == 1:  # Place building
+                    self.handle_place_building(world_x, world_y)
+
+    def handle_key(self, key: int):
+        """Handle a single key press"""
+        if self.state == "menu":
+            if key == pygame.K_1:
+                self.start_game("warrior")
+            elif key == pygame.K_2:
+                self.start_game("mage")
+            elif key == pygame.K_3:
+                self.start_game("archer")
+            elif key == pygame.K_4:
+                self.start_game("paladin")
 
-        # Get mouse position
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        elif self.state == "playing":
+            if key == pygame.K_i:
+                self.state = "inventory"
+            elif key == pygame.K_c:
+                self.state = "crafting"
+            elif key == pygame.K_b:
+                self.state = "building_placement"
+                self.building_to_place = ItemType.CAMPFIRE  # Default
+            elif key == pygame.K_ESCAPE:
+                self.state = "menu"
+            elif key == pygame.K_SPACE:  # Attack nearby enemies
+                self.handle_attack()
+            elif key == pygame.K_e:  # Interact/cook at campfire
+                self.handle_interact()
+            elif key == pygame.K_f:  # Use class ability
+                if self.player and self.world:
+                    if self.player.use_ability(self.world):
+                        print(f"{self.player.char_class.title()} ability activated!")
+                    else:
+                        print(f"Ability on cooldown: {self.player.ability_cooldown:.1f}s")
+            elif key == pygame.K_q:  # Drop item
+                self.handle_drop_item()
+            # Hotbar keys
+            elif key == pygame.K_1:
+                self.player.selected_hotbar_slot = 0
+                self.player.use_hotbar_item(0)
+            elif key == pygame.K_2:
+                self.player.selected_hotbar_slot = 1
+                self.player.use_hotbar_item(1)
+            elif key == pygame.K_3:
+                self.player.selected_hotbar_slot = 2
+                self.player.use_hotbar_item(2)
+            elif key == pygame.K_4:
+                self.player.selected_hotbar_slot = 3
+                self.player.use_hotbar_item(3)
+            elif key == pygame.K_5:
+                self.player.selected_hotbar_slot = 4
+                self.player.use_hotbar_item(4)
 
-        # Convert to world position
-        world_x = (mouse_x - SCREEN_WIDTH // 2 + self.camera_x) / TILE_SIZE
-        world_y = (mouse_y - SCREEN_HEIGHT // 2 + self.camera_y) / TILE_SIZE
+        elif self.state == "building_placement":
+            if key == pygame.K_ESCAPE:
+                self.state = "playing"
+                self.building_to_place = None
+            elif key == pygame.K_1:
+                self.building_to_place = ItemType.CAMPFIRE
+            elif key == pygame.K_2:
+                self.building_to_place = ItemType.WOODEN_WALL
+
+        elif self.state in ["inventory", "crafting"]:
+            if key == pygame.K_ESCAPE or key == pygame.K_i or key == pygame.K_c:
+                self.state = "playing"
+            elif self.state == "crafting" and pygame.K_1 <= key <= pygame.K_9:
+                self.handle_craft(key - pygame.K_1)
+
+    def handle_craft(self, index: int):
+        """Craft the recipe at index into the first free inventory slot"""
+        if not self.player or not self.world or index >= len(self.crafting_system.recipes):
+            return
+        if None not in self.player.inventory:  # Inventory full
+            return
+        item = self.crafting_system.craft_item(self.player, self.crafting_system.recipes[index], self.world.events)
+        if item:
+            self.player.inventory[self.player.inventory.index(None)] = item
+
+    def handle_gather_action(self, world_x: float, world_y: float):
+        """Handle gathering resources at the clicked world position"""
+        if not self.player:
+            return
 
         # Check distance
         dist = math.sqrt((world_x - self.player.x)**2 + (world_y - self.player.y)**2)
@@ -1463,29 +3611,20 @@ class GameState:
 
         # Damage object
         destroyed = obj.take_damage(damage)
-
-        # Add visual feedback for gathering
-        if isinstance(obj, Tree):
-            self.add_particles(obj.x, obj.y, 5, (139, 69, 19))  # Wood particles
-        elif isinstance(obj, Rock):
-            self.add_particles(obj.x, obj.y, 5, (150, 150, 150))  # Stone particles
-        elif isinstance(obj, (Bush, MushroomPatch, CactusPlant)):
-            self.add_particles(obj.x, obj.y, 4, (50, 200, 50))  # Plant particles
-        else:
-            self.add_particles(obj.x, obj.y, 6, (255, 215, 0))  # Gold sparkles for minerals
+        self.world.events.emit(HarvestEvent(obj.x, obj.y, obj.obj_type))
 
         if destroyed:
             # Give resources
             if hasattr(obj, 'resource_type'):
                 amount = obj.resource_amount
                 self.player.add_resource(obj.resource_type, amount)
-                # Visual feedback
-                print(f"Gathered {amount} {obj.resource_type.value}!")
-                # Show resource gain as floating text
-                self.add_damage_number(obj.x, obj.y, amount, (100, 255, 100))
+                self.world.events.emit(LootEvent(obj.x, obj.y, obj.resource_type, amount))
 
-            # Remove object
-            self.world.objects.remove(obj)
+            # Plants regrow in place, everything else is used up
+            if hasattr(obj, 'regrow_time'):
+                self.world.deplete_resource(obj)
+            else:
+                self.world.remove_object(obj)
             self.harvesting_target = None
 
     def handle_attack(self):
@@ -1506,10 +3645,7 @@ class GameState:
 
         if nearest_enemy:
             damage = self.player.attack_enemy(nearest_enemy)
-            # Add damage number visual
-            self.add_damage_number(nearest_enemy.x, nearest_enemy.y, damage, (255, 100, 100))
-            # Add hit particles
-            self.add_particles(nearest_enemy.x, nearest_enemy.y, 8, (255, 50, 50))
+            self.world.events.emit(DamageEvent(nearest_enemy.x, nearest_enemy.y, damage, "melee"))
 
     def handle_interact(self):
         """Interact with nearby objects (harvest resources, cook at campfire, etc)"""
@@ -1561,17 +3697,14 @@ class GameState:
                     self.player.equipped_tool = None
                     break
 
-    def handle_place_building(self):
-        """Place a building at mouse position"""
+    def handle_place_building(self, world_x: float, world_y: float):
+        """Place a building at the clicked world position"""
         if not self.player or not self.world or not self.building_to_place:
             return
 
-        # Get mouse position
-        mouse_x, mouse_y = pygame.mouse.get_pos()
-
         # Convert to tile position
-        tile_x = int((mouse_x - SCREEN_WIDTH // 2 + self.camera_x) / TILE_SIZE)
-        tile_y = int((mouse_y - SCREEN_HEIGHT // 2 + self.camera_y) / TILE_SIZE)
+        tile_x = int(world_x)
+        tile_y = int(world_y)
 
         # Check distance
         dist = math.sqrt((tile_x - self.player.x)**2 + (tile_y - self.player.y)**2)
@@ -1584,8 +3717,8 @@ class GameState:
             self.state = "playing"
             self.building_to_place = None
 
-    def update(self, dt: float):
-        """Update game state"""
+    def update(self, dt: float, held: int = 0):
+        """Update game state; held is the HELD_* bitmask for this tick"""
         if self.state not in ["playing", "building_placement"]:
             return
 
@@ -1593,23 +3726,22 @@ class GameState:
             return
 
         # Handle movement
-        keys = pygame.key.get_pressed()
         dx = dy = 0
 
         # Check for sprint
         speed = self.player.speed
-        if keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]:
+        if held & HELD_SPRINT:
             speed *= self.player.sprint_multiplier
             # Sprinting increases hunger drain
             self.player.hunger = max(0, self.player.hunger - 0.05 * dt)
 
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
+        if held & HELD_UP:
             dy = -speed * dt
-        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        if held & HELD_DOWN:
             dy = speed * dt
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        if held & HELD_LEFT:
             dx = -speed * dt
-        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        if held & HELD_RIGHT:
             dx = speed * dt
 
         if dx != 0 or dy != 0:
@@ -1625,7 +3757,7 @@ class GameState:
             self.time = 0
             self.day_count += 1
 
-        # Update world systems (weather, seasons, regrowth)
+        # Update world systems (weather, seasons, regrowth, campfire fuel)
         self.world.update_world_systems(dt)
 
         # Get environmental context
@@ -1642,11 +3774,9 @@ class GameState:
         # Update player abilities
         self.player.update_abilities(dt)
 
-        # Update enemies
-        self.world.update_enemies(dt, self.player, self)
-
-        # Update buildings
-        self.world.update_buildings(dt)
+        # Update enemies; LOD changes the simulation, so recordings always run at full detail
+        lod_radius = None if self.recording else self.governor.quality.enemy_lod
+        self.world.update_enemies(dt, self.player, lod_radius)
 
         # More dynamic enemy spawning based on biome and danger
         if is_night and self.time - self.last_spawn_time > 180:  # Every 3 seconds
@@ -1657,9 +3787,6 @@ class GameState:
         if random.random() < 0.001:  # 0.1% chance per frame
             self.trigger_random_event()
 
-        # Update visual effects
-        self.update_visual_effects(dt)
-
         # Check death
         if self.player.health <= 0:
             self.state = "menu"
@@ -1694,24 +3821,26 @@ class GameState:
         event = random.choice(events)
 
         if event == "meteor_shower":
-            # Spawn rare materials around player
+            # Spawn rare materials around player, each in a stone crater
             for _ in range(5):
                 angle = random.random() * 2 * math.pi
                 distance = random.uniform(5, 15)
                 x = int(self.player.x + math.cos(angle) * distance)
                 y = int(self.player.y + math.sin(angle) * distance)
                 if 0 <= x < WORLD_SIZE and 0 <= y < WORLD_SIZE:
-                    self.world.objects.append(GemDeposit(x, y))
+                    self.world.set_tile(x, y, TileType.STONE)
+                    self.world.add_object(GemDeposit(x, y))
 
         elif event == "resource_discovery":
             # Player gains research points
             self.player.research_points += random.randint(5, 15)
 
         elif event == "rare_enemy":
-            # Spawn a powerful enemy with good loot
-            self.world.spawn_enemy(self.player.x + random.uniform(-8, 8),
-                                 self.player.y + random.uniform(-8, 8),
-                                 "wizard_boss")
+            # Spawn a powerful enemy with good loot, kept within bounds
+            spawn_x = self.player.x + random.uniform(-8, 8)
+            spawn_y = self.player.y + random.uniform(-8, 8)
+            self.world.spawn_enemy(max(5, min(WORLD_SIZE - 5, spawn_x)),
+                                   max(5, min(WORLD_SIZE - 5, spawn_y)), "wizard_boss")
 
     def spawn_enemy_near_player(self, biome_type=BiomeType.GRASSLAND):
         """Spawn a biome-appropriate enemy near the player"""
@@ -1767,22 +3896,171 @@ class GameState:
         })
 
     def add_particles(self, x: float, y: float, count: int, color: Tuple[int, int, int] = (255, 255, 255)):
-        """Add particle effect at world position"""
-        for _ in range(count):
-            angle = random.random() * 2 * math.pi
-            speed = random.uniform(20, 60)
-            self.particles.append({
-                'x': x,
-                'y': y,
-                'vx': math.cos(angle) * speed,
-                'vy': math.sin(angle) * speed,
-                'lifetime': random.uniform(0.3, 0.8),
-                'color': color,
-                'size': random.randint(2, 5)
-            })
+        """Add particle effect at world position, scaled by the current quality"""
+        count = int(count * self.governor.quality.particles + 0.5)
+        if count:
+            self.particles.emit(x, y, count, color)
+
+    def subscribe_presentation(self, events: EventBus):
+        """Turn gameplay events into damage numbers and particles"""
+        events.subscribe(DamageEvent, self.on_damage_events)
+        events.subscribe(AbilityEvent, self.on_ability_events)
+        events.subscribe(HarvestEvent, self.on_harvest_events)
+        events.subscribe(LootEvent, self.on_loot_events)
+        events.subscribe(DeathEvent, self.on_death_events)
+        events.subscribe(CraftEvent, self.on_craft_events)
+        events.subscribe(TileChangedEvent, self.on_tile_events)
+        events.subscribe(BuildingPlacedEvent, self.on_building_events)
+
+    def on_tile_events(self, events: List[TileChangedEvent]):
+        """Re-render terrain chunks whose tiles changed"""
+        for event in events:
+            self.terrain.invalidate_tile(event.x, event.y, event.tile)
+            self.minimap.patch_tile(event.x, event.y, event.tile, self.world.biomes[event.y][event.x])
+
+    def on_building_events(self, events: List[BuildingPlacedEvent]):
+        """Show new buildings on the minimap and join new walls to their neighbours"""
+        for event in events:
+            self.minimap.mark_building(event.x, event.y, event.building_type)
+            if event.building_type == "wooden_wall":
+                self.connect_wall(event.x, event.y)
+
+    def connect_wall(self, x: int, y: int):
+        """Add a wall to wall_masks, setting the bits it shares with adjacent walls on both sides"""
+        mask = 0
+        for bit, (dx, dy) in enumerate(AUTOTILE_NEIGHBORS[:4]):
+            neighbor = (x + dx, y + dy)
+            if neighbor in self.wall_masks:
+                mask |= 1 << bit
+                self.wall_masks[neighbor] |= 1 << ((bit + 2) % 4)
+        self.wall_masks[(x, y)] = mask
+
+    def on_damage_events(self, events: List[DamageEvent]):
+        """Floating numbers and hit sparks"""
+        for event in events:
+            number_color, particle_count, particle_color = DAMAGE_STYLES[event.source]
+            self.add_damage_number(event.x, event.y, event.amount, number_color)
+            if particle_count:
+                self.add_particles(event.x, event.y, particle_count, particle_color)
+
+    def on_ability_events(self, events: List[AbilityEvent]):
+        """Ability effects that aren't a single hit"""
+        for event in events:
+            if event.ability == "whirlwind":
+                self.add_particles(event.x, event.y, 20, (255, 200, 0))
+            elif event.ability == "arcane_blast":
+                # Projectile trail towards the target
+                for i in range(10):
+                    t = i / 10.0
+                    px = event.x + (event.target_x - event.x) * t
+                    py = event.y + (event.target_y - event.y) * t
+                    self.add_particles(px, py, 3, (200, 150, 255))
+            elif event.ability == "divine_shield":
+                self.add_damage_number(event.x, event.y, event.amount, (255, 255, 150))
+                self.add_particles(event.x, event.y, 15, (255, 255, 200))
+
+    def on_harvest_events(self, events: List[HarvestEvent]):
+        """Debris particles matching what was hit"""
+        for event in events:
+            # Gold sparkles for minerals
+            count, color = HARVEST_PARTICLES.get(event.obj_type, (6, (255, 215, 0)))
+            self.add_particles(event.x, event.y, count, color)
+
+    def on_death_events(self, events: List[DeathEvent]):
+        """A puff of smoke where an enemy fell"""
+        for event in events:
+            self.add_particles(event.x, event.y, 12, (180, 180, 180))
+
+    def on_craft_events(self, events: List[CraftEvent]):
+        """Sparkles around the player for each item crafted"""
+        for event in events:
+            print(f"Crafted {event.item_type.value.replace('_', ' ')}!")
+            if self.player:
+                self.add_particles(self.player.x, self.player.y, 10, (255, 255, 150))
+
+    def on_loot_events(self, events: List[LootEvent]):
+        """Show resource gains, from harvesting or enemy drops, as floating text"""
+        for event in events:
+            print(f"Received {event.amount} {event.resource.value}!")
+            self.add_damage_number(event.x, event.y, event.amount, (100, 255, 100))
+
+    def update_presentation(self, dt: float, events: Optional[list] = None):
+        """Deliver gameplay events to presentation listeners and animate effects
+
+        events is the batch forwarded by the simulation thread; in
+        single-threaded play they are still buffered on the world's bus.
+        """
+        if self.world:
+            if events is None:
+                self.world.events.flush()
+            elif events:
+                self.world.events.dispatch(events)
+        self.update_visual_effects(dt)
+
+    def make_snapshot(self, detached: bool = False) -> WorldSnapshot:
+        """Capture what the renderer needs from the current tick
+
+        detached copies the player and visible enemies so the simulation can
+        keep mutating the originals while the snapshot is being drawn.
+        """
+        if not self.world or not self.player:
+            return WorldSnapshot(self.tick, self.state, self.time, self.day_count,
+                                 self.camera_x, self.camera_y, self.building_to_place)
+
+        # Visible tile range at the current zoom, with a tile of margin for sprite overhang
+        tile_size = self.tile_size
+        left, top = view_origin(self.camera_x, self.camera_y, tile_size)
+        min_x = left / tile_size - 1
+        max_x = (left + SCREEN_WIDTH) / tile_size
+        min_y = top / tile_size - 1
+        max_y = (top + SCREEN_HEIGHT) / tile_size
+
+        objects, buildings, enemies = [], [], []
+        for item in self.world.grid.query(min_x, min_y, max_x, max_y):
+            if min_x < item.x < max_x and min_y < item.y < max_y:
+                if isinstance(item, Enemy):
+                    enemies.append(copy.copy(item) if detached else item)
+                elif isinstance(item, Building):
+                    buildings.append(item)
+                else:
+                    objects.append(item)
+
+        player = self.player
+        if detached:
+            player = copy.copy(player)
+            player.resources = dict(player.resources)
+            player.hotbar = list(player.hotbar)
+
+        drawables = objects + buildings + enemies
+        drawables.append(player)
+        drawables.sort(key=lambda item: item.y)
+
+        harvest_target = None
+        target = self.harvesting_target
+        if target:
+            harvest_target = (target.x, target.y, target.health / target.max_health)
+
+        lights = []
+        if self.time >= DAY_LENGTH:
+            for building in self.world.buildings:
+                if building.building_type == "campfire" and building.fuel > 0:
+                    radius = building.light_radius
+                    if (min_x - radius < building.x < max_x + radius and
+                            min_y - radius < building.y < max_y + radius):
+                        lights.append((building.x, building.y, radius, CAMPFIRE_LIGHT))
+            if player.equipped_tool and player.equipped_tool.item_type == ItemType.TORCH:
+                lights.append((player.x, player.y, TORCH_LIGHT_RADIUS, TORCH_LIGHT))
+
+        return WorldSnapshot(self.tick, self.state, self.time, self.day_count,
+                             self.camera_x, self.camera_y, self.building_to_place,
+                             player, self.world.tiles, tuple(drawables),
+                             tuple(buildings), tuple(enemies),
+                             len(self.world.enemies), harvest_target, tuple(lights),
+                             tuple((enemy.x, enemy.y) for enemy in self.world.enemies), tile_size,
+                             self.world.current_weather)
 
     def update_visual_effects(self, dt: float):
-        """Update damage numbers and particles"""
+        """Update damage numbers, particles and weather"""
         # Update damage numbers
         for dmg in self.damage_numbers[:]:
             dmg['lifetime'] -= dt
@@ -1790,39 +4068,81 @@ class GameState:
             if dmg['lifetime'] <= 0:
                 self.damage_numbers.remove(dmg)
 
-        # Update particles
-        for particle in self.particles[:]:
-            particle['x'] += particle['vx'] * dt
-            particle['y'] += particle['vy'] * dt
-            particle['vy'] += 100 * dt  # Gravity
-            particle['lifetime'] -= dt
-            if particle['lifetime'] <= 0:
-                self.particles.remove(particle)
-
-    def draw(self):
-        """Render game"""
+        self.particles.update(dt)
+        self.weather.update(dt)
+        self.animation_time += dt
+
+    def animation_frame(self) -> int:
+        """Frame counter on the shared animation clock; each animation takes it modulo its length"""
+        return int(self.animation_time * ANIMATION_FPS)
+
+    def draw(self, snap: WorldSnapshot):
+        """Render a snapshot of the game"""
+        if snap.state in ("menu", "inventory", "crafting"):
+            self.draw_modal(snap)
+            return
+        self.modal_key = None
+
         self.screen.fill(BLACK)
 
-        if self.state == "menu":
-            self.draw_menu()
-        elif self.state == "playing":
-            self.draw_game()
-        elif self.state == "building_placement":
-            self.draw_game()  # Draw game in background
-            self.draw_building_placement()
-        elif self.state == "inventory":
-            self.draw_inventory()
-        elif self.state == "crafting":
-            self.draw_crafting()
+        if snap.state == "playing":
+            self.draw_game(snap)
+        elif snap.state == "building_placement":
+            self.draw_game(snap)  # Draw game in background
+            self.draw_building_placement(snap)
+
+        if self.show_debug:
+            self.draw_debug_overlay()
+        if self.show_profiler:
+            self.draw_profiler_overlay()
 
         pygame.display.flip()
 
+    def draw_modal(self, snap: WorldSnapshot):
+        """Draw a modal screen with dirty-rect updates
+
+        The world doesn't advance behind these screens, so the full screen
+        is drawn and saved once; after that only the crafting tooltip is
+        redrawn when the mouse moves, and only the rectangles it covered
+        are sent to the display.
+        """
+        resources = tuple(snap.player.resources.items()) if snap.player else ()
+        key = (snap.state, resources)
+        mouse = pygame.mouse.get_pos()
+        dirty = []
+
+        if key != self.modal_key:
+            self.modal_key = key
+            self.screen.fill(BLACK)
+            if snap.state == "menu":
+                self.draw_menu()
+            elif snap.state == "inventory":
+                self.draw_inventory(snap)
+            else:
+                self.draw_crafting(snap)
+            self.modal_background.blit(self.screen, (0, 0))
+            self.tooltip_rect = None
+            self.modal_mouse = None
+            dirty.append(self.screen.get_rect())
+
+        if snap.state == "crafting" and mouse != self.modal_mouse:
+            self.modal_mouse = mouse
+            if self.tooltip_rect:
+                self.screen.blit(self.modal_background, self.tooltip_rect, self.tooltip_rect)
+                dirty.append(self.tooltip_rect)
+            self.tooltip_rect = self.draw_item_tooltips(snap)
+            if self.tooltip_rect:
+                dirty.append(self.tooltip_rect)
+
+        if dirty:
+            pygame.display.update(dirty)
+
     def draw_menu(self):
         """Draw main menu"""
-        title = self.title_font.render("TINY SWORDS ROGUELIKE", True, WHITE)
+        title = self.text_cache.render(self.title_font, "TINY SWORDS ROGUELIKE", WHITE)
         self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, 150))
 
-        subtitle = self.font.render("Choose Your Character", True, WHITE)
+        subtitle = self.text_cache.render(self.font, "Choose Your Character", WHITE)
         self.screen.blit(subtitle, (SCREEN_WIDTH // 2 - subtitle.get_width() // 2, 250))
 
         classes = [
@@ -1833,194 +4153,62 @@ class GameState:
         ]
 
         for text, y in classes:
-            surf = self.font.render(text, True, WHITE)
+            surf = self.text_cache.render(self.font, text, WHITE)
             self.screen.blit(surf, (SCREEN_WIDTH // 2 - surf.get_width() // 2, y))
 
-    def draw_game(self):
-        """Draw main game view"""
-        if not self.world or not self.player:
+    def draw_game(self, snap: WorldSnapshot):
+        """Draw main game view, marking the end of each pass for the profiler"""
+        if not snap.player:
             return
+        profiler = self.profiler
+        profiler.begin()
 
-        # Draw tiles
-        start_x = max(0, int((self.camera_x - SCREEN_WIDTH // 2) / TILE_SIZE))
-        end_x = min(WORLD_SIZE, int((self.camera_x + SCREEN_WIDTH // 2) / TILE_SIZE) + 1)
-        start_y = max(0, int((self.camera_y - SCREEN_HEIGHT // 2) / TILE_SIZE))
-        end_y = min(WORLD_SIZE, int((self.camera_y + SCREEN_HEIGHT // 2) / TILE_SIZE) + 1)
-
-        for y in range(start_y, end_y):
-            for x in range(start_x, end_x):
-                tile = self.world.get_tile(x, y)
-                screen_x = (x * TILE_SIZE) - self.camera_x + SCREEN_WIDTH // 2
-                screen_y = (y * TILE_SIZE) - self.camera_y + SCREEN_HEIGHT // 2
-
-                if tile == TileType.GRASS:
-                    color = (34, 139, 34)
-                elif tile == TileType.WATER:
-                    color = (30, 144, 255)
-                else:
-                    color = (128, 128, 128)
+        # Draw terrain from cached chunks
+        tile_size = snap.tile_size
+        left, top = view_origin(snap.camera_x, snap.camera_y, tile_size)
+        self.terrain.draw(self.screen, snap.tiles, snap.camera_x, snap.camera_y, tile_size, self.animation_frame())
+        profiler.mark("terrain")
 
-                pygame.draw.rect(self.screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
-
-        # Draw objects
-        for obj in self.world.objects:
-            screen_x, screen_y = obj.get_screen_pos(self.camera_x, self.camera_y)
-
-            if -TILE_SIZE < screen_x < SCREEN_WIDTH and -TILE_SIZE < screen_y < SCREEN_HEIGHT:
-                # Try to use sprite, otherwise use colored rect
-                sprite_key = None
-                if isinstance(obj, Tree):
-                    sprite_key = f"tree{obj.variant}"
-                elif isinstance(obj, Rock):
-                    sprite_key = f"rock{obj.variant}"
-                elif isinstance(obj, Bush):
-                    sprite_key = f"bush{obj.variant}"
-                elif isinstance(obj, MushroomPatch):
-                    sprite_key = "mushroom"
-                elif isinstance(obj, CactusPlant):
-                    sprite_key = "cactus"
-                elif isinstance(obj, IceDeposit):
-                    sprite_key = "ice"
-                elif isinstance(obj, IronDeposit):
-                    sprite_key = "iron_ore"
-                elif isinstance(obj, GoldDeposit):
-                    sprite_key = "gold_ore"
-                elif isinstance(obj, GemDeposit):
-                    sprite_key = "gems"
-                elif isinstance(obj, AncientRuin):
-                    sprite_key = "ruin"
-                elif isinstance(obj, CaveEntrance):
-                    sprite_key = "cave"
-
-                if sprite_key and sprite_key in self.assets:
-                    sprite = self.assets[sprite_key]
-                    self.screen.blit(sprite, (screen_x - sprite.get_width() // 2, screen_y - sprite.get_height() // 2))
-                else:
-                    # Fallback to colored rectangles/circles
-                    if isinstance(obj, Tree):
-                        pygame.draw.circle(self.screen, (34, 100, 34), (screen_x, screen_y), 12)
-                    elif isinstance(obj, Rock):
-                        pygame.draw.circle(self.screen, (128, 128, 128), (screen_x, screen_y), 10)
-                    elif isinstance(obj, Bush):
-                        pygame.draw.circle(self.screen, (50, 150, 50), (screen_x, screen_y), 8)
-                    elif isinstance(obj, MushroomPatch):
-                        pygame.draw.circle(self.screen, (138, 43, 226), (screen_x, screen_y), 8)
-                    elif isinstance(obj, CactusPlant):
-                        pygame.draw.circle(self.screen, (0, 100, 0), (screen_x, screen_y), 10)
-                    elif isinstance(obj, IceDeposit):
-                        pygame.draw.circle(self.screen, (173, 216, 230), (screen_x, screen_y), 10)
-                    elif isinstance(obj, IronDeposit):
-                        pygame.draw.circle(self.screen, (169, 169, 169), (screen_x, screen_y), 10)
-                    elif isinstance(obj, GoldDeposit):
-                        pygame.draw.circle(self.screen, (255, 215, 0), (screen_x, screen_y), 10)
-                    elif isinstance(obj, GemDeposit):
-                        pygame.draw.circle(self.screen, (255, 20, 147), (screen_x, screen_y), 8)
-                    elif isinstance(obj, AncientRuin):
-                        pygame.draw.rect(self.screen, (139, 69, 19), (screen_x-8, screen_y-8, 16, 16))
-                    elif isinstance(obj, CaveEntrance):
-                        pygame.draw.circle(self.screen, (0, 0, 0), (screen_x, screen_y), 12)
-
-        # Draw buildings
-        for building in self.world.buildings:
-            screen_x, screen_y = building.get_screen_pos(self.camera_x, self.camera_y)
-
-            if -TILE_SIZE < screen_x < SCREEN_WIDTH and -TILE_SIZE < screen_y < SCREEN_HEIGHT:
-                if building.building_type == "campfire":
-                    pygame.draw.circle(self.screen, (255, 100, 0), (screen_x, screen_y), 10)
-                    # Draw light radius if night
-                    if self.time >= DAY_LENGTH and building.fuel > 0:
-                        pygame.draw.circle(self.screen, (255, 200, 100, 50), (screen_x, screen_y), int(building.light_radius * TILE_SIZE))
-                elif building.building_type == "wooden_wall":
-                    pygame.draw.rect(self.screen, (139, 69, 19), (screen_x - 12, screen_y - 12, 24, 24))
-
-        # Draw enemies
-        for enemy in self.world.enemies:
-            screen_x, screen_y = enemy.get_screen_pos(self.camera_x, self.camera_y)
-
-            if -TILE_SIZE < screen_x < SCREEN_WIDTH and -TILE_SIZE < screen_y < SCREEN_HEIGHT:
-                if enemy.enemy_type == "goblin":
-                    pygame.draw.circle(self.screen, (0, 150, 0), (screen_x, screen_y), 10)
-                elif enemy.enemy_type == "wolf":
-                    pygame.draw.circle(self.screen, (100, 100, 100), (screen_x, screen_y), 12)
-                elif enemy.enemy_type == "wizard_boss":
-                    # Try to use wizard sprite
-                    if "wizard" in self.assets:
-                        sprite = self.assets["wizard"]
-                        self.screen.blit(sprite, (screen_x - sprite.get_width() // 2, screen_y - sprite.get_height() // 2))
-                    else:
-                        pygame.draw.circle(self.screen, (128, 0, 128), (screen_x, screen_y), 16)
-
-                # Draw health bar above enemy
-                health_width = 30
-                health_fill = int((enemy.health / enemy.max_health) * health_width)
-                pygame.draw.rect(self.screen, (50, 50, 50), (screen_x - health_width // 2, screen_y - 25, health_width, 4))
-                pygame.draw.rect(self.screen, (255, 0, 0), (screen_x - health_width // 2, screen_y - 25, health_fill, 4))
-
-        # Draw player
-        player_screen_x = SCREEN_WIDTH // 2
-        player_screen_y = SCREEN_HEIGHT // 2
-
-        if self.player.char_class in self.assets:
-            sprite = self.assets[self.player.char_class]
-            self.screen.blit(sprite, (player_screen_x - sprite.get_width() // 2, player_screen_y - sprite.get_height() // 2))
-        else:
-            pygame.draw.circle(self.screen, (255, 255, 0), (player_screen_x, player_screen_y), 16)
+        self.draw_world_objects(snap)
+        profiler.mark("objects")
 
         # Draw particles
-        for particle in self.particles:
-            # Convert world position to screen position
-            screen_x = int((particle['x'] * TILE_SIZE) - self.camera_x + SCREEN_WIDTH // 2)
-            screen_y = int((particle['y'] * TILE_SIZE) - self.camera_y + SCREEN_HEIGHT // 2)
-
-            if -50 < screen_x < SCREEN_WIDTH + 50 and -50 < screen_y < SCREEN_HEIGHT + 50:
-                # Fade alpha based on lifetime
-                alpha = int(255 * (particle['lifetime'] / 0.8))
-                color = (*particle['color'], alpha)
-                size = particle['size']
-
-                # Draw particle as a circle
-                particle_surf = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
-                pygame.draw.circle(particle_surf, color, (size, size), size)
-                self.screen.blit(particle_surf, (screen_x - size, screen_y - size))
+        self.particles.draw(self.screen, snap.camera_x, snap.camera_y, tile_size)
+        profiler.mark("particles")
 
         # Draw damage numbers
+        outline = (BLACK, 1) if self.governor.quality.outlines else None
         for dmg in self.damage_numbers:
             # Convert world position to screen position
-            screen_x = int((dmg['x'] * TILE_SIZE) - self.camera_x + SCREEN_WIDTH // 2)
-            screen_y = int((dmg['y'] * TILE_SIZE) - self.camera_y + SCREEN_HEIGHT // 2 + dmg['offset_y'])
+            screen_x = int(dmg['x'] * tile_size - left)
+            screen_y = int(dmg['y'] * tile_size - top + dmg['offset_y'])
 
             if -100 < screen_x < SCREEN_WIDTH + 100 and -100 < screen_y < SCREEN_HEIGHT + 100:
                 # Fade alpha based on lifetime
                 alpha = int(255 * dmg['lifetime'])
 
-                # Create text with outline for visibility
-                text = str(dmg['damage'])
-                # Draw outline (black)
-                for ox, oy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-                    outline_surf = self.font.render(text, True, (0, 0, 0))
-                    outline_surf.set_alpha(alpha)
-                    self.screen.blit(outline_surf, (screen_x + ox, screen_y + oy))
-
-                # Draw main text
-                text_surf = self.font.render(text, True, dmg['color'])
+                # Text with a black outline for visibility
+                text_surf = self.text_cache.render(self.font, str(dmg['damage']), dmg['color'], outline)
                 text_surf.set_alpha(alpha)
                 text_rect = text_surf.get_rect(center=(screen_x, screen_y))
                 self.screen.blit(text_surf, text_rect)
+                count_draws()
+        profiler.mark("damage")
 
         # Draw harvest progress bar if actively harvesting
-        if self.harvesting_target and self.harvesting_target in self.world.objects:
-            obj = self.harvesting_target
-            screen_x, screen_y = obj.get_screen_pos(self.camera_x, self.camera_y)
+        if snap.harvest_target:
+            target_x, target_y, progress = snap.harvest_target
+            screen_x = int(target_x * tile_size - left)
+            screen_y = int(target_y * tile_size - top)
 
-            if -TILE_SIZE < screen_x < SCREEN_WIDTH and -TILE_SIZE < screen_y < SCREEN_HEIGHT:
+            if -tile_size < screen_x < SCREEN_WIDTH and -tile_size < screen_y < SCREEN_HEIGHT:
                 # Progress bar above object
                 bar_width = 40
                 bar_height = 6
                 bar_x = screen_x - bar_width // 2
                 bar_y = screen_y - 35
 
-                # Calculate progress (remaining health)
-                progress = obj.health / obj.max_health
+                # Progress is the target's remaining health
                 fill_width = int(bar_width * progress)
 
                 # Draw background
@@ -2038,184 +4226,287 @@ class GameState:
                 pygame.draw.rect(self.screen, WHITE, (bar_x, bar_y, bar_width, bar_height), 1)
 
                 # Show percentage
-                percent_text = self.small_font.render(f"{int(progress * 100)}%", True, WHITE)
+                percent_text = self.text_cache.render(self.small_font, f"{int(progress * 100)}%", WHITE)
                 self.screen.blit(percent_text, (bar_x + bar_width // 2 - percent_text.get_width() // 2, bar_y - 15))
+                count_draws(4, 4)
+        profiler.mark("harvest")
 
-        # Apply night overlay
-        if self.time >= DAY_LENGTH:
-            night_alpha = min(180, int((self.time - DAY_LENGTH) / NIGHT_LENGTH * 180))
-            overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            overlay.fill((0, 0, 20))
-            overlay.set_alpha(night_alpha)
-            self.screen.blit(overlay, (0, 0))
-
-        # Draw HUD
-        self.draw_hud()
+        # Unexplored tiles stay hidden, along with anything on them
+        self.fog.reveal(snap.player.x, snap.player.y)
+        self.fog.draw(self.screen, snap.camera_x, snap.camera_y, tile_size)
+        profiler.mark("fog")
 
-    def draw_hud(self):
-        """Draw HUD elements"""
-        if not self.player:
-            return
+        self.weather.draw(self.screen, snap.weather, snap.camera_x, snap.camera_y, tile_size)
+        profiler.mark("weather")
 
-        # Background panel
-        pygame.draw.rect(self.screen, UI_BG, (10, 10, 300, 120))
+        # Night lighting
+        if snap.time >= DAY_LENGTH:
+            darkness = min(180, (snap.time - DAY_LENGTH) / NIGHT_LENGTH * 180) / 255
+            self.light_map.draw(self.screen, snap.lights, snap.camera_x, snap.camera_y, darkness, tile_size)
+        self.weather.draw_lightning(self.screen)
+        profiler.mark("night")
 
-        # Health bar
-        self.draw_bar(20, 20, 280, 20, self.player.health, self.player.max_health, HEALTH_COLOR, "Health")
+        # Draw HUD
+        self.draw_hud(snap)
+        profiler.mark("hud")
+        if self.minimap.visible:
+            self.minimap.draw(self.screen, snap, self.fog)
+        profiler.mark("minimap")
+        profiler.end_frame()
+
+    def draw_debug_overlay(self):
+        """F3 overlay: frame timing and what the quality governor has turned down"""
+        governor = self.governor
+        quality = governor.quality
+        lines = [
+            f"FPS {self.clock.get_fps():.0f}   work {governor.average_ms():.1f} / {governor.budget_ms:.1f} ms",
+            f"Quality {quality.name} ({governor.level + 1}/{len(QUALITY_LEVELS)})"
+            f"{'' if governor.enabled else ' - governor off'}",
+            f"Particles {quality.particles:.0%} ({len(self.particles)} live)   "
+            f"Weather {quality.weather:.0%} ({self.weather.count} drawn)",
+            f"Outlines {'on' if quality.outlines else 'off'}   "
+            f"Light map 1/{self.light_map.scale}",
+            f"Enemy LOD {'off' if quality.enemy_lod is None else f'{quality.enemy_lod:g} tiles'}   "
+            f"HUD every {quality.hud_interval}",
+        ]
+        x, y = SCREEN_WIDTH // 2 - 170, 10
+        pygame.draw.rect(self.screen, UI_BG[:3], (x, y, 340, 10 + 20 * len(lines)))
+        for i, line in enumerate(lines):  # Changes every frame, so not worth caching
+            self.screen.blit(self.small_font.render(line, True, WHITE), (x + 8, y + 8 + 20 * i))
+
+    def draw_profiler_overlay(self):
+        """F4 overlay: each render pass's rolling average, p99 and draw counts"""
+        rows = [("pass", "avg ms", "p99 ms", "calls", "blits")]
+        for name, average, p99, calls, blits in self.profiler.stats():
+            rows.append((name, f"{average:.2f}", f"{p99:.2f}", f"{calls:.0f}", f"{blits:.0f}"))
+        x, y = 10, 140
+        columns = (8, 80, 130, 180, 220)
+        pygame.draw.rect(self.screen, UI_BG[:3], (x, y, 260, 10 + 18 * len(rows)))
+        for i, row in enumerate(rows):  # Changes every frame, so not worth caching
+            for column, text in zip(columns, row):
+                self.screen.blit(self.small_font.render(text, True, WHITE), (x + column, y + 6 + 18 * i))
+
+    def apply_quality(self):
+        """Push a new quality level into the systems that keep their own state"""
+        quality = self.governor.quality
+        if self.light_map.scale != quality.light_scale:
+            self.light_map.set_scale(quality.light_scale)
+        self.weather.density = quality.weather
+        for layer in self.hud_layers.values():
+            layer.dirty = True
+
+    def end_frame(self, start: float):
+        """Report a frame's work time, started at perf_counter() start, to the governor"""
+        if self.governor.record((systime.perf_counter() - start) * 1000):
+            self.apply_quality()
+
+    def draw_world_objects(self, snap: WorldSnapshot):
+        """Draw the snapshot's y-sorted drawables in one batched blit"""
+        tile_size = snap.tile_size
+        left, top = view_origin(snap.camera_x, snap.camera_y, tile_size)
+        registry = self.zoom_registries[tile_size]
+        frame = self.animation_frame()
+        batch = []
+
+        for item in snap.drawables:
+            screen_x = item.x * tile_size - left
+            screen_y = item.y * tile_size - top
+            render_id = item.render_id
+            if render_id == "wooden_wall":
+                render_id = WALL_RENDER_IDS[self.wall_masks.get((item.x, item.y), 0)]
+            entry = registry.get(render_id) or self.render_entry(render_id, tile_size)
+            if entry:
+                sprite = entry.frames[frame % len(entry.frames)] if entry.frames else entry.sprite
+                batch.append((sprite, (screen_x + entry.anchor[0], screen_y + entry.anchor[1])))
+
+        self.screen.blits(batch, doreturn=False)
+        count_draws(len(batch))
+
+        # Health bars above enemies
+        health_width = 30
+        bar_offset = 25 * tile_size // TILE_SIZE
+        for enemy in snap.enemies:
+            screen_x = int(enemy.x * tile_size - left)
+            screen_y = int(enemy.y * tile_size - top) - bar_offset
+            if -tile_size < screen_x < SCREEN_WIDTH and -tile_size < screen_y < SCREEN_HEIGHT:
+                health_fill = int((enemy.health / enemy.max_health) * health_width)
+                pygame.draw.rect(self.screen, (50, 50, 50), (screen_x - health_width // 2, screen_y, health_width, 4))
+                pygame.draw.rect(self.screen, (255, 0, 0), (screen_x - health_width // 2, screen_y, health_fill, 4))
+                count_draws(2, 2)
 
-        # Hunger bar
-        self.draw_bar(20, 50, 280, 20, self.player.hunger, self.player.max_hunger, HUNGER_COLOR, "Hunger")
+    def build_hud_layers(self) -> Dict[str, "HudLayer"]:
+        """Retained HUD pieces, composited in this order"""
+        hotbar_y = SCREEN_HEIGHT - 140
+        return {
+            "stats": HudLayer((10, 10, 300, 120), self.draw_hud_stats),
+            "resources": HudLayer((SCREEN_WIDTH - 210, 10, 200, 20 + (len(ResourceType) + 1) * 25),
+                                  self.draw_hud_resources),
+            "hotbar": HudLayer((SCREEN_WIDTH // 2 - 200, hotbar_y - 35, 400, 92), self.draw_hud_hotbar),
+            "ability": HudLayer((SCREEN_WIDTH - 210, 145, 200, 105), self.draw_hud_ability),
+            "hints": HudLayer((SCREEN_WIDTH // 2 - 375, SCREEN_HEIGHT - 60, 750, 60), self.draw_hud_hints),
+        }
 
-        # Sanity bar
-        self.draw_bar(20, 80, 280, 20, self.player.sanity, self.player.max_sanity, SANITY_COLOR, "Sanity")
+    def draw_hud(self, snap: WorldSnapshot):
+        """Draw HUD elements
 
-        # Day counter
-        day_text = self.font.render(f"Day {self.day_count}", True, WHITE)
-        self.screen.blit(day_text, (20, 105))
+        Each layer is re-rendered only when the state it shows changes,
+        then all of them go to the screen in one blits() call. At lower
+        quality levels changes are only picked up every hud_interval frames.
+        """
+        if not snap.player:
+            return
+        if self.governor.frames % self.governor.quality.hud_interval:
+            self.screen.blits([(layer.surface, layer.rect) for layer in self.hud_layers.values()],
+                              doreturn=False)
+            count_draws(len(self.hud_layers))
+            return
 
-        # Time of day
-        if self.time < DAY_LENGTH:
-            time_text = "DAY"
-            time_color = (255, 255, 100)
+        player = snap.player
+        tool = player.equipped_tool
+        keys = {
+            "stats": (int(player.health), int(player.hunger), int(player.sanity), player.max_health,
+                      player.max_hunger, player.max_sanity, snap.day_count, snap.time < DAY_LENGTH),
+            "resources": (tuple(player.resources.items()), snap.enemy_count),
+            "hotbar": (player.selected_hotbar_slot, tuple(item and item.item_type for item in player.hotbar),
+                       tool and (tool.name, tool.durability)),
+            "ability": (player.char_class, player.ability_active, round(player.ability_cooldown, 1),
+                        round(player.ability_duration, 1)),
+            "hints": (),
+        }
+        for name, layer in self.hud_layers.items():
+            layer.update(keys[name], snap)
+        self.screen.blits([(layer.surface, layer.rect) for layer in self.hud_layers.values()], doreturn=False)
+        count_draws(len(self.hud_layers))
+
+    def draw_hud_stats(self, surface: pygame.Surface, snap: WorldSnapshot):
+        """Health/hunger/sanity bars, day counter and time of day"""
+        surface.fill(UI_BG[:3])
+        self.draw_bar(surface, 10, 10, 280, 20, snap.player.health, snap.player.max_health, HEALTH_COLOR, "Health")
+        self.draw_bar(surface, 10, 40, 280, 20, snap.player.hunger, snap.player.max_hunger, HUNGER_COLOR, "Hunger")
+        self.draw_bar(surface, 10, 70, 280, 20, snap.player.sanity, snap.player.max_sanity, SANITY_COLOR, "Sanity")
+
+        day_text = self.text_cache.render(self.font, f"Day {snap.day_count}", WHITE)
+        surface.blit(day_text, (10, 95))
+
+        if snap.time < DAY_LENGTH:
+            time_surf = self.text_cache.render(self.font, "DAY", (255, 255, 100))
         else:
-            time_text = "NIGHT"
-            time_color = (100, 100, 255)
-        time_surf = self.font.render(time_text, True, time_color)
-        self.screen.blit(time_surf, (250, 105))
-
-        # Resources panel
-        pygame.draw.rect(self.screen, UI_BG, (SCREEN_WIDTH - 210, 10, 200, 120))
-
-        y_offset = 20
-        for resource, amount in self.player.resources.items():
-            text = self.small_font.render(f"{resource.value.title()}: {amount}", True, WHITE)
-            self.screen.blit(text, (SCREEN_WIDTH - 200, y_offset))
+            time_surf = self.text_cache.render(self.font, "NIGHT", (100, 100, 255))
+        surface.blit(time_surf, (240, 95))
+
+    def draw_hud_resources(self, surface: pygame.Surface, snap: WorldSnapshot):
+        """Resource counts and enemy count"""
+        pygame.draw.rect(surface, UI_BG[:3], (0, 0, 200, 120))
+
+        y_offset = 10
+        for resource, amount in snap.player.resources.items():
+            text = self.text_cache.render(self.small_font, f"{resource.value.title()}: {amount}", WHITE)
+            surface.blit(text, (10, y_offset))
             y_offset += 25
 
-        # Enemy count
-        enemy_count = len(self.world.enemies) if self.world else 0
-        enemy_text = self.small_font.render(f"Enemies: {enemy_count}", True, (255, 100, 100))
-        self.screen.blit(enemy_text, (SCREEN_WIDTH - 200, y_offset))
+        enemy_text = self.text_cache.render(self.small_font, f"Enemies: {snap.enemy_count}", (255, 100, 100))
+        surface.blit(enemy_text, (10, y_offset))
 
-        # Hotbar at bottom center
+    def draw_hud_hotbar(self, surface: pygame.Surface, snap: WorldSnapshot):
+        """Hotbar slots and the equipped tool"""
         hotbar_width = 5 * 52 + 10
-        hotbar_x = SCREEN_WIDTH // 2 - hotbar_width // 2
-        hotbar_y = SCREEN_HEIGHT - 140
+        hotbar_x = surface.get_width() // 2 - hotbar_width // 2
+        hotbar_y = 35
 
-        pygame.draw.rect(self.screen, UI_BG, (hotbar_x - 5, hotbar_y - 5, hotbar_width, 62))
+        pygame.draw.rect(surface, UI_BG[:3], (hotbar_x - 5, hotbar_y - 5, hotbar_width, 62))
 
         for i in range(5):
             slot_x = hotbar_x + i * 52
-            slot_color = (100, 100, 255) if i == self.player.selected_hotbar_slot else (80, 80, 80)
-            pygame.draw.rect(self.screen, slot_color, (slot_x, hotbar_y, 48, 48))
-            pygame.draw.rect(self.screen, WHITE, (slot_x, hotbar_y, 48, 48), 2)
-
-            # Draw number
-            num_text = self.small_font.render(str(i + 1), True, WHITE)
-            self.screen.blit(num_text, (slot_x + 2, hotbar_y + 2))
-
-            # Draw item if present
-            if self.player.hotbar[i]:
-                item = self.player.hotbar[i]
-                item_name = item.item_type.value[:3].upper()
-                item_text = self.small_font.render(item_name, True, WHITE)
-                self.screen.blit(item_text, (slot_x + 12, hotbar_y + 18))
-
-        # Equipped tool display
-        if self.player.equipped_tool:
-            tool_text = self.font.render(f"Equipped: {self.player.equipped_tool.name}", True, WHITE)
-            self.screen.blit(tool_text, (SCREEN_WIDTH // 2 - tool_text.get_width() // 2, hotbar_y - 30))
+            slot_color = (100, 100, 255) if i == snap.player.selected_hotbar_slot else (80, 80, 80)
+            pygame.draw.rect(surface, slot_color, (slot_x, hotbar_y, 48, 48))
+            pygame.draw.rect(surface, WHITE, (slot_x, hotbar_y, 48, 48), 2)
+
+            num_text = self.text_cache.render(self.small_font, str(i + 1), WHITE)
+            surface.blit(num_text, (slot_x + 2, hotbar_y + 2))
+
+            if snap.player.hotbar[i]:
+                item_name = snap.player.hotbar[i].item_type.value[:3].upper()
+                item_text = self.text_cache.render(self.small_font, item_name, WHITE)
+                surface.blit(item_text, (slot_x + 12, hotbar_y + 18))
+
+        tool = snap.player.equipped_tool
+        if tool:
+            tool_text = self.text_cache.render(self.font, f"Equipped: {tool.name}", WHITE)
+            surface.blit(tool_text, (surface.get_width() // 2 - tool_text.get_width() // 2, hotbar_y - 30))
 
             # Durability bar if applicable
-            if self.player.equipped_tool.durability is not None:
-                dur_x = SCREEN_WIDTH // 2 - 50
-                dur_y = hotbar_y - 10
+            if tool.durability is not None:
+                dur_x = surface.get_width() // 2 - 50
                 dur_width = 100
-                dur_fill = int((self.player.equipped_tool.durability / self.player.equipped_tool.max_durability) * dur_width)
-                pygame.draw.rect(self.screen, (50, 50, 50), (dur_x, dur_y, dur_width, 4))
-                pygame.draw.rect(self.screen, (100, 255, 100), (dur_x, dur_y, dur_fill, 4))
+                dur_fill = int((tool.durability / tool.max_durability) * dur_width)
+                pygame.draw.rect(surface, (50, 50, 50), (dur_x, hotbar_y - 10, dur_width, 4))
+                pygame.draw.rect(surface, (100, 255, 100), (dur_x, hotbar_y - 10, dur_fill, 4))
 
-        # Ability cooldown indicator (top right corner near resources)
-        ability_x = SCREEN_WIDTH - 210
-        ability_y = 145
+    def draw_hud_ability(self, surface: pygame.Surface, snap: WorldSnapshot):
+        """Class ability box with cooldown shading"""
         ability_size = 60
 
-        # Draw ability background
-        if self.player.ability_active:
+        if snap.player.ability_active:
             # Golden glow when active
-            pygame.draw.rect(self.screen, (255, 215, 0), (ability_x, ability_y, ability_size, ability_size), 3)
+            pygame.draw.rect(surface, (255, 215, 0), (0, 0, ability_size, ability_size), 3)
         else:
-            pygame.draw.rect(self.screen, UI_BG, (ability_x, ability_y, ability_size, ability_size))
-
-        # Draw class icon letter
-        class_initial = self.player.char_class[0].upper()
-        class_text = self.title_font.render(class_initial, True, WHITE)
-        self.screen.blit(class_text, (ability_x + ability_size // 2 - class_text.get_width() // 2,
-                                      ability_y + ability_size // 2 - class_text.get_height() // 2))
-
-        # Draw cooldown overlay
-        if self.player.ability_cooldown > 0:
-            cooldown_percent = self.player.ability_cooldown / self.player.ability_cooldown_time
-            overlay_height = int(ability_size * cooldown_percent)
-
-            overlay = pygame.Surface((ability_size, overlay_height))
-            overlay.fill((0, 0, 0))
-            overlay.set_alpha(180)
-            self.screen.blit(overlay, (ability_x, ability_y))
-
-            # Cooldown text
-            cd_text = self.small_font.render(f"{self.player.ability_cooldown:.1f}s", True, (255, 100, 100))
-            self.screen.blit(cd_text, (ability_x + ability_size // 2 - cd_text.get_width() // 2,
-                                       ability_y + ability_size // 2 - cd_text.get_height() // 2))
-
-        # Ability name below
-        ability_name_text = self.small_font.render(f"[F] Ability", True, WHITE)
-        self.screen.blit(ability_name_text, (ability_x, ability_y + ability_size + 5))
-
-        # Active indicator
-        if self.player.ability_active:
-            active_text = self.small_font.render(f"ACTIVE {self.player.ability_duration:.1f}s", True, (255, 215, 0))
-            self.screen.blit(active_text, (ability_x, ability_y + ability_size + 25))
-
-        # Controls hint
-        hint_bg = pygame.Surface((750, 90))
-        hint_bg.fill((20, 20, 30))
-        hint_bg.set_alpha(200)
-        self.screen.blit(hint_bg, (SCREEN_WIDTH // 2 - 375, SCREEN_HEIGHT - 60))
+            pygame.draw.rect(surface, UI_BG[:3], (0, 0, ability_size, ability_size))
+
+        class_text = self.text_cache.render(self.title_font, snap.player.char_class[0].upper(), WHITE)
+        surface.blit(class_text, (ability_size // 2 - class_text.get_width() // 2,
+                                  ability_size // 2 - class_text.get_height() // 2))
+
+        if snap.player.ability_cooldown > 0:
+            cooldown_percent = snap.player.ability_cooldown / snap.player.ability_cooldown_time
+            surface.blit(self.cooldown_shade, (0, 0), (0, 0, ability_size, int(ability_size * cooldown_percent)))
+
+            cd_text = self.text_cache.render(self.small_font, f"{snap.player.ability_cooldown:.1f}s", (255, 100, 100))
+            surface.blit(cd_text, (ability_size // 2 - cd_text.get_width() // 2,
+                                   ability_size // 2 - cd_text.get_height() // 2))
+
+        ability_name_text = self.text_cache.render(self.small_font, "[F] Ability", WHITE)
+        surface.blit(ability_name_text, (0, ability_size + 5))
+
+        if snap.player.ability_active:
+            active_text = self.text_cache.render(self.small_font, f"ACTIVE {snap.player.ability_duration:.1f}s", (255, 215, 0))
+            surface.blit(active_text, (0, ability_size + 25))
+
+    def draw_hud_hints(self, surface: pygame.Surface, snap: WorldSnapshot):
+        """Controls hint panel"""
+        surface.fill((20, 20, 30, 200))
 
         hints = [
             "WASD: Move | Shift: Sprint | Click: Gather | Space: Attack",
             "1-5: Hotbar | E: Interact | F: Ability | Q: Drop | I: Inv | C: Craft | B: Build"
         ]
         for i, hint in enumerate(hints):
-            text = self.small_font.render(hint, True, WHITE)
-            self.screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, SCREEN_HEIGHT - 50 + i * 20))
+            text = self.text_cache.render(self.small_font, hint, WHITE)
+            surface.blit(text, (surface.get_width() // 2 - text.get_width() // 2, 10 + i * 20))
 
-    def draw_bar(self, x: int, y: int, width: int, height: int, current: float, maximum: float, color: Tuple[int, int, int], label: str):
+    def draw_bar(self, surface: pygame.Surface, x: int, y: int, width: int, height: int, current: float,
+                 maximum: float, color: Tuple[int, int, int], label: str):
         """Draw a status bar"""
         # Background
-        pygame.draw.rect(self.screen, (50, 50, 50), (x, y, width, height))
+        pygame.draw.rect(surface, (50, 50, 50), (x, y, width, height))
 
         # Fill
         fill_width = int((current / maximum) * width)
-        pygame.draw.rect(self.screen, color, (x, y, fill_width, height))
+        pygame.draw.rect(surface, color, (x, y, fill_width, height))
 
         # Border
-        pygame.draw.rect(self.screen, WHITE, (x, y, width, height), 2)
+        pygame.draw.rect(surface, WHITE, (x, y, width, height), 2)
 
         # Label
-        text = self.small_font.render(f"{label}: {int(current)}/{int(maximum)}", True, WHITE)
-        self.screen.blit(text, (x + 5, y + 2))
+        text = self.text_cache.render(self.small_font, f"{label}: {int(current)}/{int(maximum)}", WHITE)
+        surface.blit(text, (x + 5, y + 2))
 
-    def draw_inventory(self):
+    def draw_inventory(self, snap: WorldSnapshot):
         """Draw inventory screen"""
-        self.draw_game()  # Draw game in background
+        self.draw_game(snap)  # Draw game in background
 
         # Overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(180)
-        self.screen.blit(overlay, (0, 0))
+        self.dim_overlay.set_alpha(180)
+        self.screen.blit(self.dim_overlay, (0, 0))
 
         # Inventory panel
         panel_width = 600
@@ -2227,22 +4518,19 @@ class GameState:
         pygame.draw.rect(self.screen, WHITE, (panel_x, panel_y, panel_width, panel_height), 3)
 
         # Title
-        title = self.title_font.render("INVENTORY", True, WHITE)
+        title = self.text_cache.render(self.title_font, "INVENTORY", WHITE)
         self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, panel_y + 20))
 
         # Close hint
-        hint = self.small_font.render("Press ESC or I to close", True, WHITE)
+        hint = self.text_cache.render(self.small_font, "Press ESC or I to close", WHITE)
         self.screen.blit(hint, (SCREEN_WIDTH // 2 - hint.get_width() // 2, panel_y + panel_height - 30))
 
-        # Draw tooltips for items if mouse hovering
-        self.draw_item_tooltips()
-
-    def draw_item_tooltips(self):
-        """Draw tooltip for item under mouse cursor"""
+    def draw_item_tooltips(self, snap: WorldSnapshot) -> Optional[pygame.Rect]:
+        """Draw tooltip for item under mouse cursor, returning the area it covers"""
         mouse_x, mouse_y = pygame.mouse.get_pos()
 
         # Check if in crafting menu
-        if self.state == "crafting":
+        if snap.state == "crafting":
             panel_width = 700
             panel_height = 550
             panel_x = SCREEN_WIDTH // 2 - panel_width // 2
@@ -2273,20 +4561,20 @@ class GameState:
 
                     # Item name
                     name = recipe.result.value.replace("_", " ").title()
-                    name_text = self.font.render(name, True, (255, 215, 0))
+                    name_text = self.text_cache.render(self.font, name, (255, 215, 0))
                     self.screen.blit(name_text, (tooltip_x + 10, tooltip_y + 10))
 
                     # Requirements
                     req_y = tooltip_y + 40
-                    req_title = self.small_font.render("Requirements:", True, WHITE)
+                    req_title = self.text_cache.render(self.small_font, "Requirements:", WHITE)
                     self.screen.blit(req_title, (tooltip_x + 10, req_y))
                     req_y += 25
 
                     for resource, amount in recipe.requirements.items():
-                        has_amount = self.player.resources.get(resource, 0)
+                        has_amount = snap.player.resources.get(resource, 0)
                         color = (100, 255, 100) if has_amount >= amount else (255, 100, 100)
-                        req_text = self.small_font.render(
-                            f"  {resource.value}: {has_amount}/{amount}", True, color)
+                        req_text = self.text_cache.render(
+                            self.small_font, f"  {resource.value}: {has_amount}/{amount}", color)
                         self.screen.blit(req_text, (tooltip_x + 10, req_y))
                         req_y += 20
 
@@ -2294,12 +4582,13 @@ class GameState:
                     desc_y = req_y + 10
                     description = self.get_item_description(recipe.result)
                     if description:
-                        desc_text = self.small_font.render(description, True, (200, 200, 200))
+                        desc_text = self.text_cache.render(self.small_font, description, (200, 200, 200))
                         self.screen.blit(desc_text, (tooltip_x + 10, desc_y))
 
-                    break
+                    return pygame.Rect(tooltip_x, tooltip_y, tooltip_width, tooltip_height)
 
                 y_offset += 60
+        return None
 
     def get_item_description(self, item_type: ItemType) -> str:
         """Get description for an item type"""
@@ -2313,21 +4602,17 @@ class GameState:
             ItemType.WORKBENCH: "Unlock advanced crafting",
             ItemType.FURNACE: "Smelt ores into ingots",
             ItemType.IRON_INGOT: "Refined iron for tools",
-            ItemType.STEEL_INGOT: "Advanced metal for weapons",
             ItemType.COOKED_MEAT: "Restores 30 hunger",
-            ItemType.BERRY_PIE: "Restores 20 hunger, 10 sanity",
         }
         return descriptions.get(item_type, "")
 
-    def draw_crafting(self):
+    def draw_crafting(self, snap: WorldSnapshot):
         """Draw crafting screen"""
-        self.draw_game()  # Draw game in background
+        self.draw_game(snap)  # Draw game in background
 
         # Overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(180)
-        self.screen.blit(overlay, (0, 0))
+        self.dim_overlay.set_alpha(180)
+        self.screen.blit(self.dim_overlay, (0, 0))
 
         # Crafting panel
         panel_width = 700
@@ -2339,76 +4624,386 @@ class GameState:
         pygame.draw.rect(self.screen, WHITE, (panel_x, panel_y, panel_width, panel_height), 3)
 
         # Title
-        title = self.title_font.render("CRAFTING", True, WHITE)
+        title = self.text_cache.render(self.title_font, "CRAFTING", WHITE)
         self.screen.blit(title, (SCREEN_WIDTH // 2 - title.get_width() // 2, panel_y + 20))
 
         # List recipes
         y_offset = panel_y + 100
         for i, recipe in enumerate(self.crafting_system.recipes):
-            can_craft = self.crafting_system.can_craft(self.player, recipe)
+            can_craft = self.crafting_system.can_craft(snap.player, recipe)
             color = (100, 255, 100) if can_craft else (150, 150, 150)
 
             # Recipe name
             name = recipe.result.value.replace("_", " ").title()
-            text = self.font.render(f"{i+1}. {name}", True, color)
+            text = self.text_cache.render(self.font, f"{i+1}. {name}", color)
             self.screen.blit(text, (panel_x + 50, y_offset))
 
             # Requirements
             req_text = " | ".join([f"{res.value}: {amt}" for res, amt in recipe.requirements.items()])
-            req_surf = self.small_font.render(f"   Requires: {req_text}", True, color)
+            req_surf = self.text_cache.render(self.small_font, f"   Requires: {req_text}", color)
             self.screen.blit(req_surf, (panel_x + 50, y_offset + 25))
 
             y_offset += 60
 
         # Close hint
-        hint = self.small_font.render("Press ESC or C to close | Press 1-4 to craft", True, WHITE)
+        hint = self.text_cache.render(self.small_font, "Press ESC or C to close | Press 1-9 to craft", WHITE)
         self.screen.blit(hint, (SCREEN_WIDTH // 2 - hint.get_width() // 2, panel_y + panel_height - 30))
 
-    def draw_building_placement(self):
+    def draw_building_placement(self, snap: WorldSnapshot):
         """Draw building placement overlay"""
         # Semi-transparent overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.fill((0, 0, 0))
-        overlay.set_alpha(100)
-        self.screen.blit(overlay, (0, 0))
+        self.dim_overlay.set_alpha(100)
+        self.screen.blit(self.dim_overlay, (0, 0))
 
         # Get mouse tile position
+        tile_size = snap.tile_size
+        left, top = view_origin(snap.camera_x, snap.camera_y, tile_size)
         mouse_x, mouse_y = pygame.mouse.get_pos()
-        tile_x = int((mouse_x - SCREEN_WIDTH // 2 + self.camera_x) / TILE_SIZE)
-        tile_y = int((mouse_y - SCREEN_HEIGHT // 2 + self.camera_y) / TILE_SIZE)
+        tile_x = int((mouse_x + left) // tile_size)
+        tile_y = int((mouse_y + top) // tile_size)
 
         # Calculate screen position of tile
-        screen_x = (tile_x * TILE_SIZE) - self.camera_x + SCREEN_WIDTH // 2
-        screen_y = (tile_y * TILE_SIZE) - self.camera_y + SCREEN_HEIGHT // 2
+        screen_x = tile_x * tile_size - left
+        screen_y = tile_y * tile_size - top
 
         # Check if placement is valid
-        dist = math.sqrt((tile_x - self.player.x)**2 + (tile_y - self.player.y)**2)
+        dist = math.sqrt((tile_x - snap.player.x)**2 + (tile_y - snap.player.y)**2)
         valid = dist <= 5
 
         # Draw placement indicator
         color = (100, 255, 100, 128) if valid else (255, 100, 100, 128)
-        pygame.draw.rect(self.screen, color, (screen_x, screen_y, TILE_SIZE, TILE_SIZE))
+        pygame.draw.rect(self.screen, color, (screen_x, screen_y, tile_size, tile_size))
 
         # Instructions
-        hint_text = f"Placing: {self.building_to_place.value.replace('_', ' ').title()}"
-        hint = self.font.render(hint_text, True, WHITE)
+        hint_text = f"Placing: {snap.building_to_place.value.replace('_', ' ').title()}"
+        hint = self.text_cache.render(self.font, hint_text, WHITE)
         self.screen.blit(hint, (SCREEN_WIDTH // 2 - hint.get_width() // 2, 20))
 
-        sub_hint = self.small_font.render("Click to place | ESC to cancel | 1: Campfire | 2: Wall", True, WHITE)
+        sub_hint = self.text_cache.render(self.small_font, "Click to place | ESC to cancel | 1: Campfire | 2: Wall", WHITE)
         self.screen.blit(sub_hint, (SCREEN_WIDTH // 2 - sub_hint.get_width() // 2, 50))
 
-    def run(self):
+    def step(self, frame: InputFrame):
+        """Advance the simulation by one tick of input"""
+        self.handle_events(frame)
+        self.update(frame.dt_ms / 1000.0, frame.held)  # Delta time in seconds
+        self.tick += 1
+
+    def state_digest(self) -> int:
+        """Checksum of the simulation state, used to verify replays"""
+        state = [self.tick, self.state, self.time, self.day_count]
+        if self.world and self.player:
+            state += [self.world.seed, self.player.x, self.player.y, self.player.health,
+                      self.player.hunger, self.player.sanity, self.player.temperature,
+                      sorted((r.value, a) for r, a in self.player.resources.items()),
+                      [(e.enemy_type, e.x, e.y, e.health) for e in self.world.enemies],
+                      len(self.world.objects), len(self.world.buildings)]
+        return zlib.crc32(repr(state).encode())
+
+    def save_exploration(self):
+        """Write the explored map if the session keeps one"""
+        if self.explored_path and self.world:
+            self.fog.save(self.explored_path, self.world.seed)
+
+    def run(self, threaded: bool = False):
         """Main game loop"""
+        if threaded:
+            self.run_threaded()
+            return
+
         while self.running:
-            dt = self.clock.tick(FPS) / 1000.0  # Delta time in seconds
+            frame = self.poll_input(self.clock.tick(FPS))
+            start = systime.perf_counter()
+            if self.recording:
+                self.recording.record(frame)
+
+            self.step(frame)
+            self.update_presentation(frame.dt_ms / 1000.0)
+            self.draw(self.make_snapshot())
+            self.end_frame(start)
+
+        if self.recording:
+            self.recording.digest = self.state_digest()
+        self.save_exploration()
+        self.asset_cache.save()
+        self.images.close()
 
-            self.handle_events()
-            self.update(dt)
-            self.draw()
+        pygame.quit()
+
+    def run_threaded(self):
+        """Main loop with the simulation on its own thread
 
+        This thread only polls input, animates effects and draws the latest
+        published snapshot; world updates happen on the SimulationThread,
+        apart from the ticks it hands back (see SimulationThread).
+        """
+        simulation = SimulationThread(self)
+        simulation.start()
+
+        while self.running:
+            simulation.check()
+            frame = self.poll_input(self.clock.tick(FPS))
+            start = systime.perf_counter()
+            if self.recording:
+                self.recording.record(frame)
+            simulation.inputs.put(frame)
+            simulation.run_handed_back()
+
+            events = []
+            while simulation.events:
+                events.append(simulation.events.popleft())
+            self.update_presentation(frame.dt_ms / 1000.0, events)
+            self.draw(simulation.latest())
+            self.end_frame(start)
+
+        simulation.stop()
+        if self.recording:
+            self.recording.digest = self.state_digest()
+        self.save_exploration()
+        self.asset_cache.save()
+        self.images.close()
+
+        pygame.quit()
+
+    def run_replay(self, recording: InputRecording):
+        """Feed a recorded input stream back through the simulation
+
+        Headless replays skip rendering and frame limiting entirely, so they
+        run as fast as the simulation allows (useful under a profiler).
+        Frame times never reach the quality governor here, so a replay is
+        always drawn at the "high" level, whatever live play would pick.
+        """
+        start = systime.perf_counter()
+
+        for frame in recording.frames:
+            if not self.running:
+                break
+            if not self.headless:
+                for event in pygame.event.get(pygame.QUIT):
+                    self.running = False
+                self.clock.tick(FPS)
+
+            self.step(frame)
+            if not self.headless:
+                self.update_presentation(frame.dt_ms / 1000.0)
+                self.draw(self.make_snapshot())
+
+        elapsed = systime.perf_counter() - start
+        ticks = max(1, self.tick)
+        print(f"Replayed {self.tick} ticks (day {self.day_count}) in {elapsed:.2f}s - "
+              f"{ticks / max(elapsed, 1e-9):.0f} ticks/s, {elapsed * 1000 / ticks:.3f} ms/tick")
+
+        if self.tick == len(recording.frames):
+            if self.state_digest() == recording.digest:
+                print("Replay verified: final state matches the recording")
+            else:
+                print("Replay DIVERGED: final state differs from the recording")
+
+        self.images.close()
+        pygame.quit()
+
+    def run_benchmark(self, frames: int):
+        """Time the render passes at each zoom level while the camera circles the world centre"""
+        self.start_game("warrior")
+        center = WORLD_SIZE * TILE_SIZE // 2
+        radius = WORLD_SIZE * TILE_SIZE // 4
+
+        for tile_size in ZOOM_TILE_SIZES:
+            self.tile_size = tile_size
+            self.profiler.reset()
+            drawn = 0
+
+            for i in range(frames):
+                angle = 2 * math.pi * i / frames
+                self.camera_x = int(center + math.cos(angle) * radius)
+                self.camera_y = int(center + math.sin(angle) * radius)
+                self.animation_time += 1 / FPS
+                snap = self.make_snapshot()
+                drawn += len(snap.drawables)
+                self.draw(snap)
+
+            print(f"Zoom {tile_size / TILE_SIZE:g}x: rendered {frames} frames, "
+                  f"{drawn / max(1, frames):.0f} world objects per frame "
+                  f"(averages over the last {min(frames, self.profiler.window)})")
+            print(f"  {'pass':<10}{'avg ms':>8}{'p99 ms':>8}{'calls':>7}{'blits':>7}")
+            for name, average, p99, calls, blits in self.profiler.stats():
+                print(f"  {name:<10}{average:>8.3f}{p99:>8.3f}{calls:>7.0f}{blits:>7.0f}")
+
+        self.tile_size = TILE_SIZE
+        self.report_tile_edits()
+        self.report_allocations()
+        self.images.close()
+        pygame.quit()
+
+    def run_asset_benchmark(self, path: str):
+        """Time loading every asset with no cache file at path, then again from the file written"""
+        if os.path.exists(path):
+            os.remove(path)
+        self.asset_cache_path = path
+        print(f"{'startup':<8}{'ms':>8}{'built':>7}{'cached':>8}")
+        for name in ("cold", "warm"):
+            start = systime.perf_counter()
+            self.load_assets()
+            self.assets.warm_up(ASSET_MANIFEST)
+            elapsed = systime.perf_counter() - start
+            print(f"{name:<8}{elapsed * 1000:>8.1f}{self.asset_cache.misses:>7}{self.asset_cache.hits:>8}")
+            self.images.close()
+            print(f"  {self.images.report()}")
+            self.asset_cache.save()
+        print(f"{len(self.assets)} assets and {len(self.tile_textures)} terrain textures, "
+              f"{os.path.getsize(path) / 1024:.0f} KB in {path}")
+        os.remove(path)
+        pygame.quit()
+
+    def build_asset_cache(self):
+        """Decode every asset into the cache file ahead of the first launch"""
+        start = systime.perf_counter()
+        self.assets.warm_up(ASSET_MANIFEST)
+        self.asset_cache.save()
+        self.images.close()
+        print(f"Cached {len(self.assets)} assets and the terrain in {self.asset_cache.path} "
+              f"({systime.perf_counter() - start:.2f}s)")
         pygame.quit()
 
+    def report_tile_edits(self, edits: int = 100):
+        """Cost of changing on-screen tiles, and whether the chunk cache still matches a full rebuild
+
+        Each edit goes through World.set_tile and the event bus, like a
+        meteor crater, and is followed by a frame. Afterwards every cached
+        chunk, at every zoom level, is compared with one rendered from
+        scratch; the answer should always be yes.
+        """
+        rng = random.Random(edits)  # The simulation's stream is left alone
+        tiles = list(TileType)
+        # Edits go down the last column of one chunk, next to water in the first
+        # column of the next, which then only changes through its border masks
+        x = min(WORLD_SIZE - 2, (self.camera_x // TILE_SIZE // CHUNK_TILES + 1) * CHUNK_TILES - 1)
+        rows = range(max(0, self.camera_y // TILE_SIZE - 9), min(WORLD_SIZE, self.camera_y // TILE_SIZE + 10))
+        for y in rows:
+            self.world.set_tile(x + 1, y, TileType.WATER)
+        self.world.events.flush()
+        self.draw(self.make_snapshot())
+
+        start = systime.perf_counter()
+        for _ in range(edits):
+            self.world.set_tile(x, rng.choice(rows), rng.choice(tiles))
+            self.world.events.flush()
+            self.draw(self.make_snapshot())
+        elapsed = systime.perf_counter() - start
+
+        fresh = TerrainChunkCache(self.tile_textures, animations=self.tile_animations, borders=self.tile_borders)
+        fresh.set_tiles(self.world.tiles)
+        matches = True
+        for key, surface in self.terrain.chunks.items():
+            tile_size, cx, cy = key
+            expected = fresh.chunk(self.world.tiles, cx, cy, tile_size)
+            if fresh.patches[key]:
+                fresh.animate(key, expected, self.terrain.shown_frames[key])
+            matches &= pygame.image.tobytes(surface, "RGB") == pygame.image.tobytes(expected, "RGB")
+        print(f"Tile edits: {elapsed * 1000 / edits:.3f} ms per edit and frame, "
+              f"{len(self.terrain.chunks)} cached chunks match a full rebuild: {'yes' if matches else 'NO'}")
+
+    def report_allocations(self, frames: int = 60):
+        """Surfaces created per frame once each screen has warmed up
+
+        Counts new_surface() calls plus text cache misses (each one is a
+        font.render). With the camera still, every screen should report 0.
+        """
+        print("Surface allocations per frame (steady state):")
+        screens = [("day", "playing", 0), ("night", "playing", DAY_LENGTH + NIGHT_LENGTH // 2),
+                   ("inventory", "inventory", 0), ("crafting", "crafting", 0),
+                   ("building", "building_placement", 0)]
+        self.building_to_place = ItemType.CAMPFIRE
+        for name, state, time_of_day in screens:
+            self.state = state
+            self.time = time_of_day
+            snap = self.make_snapshot()
+            self.draw(snap)  # Warm-up frame fills the caches
+
+            before = surface_allocations + self.text_cache.misses
+            for _ in range(frames):
+                self.draw(snap)
+            allocated = surface_allocations + self.text_cache.misses - before
+            print(f"  {name:<10} {allocated / frames:.2f}")
+        self.state = "playing"
+
+
+def seed_argument(value: str) -> int:
+    """--seed value, which recordings and exploration files store as an unsigned 32-bit int"""
+    try:
+        seed = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"seed must be an integer, got {value!r}")
+    if not 0 <= seed <= 0xFFFFFFFF:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {0xFFFFFFFF}, got {seed}")
+    return seed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiny Swords Roguelike")
+    parser.add_argument("--seed", type=seed_argument, help="seed the session for a reproducible run")
+    parser.add_argument("--record", metavar="FILE", help="record seed and input to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="replay a recorded input file")
+    parser.add_argument("--headless", action="store_true",
+                        help="with --replay: no window, no frame limit")
+    parser.add_argument("--threaded-sim", action="store_true",
+                        help="run the world simulation on its own thread")
+    parser.add_argument("--explored", metavar="FILE",
+                        help="load and save the explored map in FILE (use with --seed)")
+    parser.add_argument("--bench", type=int, metavar="FRAMES",
+                        help="time the render passes offscreen over FRAMES frames")
+    parser.add_argument("--profile-csv", metavar="FILE",
+                        help="append render pass timings to FILE every %d frames" % PROFILER_WINDOW)
+    parser.add_argument("--bench-assets", action="store_true",
+                        help="time asset loading with a cold and then a warm asset cache")
+    parser.add_argument("--build-asset-cache", action="store_true",
+                        help="decode every asset into %s and exit" % ASSET_CACHE_PATH)
+    args = parser.parse_args()
+
+    if args.bench_assets or args.build_asset_cache:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.display.quit()
+        pygame.display.init()
+        if args.build_asset_cache:
+            GameState(0).build_asset_cache()
+        else:
+            GameState(0, asset_cache=None).run_asset_benchmark(ASSET_CACHE_PATH + ".bench")
+        return
+
+    if args.bench:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        pygame.display.quit()
+        pygame.display.init()
+        game = GameState(args.seed if args.seed is not None else 0)
+        game.profiler = RenderProfiler(csv_path=args.profile_csv)
+        game.run_benchmark(args.bench)
+        return
+
+    if args.replay:
+        recording = InputRecording.load(args.replay)
+        if args.headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            pygame.display.quit()
+            pygame.display.init()
+        game = GameState(recording.seed, args.headless)
+        game.profiler = RenderProfiler(csv_path=args.profile_csv)
+        game.run_replay(recording)
+        return
+
+    seed = args.seed
+    if args.record and seed is None:
+        seed = random.randint(0, 0xFFFFFFFF)
+
+    game = GameState(seed)
+    game.explored_path = args.explored
+    game.profiler = RenderProfiler(csv_path=args.profile_csv)
+    if args.record:
+        game.recording = InputRecording(seed)
+    game.run(args.threaded_sim)
+
+    if args.record:
+        game.recording.save(args.record)
+        print(f"Saved {len(game.recording.frames)} ticks to {args.record}")
+
 
 if __name__ == "__main__":
-    game = GameState()
-    game.run()
+    main()
@@ -0,0 +1,57 @@
+import pygame
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class TextCache:
+    """LRU cache of rendered text, keyed by (font, text, color, outline)
+
+    Most text on screen - HUD labels, resource counts, damage numbers - is
+    the same from one frame to the next, so it is rasterized once and the
+    surface reused. Surfaces are shared between callers: anything that
+    fades text with set_alpha() has to set it before every blit.
+    """
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int],
+               outline: Optional[Tuple[Tuple[int, int, int], int]] = None) -> pygame.Surface:
+        """Antialiased text; outline=(color, width) draws a border around it"""
+        key = (font, text, color, outline)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        if outline:
+            surface = self.render_outlined(font, text, color, *outline)
+        else:
+            surface = font.render(text, True, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    @staticmethod
+    def render_outlined(font: pygame.font.Font, text: str, color: Tuple[int, int, int],
+                        outline_color: Tuple[int, int, int], width: int) -> pygame.Surface:
+        """Text composited over copies of itself shifted width pixels in 8 directions"""
+        inner = font.render(text, True, color)
+        edge = font.render(text, True, outline_color)
+        surface = pygame.Surface((inner.get_width() + 2 * width, inner.get_height() + 2 * width),
+                                 pygame.SRCALPHA)
+        for dx in (-width, 0, width):
+            for dy in (-width, 0, width):
+                if dx or dy:
+                    surface.blit(edge, (width + dx, width + dy))
+        surface.blit(inner, (width, width))
+        return surface
+
+    def clear(self):
+        """Drop every cached surface"""
+        self.entries.clear()